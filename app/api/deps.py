@@ -4,9 +4,12 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 from redis.asyncio import Redis
 
 from app.core.config import settings
-from app.db.mongo import get_database_from_state
+from app.db.mongo import get_database_from_state, get_redirect_database_from_state
+from app.db.redirect_snapshot import get_redirect_snapshot_from_state
 from app.db.redis import get_redis_from_state
+from app.db.url_cache import UrlCache, get_url_cache_from_state
 from app.schemas.user import UserInDB
+from app.services.analytics_service import AnalyticsService, AnalyticsServiceConfig
 from app.services.token_service import TokenService
 from app.services.url_service import UrlService, UrlServiceConfig
 from app.services.user_service import UserService
@@ -19,24 +22,54 @@ async def get_mongo_db(request: Request) -> AsyncIOMotorDatabase:
     return get_database_from_state(request.app)
 
 
+async def get_redirect_mongo_db(request: Request) -> AsyncIOMotorDatabase:
+    return get_redirect_database_from_state(request.app)
+
+
 async def get_redis(request: Request) -> Redis:
     return get_redis_from_state(request.app)
 
 
+async def get_url_cache(request: Request) -> UrlCache:
+    return get_url_cache_from_state(request.app)
+
+
 async def get_user_service(db: AsyncIOMotorDatabase = Depends(get_mongo_db)) -> UserService:
     return UserService(db, settings.mongo_database_settings["users"])
 
 
 async def get_url_service(
+    request: Request,
     db: AsyncIOMotorDatabase = Depends(get_mongo_db),
-    redis: Redis = Depends(get_redis),
+    redirect_db: AsyncIOMotorDatabase = Depends(get_redirect_mongo_db),
+    url_cache: UrlCache = Depends(get_url_cache),
 ) -> UrlService:
     config = UrlServiceConfig(
         cache_ttl_seconds=settings.redis_cache_ttl_seconds,
         url_collection=settings.mongo_database_settings["urls"],
-        click_collection=settings.mongo_database_settings["clicks"],
+        tombstone_ttl_seconds=settings.cache_tombstone_ttl_seconds,
+        negative_ttl_seconds=settings.cache_negative_ttl_seconds,
+        create_cache_mode=settings.url_create_cache_mode,
+        bulk_chunk_size=settings.url_bulk_chunk_size,
+        bulk_inline_limit=settings.url_bulk_inline_limit,
+        bulk_job_collection=settings.mongo_database_settings["bulk_jobs"],
+    )
+    return UrlService(
+        db,
+        url_cache,
+        config,
+        lookup_database=redirect_db,
+        snapshot=get_redirect_snapshot_from_state(request.app),
+    )
+
+
+async def get_analytics_service(
+    db: AsyncIOMotorDatabase = Depends(get_mongo_db),
+) -> AnalyticsService:
+    config = AnalyticsServiceConfig(
+        owner_rollup_collection=settings.mongo_database_settings["owner_rollups"],
     )
-    return UrlService(db, redis, config)
+    return AnalyticsService(db, config)
 
 
 async def get_current_user(
@@ -1,8 +1,9 @@
 from fastapi import APIRouter
 
-from app.api.routes import auth, health, urls
+from app.api.routes import analytics, auth, health, urls
 
 api_router = APIRouter()
 api_router.include_router(health.router, prefix="/health", tags=["health"])
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(urls.router, prefix="/urls", tags=["urls"])
+api_router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
@@ -0,0 +1,52 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.api import deps
+from app.schemas.analytics import DailyClicks, OwnerAnalyticsSummary, TopLink
+from app.schemas.user import UserInDB
+from app.services.analytics_service import AnalyticsService
+
+router = APIRouter()
+
+WindowDays = Annotated[int, Query(ge=1, le=90)]
+# Capped at the length of the daily top lists (``app.tasks.analytics.TOP_LINKS_PER_DAY``).
+TopLimit = Annotated[int, Query(ge=1, le=100)]
+
+
+@router.get("/summary", response_model=OwnerAnalyticsSummary)
+async def get_owner_summary(
+    current_user: Annotated[UserInDB, Depends(deps.get_current_user)],
+    analytics_service: Annotated[AnalyticsService, Depends(deps.get_analytics_service)],
+    days: WindowDays = 30,
+    limit: TopLimit = 10,
+) -> OwnerAnalyticsSummary:
+    try:
+        return await analytics_service.get_summary(current_user.id, days, limit)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+
+@router.get("/daily", response_model=list[DailyClicks])
+async def get_owner_daily_clicks(
+    current_user: Annotated[UserInDB, Depends(deps.get_current_user)],
+    analytics_service: Annotated[AnalyticsService, Depends(deps.get_analytics_service)],
+    days: WindowDays = 30,
+) -> list[DailyClicks]:
+    try:
+        return await analytics_service.get_daily_clicks(current_user.id, days)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+
+@router.get("/top-links", response_model=list[TopLink])
+async def get_owner_top_links(
+    current_user: Annotated[UserInDB, Depends(deps.get_current_user)],
+    analytics_service: Annotated[AnalyticsService, Depends(deps.get_analytics_service)],
+    days: WindowDays = 30,
+    limit: TopLimit = 10,
+) -> list[TopLink]:
+    try:
+        return await analytics_service.get_top_links(current_user.id, days, limit)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
@@ -1,4 +1,9 @@
-from fastapi import APIRouter
+from typing import Any
+
+from fastapi import APIRouter, Request
+
+from app.db.mongo import get_mongo_metrics_from_state
+from app.db.redis_cache import get_cache_shards_from_state
 
 router = APIRouter()
 
@@ -11,3 +16,16 @@ async def live() -> dict[str, str]:
 @router.get("/ready")
 async def ready() -> dict[str, str]:
     return {"status": "ready"}
+
+
+@router.get("/cache")
+async def cache(request: Request) -> dict[str, Any]:
+    shards = await get_cache_shards_from_state(request.app).health()
+    healthy = all(shard["status"] == "ok" for shard in shards)
+    return {"status": "ok" if healthy else "degraded", "shards": shards}
+
+
+@router.get("/mongo")
+async def mongo(request: Request) -> dict[str, Any]:
+    metrics = get_mongo_metrics_from_state(request.app)
+    return {"profiles": [profile.snapshot() for profile in metrics.values()]}
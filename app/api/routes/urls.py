@@ -1,22 +1,26 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 
 from app.api import deps
-from app.schemas.url import URLCreate, URLRead, URLWithAnalytics
+from app.schemas.url import (
+    URLBulkDelete,
+    URLBulkExpire,
+    URLBulkJob,
+    URLBulkResult,
+    URLCreate,
+    URLRead,
+    URLUpdate,
+    URLWithAnalytics,
+)
 from app.schemas.user import UserInDB
 from app.services.url_service import UrlService
 
 router = APIRouter()
 
 
-def _build_short_url(request: Request, short_code: str) -> str:
-    base_url = str(request.base_url).rstrip("/")
-    return f"{base_url}/{short_code}"
-
-
-def _attach_short_url(request: Request, url: URLRead) -> URLRead:
-    return url.model_copy(update={"short_url": _build_short_url(request, url.short_code)})
+def _base_url(request: Request) -> str:
+    return str(request.base_url).rstrip("/")
 
 
 @router.post("/", response_model=URLRead, status_code=status.HTTP_201_CREATED)
@@ -27,10 +31,12 @@ async def create_short_url(
     url_service: Annotated[UrlService, Depends(deps.get_url_service)],
 ) -> URLRead:
     try:
-        created = await url_service.create_short_url(payload, current_user.id)
+        created = await url_service.create_short_url(
+            payload, current_user.id, base_url=_base_url(request)
+        )
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
-    return _attach_short_url(request, created)
+    return created
 
 
 @router.get("/", response_model=list[URLRead])
@@ -40,12 +46,62 @@ async def list_short_urls(
     url_service: Annotated[UrlService, Depends(deps.get_url_service)],
     limit: int = Query(default=100, ge=1, le=500),
     skip: int = Query(default=0, ge=0),
-) -> list[URLRead]:
+) -> Response:
+    try:
+        body = await url_service.list_urls_json(
+            current_user.id, limit=limit, skip=skip, base_url=_base_url(request)
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    # Already serialized in one pass; skip response_model re-validation.
+    return Response(content=body, media_type="application/json")
+
+
+async def _submit_bulk(
+    payload: URLBulkDelete | URLBulkExpire,
+    response: Response,
+    owner_id: str,
+    url_service: UrlService,
+) -> URLBulkResult:
     try:
-        urls = await url_service.list_urls(current_user.id, limit=limit, skip=skip)
+        result = await url_service.submit_bulk(owner_id, payload)
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
-    return [_attach_short_url(request, item) for item in urls]
+    if result.status == "queued":
+        response.status_code = status.HTTP_202_ACCEPTED
+    return result
+
+
+@router.post("/bulk/delete", response_model=URLBulkResult)
+async def bulk_delete_short_urls(
+    payload: URLBulkDelete,
+    response: Response,
+    current_user: Annotated[UserInDB, Depends(deps.get_current_user)],
+    url_service: Annotated[UrlService, Depends(deps.get_url_service)],
+) -> URLBulkResult:
+    return await _submit_bulk(payload, response, current_user.id, url_service)
+
+
+@router.post("/bulk/expire", response_model=URLBulkResult)
+async def bulk_expire_short_urls(
+    payload: URLBulkExpire,
+    response: Response,
+    current_user: Annotated[UserInDB, Depends(deps.get_current_user)],
+    url_service: Annotated[UrlService, Depends(deps.get_url_service)],
+) -> URLBulkResult:
+    return await _submit_bulk(payload, response, current_user.id, url_service)
+
+
+@router.get("/bulk/jobs/{job_id}", response_model=URLBulkJob)
+async def get_bulk_job(
+    job_id: str,
+    current_user: Annotated[UserInDB, Depends(deps.get_current_user)],
+    url_service: Annotated[UrlService, Depends(deps.get_url_service)],
+) -> URLBulkJob:
+    job = await url_service.get_bulk_job(current_user.id, job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bulk job not found")
+    return job
 
 
 @router.get("/{short_code}", response_model=URLWithAnalytics)
@@ -56,12 +112,33 @@ async def get_short_url(
     url_service: Annotated[UrlService, Depends(deps.get_url_service)],
 ) -> URLWithAnalytics:
     try:
-        url = await url_service.get_url_with_analytics(current_user.id, short_code)
+        url = await url_service.get_url_with_analytics(
+            current_user.id, short_code, base_url=_base_url(request)
+        )
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
     if not url:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Short URL not found")
-    return url.model_copy(update={"short_url": _build_short_url(request, short_code)})
+    return url
+
+
+@router.patch("/{short_code}", response_model=URLRead)
+async def update_short_url(
+    short_code: str,
+    payload: URLUpdate,
+    request: Request,
+    current_user: Annotated[UserInDB, Depends(deps.get_current_user)],
+    url_service: Annotated[UrlService, Depends(deps.get_url_service)],
+) -> URLRead:
+    try:
+        updated = await url_service.update_url(
+            current_user.id, short_code, payload, base_url=_base_url(request)
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    if not updated:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Short URL not found")
+    return updated
 
 
 @router.delete("/{short_code}", status_code=status.HTTP_204_NO_CONTENT)
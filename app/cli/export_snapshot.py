@@ -0,0 +1,33 @@
+"""Write the offline redirect snapshot once: ``python -m app.cli.export_snapshot``."""
+
+import argparse
+
+from pymongo import MongoClient
+
+from app.core.config import settings
+from app.core.logging import configure_logging, get_logger
+from app.tasks.snapshot import export_redirect_snapshot
+
+logger = get_logger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--path", default=settings.redirect_snapshot_path)
+    parser.add_argument(
+        "--page-records", type=int, default=settings.redirect_snapshot_page_records
+    )
+    args = parser.parse_args()
+
+    configure_logging()
+    client = MongoClient(str(settings.mongodb_uri), tz_aware=True)
+    try:
+        database = client[settings.mongodb_database]
+        count = export_redirect_snapshot(database, args.path, args.page_records)
+    finally:
+        client.close()
+    logger.info("exported redirect snapshot", path=args.path, count=count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Stream a CSV/NDJSON file of links into MongoDB: ``python -m app.cli.import_links``."""
+
+import argparse
+import contextlib
+import sys
+
+from pymongo import MongoClient
+
+from app.core.config import settings
+from app.core.logging import configure_logging, get_logger
+from app.tasks.imports import ImportStats, import_links
+
+logger = get_logger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path")
+    parser.add_argument("--owner-id", required=True)
+    parser.add_argument("--format", choices=("csv", "ndjson"), default=None)
+    parser.add_argument(
+        "--checkpoint",
+        default=None,
+        help="resume key; defaults to '<owner-id>:<file name>'",
+    )
+    parser.add_argument("--chunk-size", type=int, default=settings.import_chunk_size)
+    parser.add_argument("--rejects", default=None, help="NDJSON file for rejected rows")
+    args = parser.parse_args()
+
+    configure_logging()
+
+    def report(stats: ImportStats) -> None:
+        logger.info("import progress", **stats.report())
+
+    client = MongoClient(str(settings.mongodb_uri), tz_aware=True)
+    try:
+        with contextlib.ExitStack() as stack:
+            rejects = (
+                stack.enter_context(open(args.rejects, "a", encoding="utf-8"))
+                if args.rejects
+                else None
+            )
+            stats = import_links(
+                client[settings.mongodb_database],
+                args.path,
+                args.owner_id,
+                fmt=args.format,
+                checkpoint_id=args.checkpoint,
+                chunk_size=args.chunk_size,
+                rejects=rejects,
+                progress=report,
+            )
+    except ValueError as exc:
+        sys.exit(f"import failed: {exc}")
+    finally:
+        client.close()
+    if stats.conflicts or stats.invalid:
+        logger.warning("some rows were rejected", conflicts=stats.conflicts, invalid=stats.invalid)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Create or reconcile MongoDB indexes: ``python -m app.cli.migrate``.
+
+Run once per deploy, before the new API workers start; workers no longer build indexes
+on boot unless ``MONGODB_ENSURE_INDEXES_ON_STARTUP`` is set.
+"""
+
+import asyncio
+import time
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.core.config import settings
+from app.core.logging import configure_logging, get_logger
+from app.db.indexes import create_indexes
+
+logger = get_logger(__name__)
+
+
+async def run() -> None:
+    client = AsyncIOMotorClient(
+        str(settings.mongodb_uri), tz_aware=True, appname="url-shortener-migrate"
+    )
+    started = time.perf_counter()
+    try:
+        await create_indexes(client[settings.mongodb_database])
+    finally:
+        client.close()
+    logger.info(
+        "indexes ensured",
+        database=settings.mongodb_database,
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 1),
+    )
+
+
+def main() -> None:
+    configure_logging()
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
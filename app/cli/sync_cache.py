@@ -0,0 +1,63 @@
+"""Mirror ``urls`` changes into the redirect cache: ``python -m app.cli.sync_cache``.
+
+Requires MongoDB to run as a replica set (change streams are not available on a
+standalone server). Run a single instance; the resume token is shared.
+"""
+
+import asyncio
+import signal
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from redis.asyncio import Redis
+
+from app.core.config import settings
+from app.core.logging import configure_logging, get_logger
+from app.db.redis_cache import build_cache_shards
+from app.db.url_cache import UrlCache
+from app.services.cache_sync import CacheSyncConfig, UrlCacheSync
+
+logger = get_logger(__name__)
+
+
+async def run() -> None:
+    client = AsyncIOMotorClient(
+        str(settings.mongodb_uri), tz_aware=True, appname="url-shortener-cache-sync"
+    )
+    redis = Redis.from_url(str(settings.redis_uri), encoding="utf-8", decode_responses=True)
+    shards = build_cache_shards()
+    db_config = settings.mongo_database_settings
+    sync = UrlCacheSync(
+        client[settings.mongodb_database],
+        UrlCache(shards, redis, invalidation_channel=settings.cache_invalidation_channel),
+        CacheSyncConfig(
+            url_collection=db_config["urls"],
+            checkpoint_collection=db_config["checkpoints"],
+            cache_ttl_seconds=settings.redis_cache_ttl_seconds,
+            tombstone_ttl_seconds=settings.cache_tombstone_ttl_seconds,
+            batch_size=settings.cache_sync_batch_size,
+            max_await_ms=settings.cache_sync_max_await_ms,
+            enable_pre_images=settings.cache_sync_enable_pre_images,
+        ),
+    )
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    logger.info("cache sync started", collection=db_config["urls"])
+    try:
+        await sync.run(stop)
+    finally:
+        await shards.close()
+        await redis.close()
+        client.close()
+    logger.info("cache sync stopped")
+
+
+def main() -> None:
+    configure_logging()
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
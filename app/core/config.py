@@ -1,5 +1,5 @@
 from functools import lru_cache
-from typing import Any
+from typing import Any, Literal
 
 from pydantic import AnyUrl, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -25,14 +25,120 @@ class Settings(BaseSettings):
     mongodb_user_collection: str = Field("users", alias="MONGODB_USER_COLLECTION")
     mongodb_url_collection: str = Field("urls", alias="MONGODB_URL_COLLECTION")
     mongodb_click_collection: str = Field("click_events", alias="MONGODB_CLICK_COLLECTION")
+    mongodb_admin_read_preference: str = Field("primary", alias="MONGODB_ADMIN_READ_PREFERENCE")
+    mongodb_admin_max_pool_size: int = Field(50, ge=1, alias="MONGODB_ADMIN_MAX_POOL_SIZE")
+    mongodb_admin_min_pool_size: int = Field(0, ge=0, alias="MONGODB_ADMIN_MIN_POOL_SIZE")
+    mongodb_admin_wait_queue_timeout_ms: int = Field(
+        5000, ge=1, alias="MONGODB_ADMIN_WAIT_QUEUE_TIMEOUT_MS"
+    )
+    mongodb_admin_server_selection_timeout_ms: int = Field(
+        10000, ge=1, alias="MONGODB_ADMIN_SERVER_SELECTION_TIMEOUT_MS"
+    )
+    mongodb_admin_socket_timeout_ms: int = Field(
+        30000, ge=1, alias="MONGODB_ADMIN_SOCKET_TIMEOUT_MS"
+    )
+    mongodb_redirect_read_preference: str = Field(
+        "secondaryPreferred", alias="MONGODB_REDIRECT_READ_PREFERENCE"
+    )
+    mongodb_redirect_max_pool_size: int = Field(200, ge=1, alias="MONGODB_REDIRECT_MAX_POOL_SIZE")
+    mongodb_redirect_min_pool_size: int = Field(10, ge=0, alias="MONGODB_REDIRECT_MIN_POOL_SIZE")
+    mongodb_redirect_wait_queue_timeout_ms: int = Field(
+        250, ge=1, alias="MONGODB_REDIRECT_WAIT_QUEUE_TIMEOUT_MS"
+    )
+    mongodb_redirect_server_selection_timeout_ms: int = Field(
+        1000, ge=1, alias="MONGODB_REDIRECT_SERVER_SELECTION_TIMEOUT_MS"
+    )
+    mongodb_redirect_socket_timeout_ms: int = Field(
+        1000, ge=1, alias="MONGODB_REDIRECT_SOCKET_TIMEOUT_MS"
+    )
+    mongodb_owner_rollup_collection: str = Field(
+        "owner_daily_clicks", alias="MONGODB_OWNER_ROLLUP_COLLECTION"
+    )
+    mongodb_link_rollup_collection: str = Field(
+        "link_daily_clicks", alias="MONGODB_LINK_ROLLUP_COLLECTION"
+    )
+    mongodb_checkpoint_collection: str = Field(
+        "checkpoints", alias="MONGODB_CHECKPOINT_COLLECTION"
+    )
+    mongodb_bulk_job_collection: str = Field("bulk_jobs", alias="MONGODB_BULK_JOB_COLLECTION")
+    mongodb_ensure_indexes_on_startup: bool = Field(
+        False, alias="MONGODB_ENSURE_INDEXES_ON_STARTUP"
+    )
 
     redis_uri: AnyUrl = Field(..., alias="REDIS_URI")
     redis_cache_ttl_seconds: int = Field(3600, alias="REDIS_CACHE_TTL_SECONDS")
+    redis_cache_uris: str = Field("", alias="REDIS_CACHE_URIS")
+    redis_cache_cluster: bool = Field(False, alias="REDIS_CACHE_CLUSTER")
+    redis_cache_max_connections: int = Field(64, ge=1, alias="REDIS_CACHE_MAX_CONNECTIONS")
+    redis_cache_ring_replicas: int = Field(128, ge=1, alias="REDIS_CACHE_RING_REPLICAS")
+    url_create_cache_mode: Literal["sync", "concurrent", "background"] = Field(
+        "sync", alias="URL_CREATE_CACHE_MODE"
+    )
+    cache_tombstone_ttl_seconds: int = Field(60, ge=1, alias="CACHE_TOMBSTONE_TTL_SECONDS")
+    cache_negative_ttl_seconds: int = Field(5, ge=0, alias="CACHE_NEGATIVE_TTL_SECONDS")
+    cache_invalidation_channel: str = Field("url:invalidate", alias="CACHE_INVALIDATION_CHANNEL")
+    local_cache_max_entries: int = Field(10000, ge=0, alias="LOCAL_CACHE_MAX_ENTRIES")
+    local_cache_ttl_seconds: float = Field(5.0, ge=0, alias="LOCAL_CACHE_TTL_SECONDS")
+    cache_popularity_width: int = Field(65536, ge=0, alias="CACHE_POPULARITY_WIDTH")
+    cache_popularity_depth: int = Field(4, ge=1, le=16, alias="CACHE_POPULARITY_DEPTH")
+    cache_ttl_min_seconds: int = Field(600, ge=1, alias="CACHE_TTL_MIN_SECONDS")
+    cache_ttl_max_seconds: int = Field(86400, ge=1, alias="CACHE_TTL_MAX_SECONDS")
+    cache_hot_threshold: int = Field(4, ge=2, alias="CACHE_HOT_THRESHOLD")
+    cache_refresh_ahead_ratio: float = Field(
+        0.1, ge=0, lt=1, alias="CACHE_REFRESH_AHEAD_RATIO"
+    )
+    click_quota_counter_ttl_seconds: int = Field(
+        30 * 86400, ge=3600, alias="CLICK_QUOTA_COUNTER_TTL_SECONDS"
+    )
+    click_quota_flush_interval_seconds: int = Field(
+        60, ge=5, alias="CLICK_QUOTA_FLUSH_INTERVAL_SECONDS"
+    )
+    click_quota_flush_batch_size: int = Field(1000, ge=1, alias="CLICK_QUOTA_FLUSH_BATCH_SIZE")
+    import_chunk_size: int = Field(1000, ge=1, le=50000, alias="IMPORT_CHUNK_SIZE")
+    routing_country_header: str = Field("cf-ipcountry", alias="ROUTING_COUNTRY_HEADER")
+    url_bulk_chunk_size: int = Field(500, ge=1, le=10000, alias="URL_BULK_CHUNK_SIZE")
+    url_bulk_inline_limit: int = Field(1000, ge=0, alias="URL_BULK_INLINE_LIMIT")
+    cache_sync_batch_size: int = Field(500, ge=1, alias="CACHE_SYNC_BATCH_SIZE")
+    cache_sync_max_await_ms: int = Field(500, ge=1, alias="CACHE_SYNC_MAX_AWAIT_MS")
+    cache_sync_enable_pre_images: bool = Field(True, alias="CACHE_SYNC_ENABLE_PRE_IMAGES")
+
+    redirect_snapshot_path: str = Field(
+        "snapshots/redirects.snap", alias="REDIRECT_SNAPSHOT_PATH"
+    )
+    redirect_snapshot_page_records: int = Field(64, ge=1, alias="REDIRECT_SNAPSHOT_PAGE_RECORDS")
+    redirect_snapshot_interval_seconds: int = Field(
+        600, ge=60, alias="REDIRECT_SNAPSHOT_INTERVAL_SECONDS"
+    )
+    redirect_snapshot_max_staleness_seconds: int = Field(
+        86400, ge=0, alias="REDIRECT_SNAPSHOT_MAX_STALENESS_SECONDS"
+    )
+
+    hot_table_path: str = Field("", alias="HOT_TABLE_PATH")
+    hot_table_slots: int = Field(65536, ge=2, alias="HOT_TABLE_SLOTS")
+    hot_table_heap_bytes: int = Field(16 * 1024 * 1024, ge=1, alias="HOT_TABLE_HEAP_BYTES")
+    hot_table_max_entries: int = Field(20000, ge=1, alias="HOT_TABLE_MAX_ENTRIES")
+    hot_table_window_days: int = Field(1, ge=1, le=90, alias="HOT_TABLE_WINDOW_DAYS")
+    hot_table_refresh_seconds: int = Field(30, ge=1, alias="HOT_TABLE_REFRESH_SECONDS")
+
+    serve_host: str = Field("0.0.0.0", alias="SERVE_HOST")
+    serve_port: int = Field(8000, alias="SERVE_PORT")
+    serve_workers: int = Field(0, ge=0, alias="SERVE_WORKERS")
+    startup_warmup_timeout_seconds: float = Field(
+        5.0, ge=0, alias="STARTUP_WARMUP_TIMEOUT_SECONDS"
+    )
 
     celery_broker_url: AnyUrl = Field(..., alias="CELERY_BROKER_URL")
     celery_result_backend: AnyUrl = Field(..., alias="CELERY_RESULT_BACKEND")
     celery_default_queue: str = Field("shortener_tasks", alias="CELERY_TASK_DEFAULT_QUEUE")
 
+    click_retention_days: int = Field(30, ge=0, alias="CLICK_RETENTION_DAYS")
+    click_retention_grace_days: int = Field(7, ge=0, alias="CLICK_RETENTION_GRACE_DAYS")
+    click_archive_dir: str = Field("archive/click_events", alias="CLICK_ARCHIVE_DIR")
+    click_compaction_batch_size: int = Field(5000, ge=1, alias="CLICK_COMPACTION_BATCH_SIZE")
+    click_compaction_interval_seconds: int = Field(
+        3600, ge=60, alias="CLICK_COMPACTION_INTERVAL_SECONDS"
+    )
+
     rate_limit_requests: int = Field(100, alias="RATE_LIMIT_REQUESTS")
     rate_limit_window_seconds: int = Field(60, alias="RATE_LIMIT_WINDOW_SECONDS")
 
@@ -49,6 +155,34 @@ class Settings(BaseSettings):
     def is_production(self) -> bool:
         return self.app_env.lower() == "production"
 
+    @property
+    def cache_redis_uris(self) -> list[str]:
+        uris = [uri.strip() for uri in self.redis_cache_uris.split(",") if uri.strip()]
+        return uris or [str(self.redis_uri)]
+
+    @property
+    def click_ttl_seconds(self) -> int | None:
+        if self.click_retention_days <= 0:
+            return None
+        return (self.click_retention_days + self.click_retention_grace_days) * 86400
+
+    @property
+    def mongo_client_profiles(self) -> dict[str, dict[str, Any]]:
+        """PyMongo client options for the admin/analytics and redirect lookup pools."""
+        return {
+            profile: {
+                "readPreference": getattr(self, f"mongodb_{profile}_read_preference"),
+                "maxPoolSize": getattr(self, f"mongodb_{profile}_max_pool_size"),
+                "minPoolSize": getattr(self, f"mongodb_{profile}_min_pool_size"),
+                "waitQueueTimeoutMS": getattr(self, f"mongodb_{profile}_wait_queue_timeout_ms"),
+                "serverSelectionTimeoutMS": getattr(
+                    self, f"mongodb_{profile}_server_selection_timeout_ms"
+                ),
+                "socketTimeoutMS": getattr(self, f"mongodb_{profile}_socket_timeout_ms"),
+            }
+            for profile in ("admin", "redirect")
+        }
+
     @property
     def mongo_database_settings(self) -> dict[str, Any]:
         return {
@@ -56,6 +190,10 @@ class Settings(BaseSettings):
             "users": self.mongodb_user_collection,
             "urls": self.mongodb_url_collection,
             "clicks": self.mongodb_click_collection,
+            "owner_rollups": self.mongodb_owner_rollup_collection,
+            "link_rollups": self.mongodb_link_rollup_collection,
+            "checkpoints": self.mongodb_checkpoint_collection,
+            "bulk_jobs": self.mongodb_bulk_job_collection,
         }
 
 
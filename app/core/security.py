@@ -1,23 +1,34 @@
 from datetime import UTC, datetime, timedelta
-from typing import Any
-
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from functools import cache
+from typing import TYPE_CHECKING, Any
 
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+# jose and passlib/bcrypt are imported on first use: redirect-only workers never need them,
+# and keeping them off the import path of ``app.main`` shortens worker cold start.
+
+
+@cache
+def password_context() -> "CryptContext":
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_context().verify(plain_password, hashed_password)
 
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return password_context().hash(password)
 
 
 def create_token(subject: str | int, expires_delta: timedelta, token_type: str) -> str:
+    from jose import jwt
+
     expire_at = datetime.now(UTC) + expires_delta
     claims: dict[str, Any] = {
         "sub": str(subject),
@@ -38,6 +49,8 @@ def create_refresh_token(subject: str | int) -> str:
 
 
 def decode_token(token: str) -> dict[str, Any]:
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
         return payload
@@ -1,18 +1,55 @@
 import asyncio
 
 from fastapi import FastAPI
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure
 
 from app.core.config import settings
+from app.core.logging import get_logger
 from app.db.mongo import get_database_from_state
 
+logger = get_logger(__name__)
 
-async def ensure_indexes(app: FastAPI) -> None:
-    database = get_database_from_state(app)
+CLICK_TTL_INDEX_NAME = "ix_clicks_created_at"
+# Bulk job records live as long as Celery keeps task results (``result_expires``, 1 day).
+BULK_JOB_TTL_SECONDS = 86400
+INDEX_OPTIONS_CONFLICT_CODES = {85, 86}
+
+
+async def _ensure_click_ttl_index(
+    database: AsyncIOMotorDatabase, clicks: AsyncIOMotorCollection
+) -> None:
+    ttl_seconds = settings.click_ttl_seconds
+    options = {"expireAfterSeconds": ttl_seconds} if ttl_seconds is not None else {}
+    try:
+        await clicks.create_index("created_at", name=CLICK_TTL_INDEX_NAME, **options)
+    except OperationFailure as exc:
+        if exc.code not in INDEX_OPTIONS_CONFLICT_CODES:
+            raise
+        if ttl_seconds is None:
+            logger.warning("click retention disabled but TTL index exists, leaving it in place")
+            return
+        await database.command(
+            "collMod",
+            clicks.name,
+            index={"name": CLICK_TTL_INDEX_NAME, "expireAfterSeconds": ttl_seconds},
+        )
+
+
+async def create_indexes(database: AsyncIOMotorDatabase) -> None:
+    """Create or reconcile every index the application relies on.
+
+    Run once per deploy with ``python -m app.cli.migrate``; API workers only do this at
+    startup when ``MONGODB_ENSURE_INDEXES_ON_STARTUP`` is set.
+    """
     db_config = settings.mongo_database_settings
 
     users = database[db_config["users"]]
     urls = database[db_config["urls"]]
     clicks = database[db_config["clicks"]]
+    owner_rollups = database[db_config["owner_rollups"]]
+    link_rollups = database[db_config["link_rollups"]]
+    bulk_jobs = database[db_config["bulk_jobs"]]
 
     await asyncio.gather(
         users.create_index("email", unique=True, name="ix_users_email_unique"),
@@ -32,5 +69,23 @@ async def ensure_indexes(app: FastAPI) -> None:
             name="ix_urls_expiration",
         ),
         clicks.create_index("short_code", name="ix_clicks_short_code"),
-        clicks.create_index("created_at", name="ix_clicks_created_at"),
+        _ensure_click_ttl_index(database, clicks),
+        owner_rollups.create_index(
+            [("owner_id", 1), ("day", 1)],
+            unique=True,
+            name="ix_owner_rollups_owner_day_unique",
+        ),
+        link_rollups.create_index(
+            [("owner_id", 1), ("day", 1), ("short_code", 1)],
+            unique=True,
+            name="ix_link_rollups_owner_day_code_unique",
+        ),
+        link_rollups.create_index("day", name="ix_link_rollups_day"),
+        bulk_jobs.create_index(
+            "created_at", expireAfterSeconds=BULK_JOB_TTL_SECONDS, name="ix_bulk_jobs_expiration"
+        ),
     )
+
+
+async def ensure_indexes(app: FastAPI) -> None:
+    await create_indexes(get_database_from_state(app))
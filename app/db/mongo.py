@@ -1,28 +1,127 @@
+import threading
+from collections import Counter
 from collections.abc import Callable
+from typing import Any
 
 from fastapi import FastAPI
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import monitoring
 
 from app.core.config import settings
 
 MONGO_CLIENT_STATE_KEY = "mongo_client"
 MONGO_DB_STATE_KEY = "mongo_db"
+MONGO_REDIRECT_CLIENT_STATE_KEY = "mongo_redirect_client"
+MONGO_REDIRECT_DB_STATE_KEY = "mongo_redirect_db"
+MONGO_METRICS_STATE_KEY = "mongo_metrics"
+
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener, monitoring.CommandListener):
+    """Counts pool and command events for one client profile.
+
+    PyMongo calls listeners from driver threads, so updates are guarded by a lock.
+    """
+
+    def __init__(self, profile: str) -> None:
+        self.profile = profile
+        self._lock = threading.Lock()
+        self._pool: Counter[str] = Counter()
+        self._commands: Counter[str] = Counter()
+        self._command_failures: Counter[str] = Counter()
+
+    def _bump(self, counter: Counter[str], key: str, amount: int = 1) -> None:
+        with self._lock:
+            counter[key] += amount
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            pool = dict(self._pool)
+            return {
+                "profile": self.profile,
+                "connections_open": pool.get("created", 0) - pool.get("closed", 0),
+                "checked_out": pool.get("checked_out", 0) - pool.get("checked_in", 0),
+                "pool": pool,
+                "commands": dict(self._commands),
+                "command_failures": dict(self._command_failures),
+            }
+
+    def pool_created(self, event: monitoring.PoolCreatedEvent) -> None:
+        self._bump(self._pool, "pools")
+
+    def pool_ready(self, event: monitoring.PoolReadyEvent) -> None:
+        pass
+
+    def pool_cleared(self, event: monitoring.PoolClearedEvent) -> None:
+        self._bump(self._pool, "cleared")
+
+    def pool_closed(self, event: monitoring.PoolClosedEvent) -> None:
+        pass
+
+    def connection_created(self, event: monitoring.ConnectionCreatedEvent) -> None:
+        self._bump(self._pool, "created")
+
+    def connection_ready(self, event: monitoring.ConnectionReadyEvent) -> None:
+        pass
+
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent) -> None:
+        self._bump(self._pool, "closed")
+
+    def connection_check_out_started(
+        self, event: monitoring.ConnectionCheckOutStartedEvent
+    ) -> None:
+        pass
+
+    def connection_check_out_failed(
+        self, event: monitoring.ConnectionCheckOutFailedEvent
+    ) -> None:
+        self._bump(self._pool, f"check_out_failed_{event.reason}")
+
+    def connection_checked_out(self, event: monitoring.ConnectionCheckedOutEvent) -> None:
+        self._bump(self._pool, "checked_out")
+
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent) -> None:
+        self._bump(self._pool, "checked_in")
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        self._bump(self._commands, event.command_name)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        pass
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._bump(self._command_failures, event.command_name)
+
+
+def _create_client(profile: str, metrics: MongoPoolMetrics) -> AsyncIOMotorClient:
+    return AsyncIOMotorClient(
+        str(settings.mongodb_uri),
+        tz_aware=True,
+        appname=f"url-shortener-{profile}",
+        event_listeners=[metrics],
+        **settings.mongo_client_profiles[profile],
+    )
 
 
 async def connect_to_mongo(app: FastAPI) -> None:
-    client = AsyncIOMotorClient(str(settings.mongodb_uri), tz_aware=True)
-    database = client[settings.mongodb_database]
+    metrics = {profile: MongoPoolMetrics(profile) for profile in ("admin", "redirect")}
+    client = _create_client("admin", metrics["admin"])
+    redirect_client = _create_client("redirect", metrics["redirect"])
     app.state.mongo_client = client
-    app.state.mongo_db = database
+    app.state.mongo_db = client[settings.mongodb_database]
+    app.state.mongo_redirect_client = redirect_client
+    app.state.mongo_redirect_db = redirect_client[settings.mongodb_database]
+    app.state.mongo_metrics = metrics
 
 
 async def close_mongo_connection(app: FastAPI) -> None:
-    client: AsyncIOMotorClient | None = getattr(app.state, MONGO_CLIENT_STATE_KEY, None)
-    if client:
-        client.close()
-        delattr(app.state, MONGO_CLIENT_STATE_KEY)
-    if hasattr(app.state, MONGO_DB_STATE_KEY):
-        delattr(app.state, MONGO_DB_STATE_KEY)
+    for client_key in (MONGO_CLIENT_STATE_KEY, MONGO_REDIRECT_CLIENT_STATE_KEY):
+        client: AsyncIOMotorClient | None = getattr(app.state, client_key, None)
+        if client:
+            client.close()
+            delattr(app.state, client_key)
+    for state_key in (MONGO_DB_STATE_KEY, MONGO_REDIRECT_DB_STATE_KEY, MONGO_METRICS_STATE_KEY):
+        if hasattr(app.state, state_key):
+            delattr(app.state, state_key)
 
 
 def get_database_from_state(app: FastAPI) -> AsyncIOMotorDatabase:
@@ -32,6 +131,20 @@ def get_database_from_state(app: FastAPI) -> AsyncIOMotorDatabase:
     return database
 
 
+def get_redirect_database_from_state(app: FastAPI) -> AsyncIOMotorDatabase:
+    database: AsyncIOMotorDatabase | None = getattr(app.state, MONGO_REDIRECT_DB_STATE_KEY, None)
+    if database is None:
+        raise RuntimeError("MongoDB redirect connection is not initialized")
+    return database
+
+
+def get_mongo_metrics_from_state(app: FastAPI) -> dict[str, MongoPoolMetrics]:
+    metrics: dict[str, MongoPoolMetrics] | None = getattr(app.state, MONGO_METRICS_STATE_KEY, None)
+    if metrics is None:
+        raise RuntimeError("MongoDB connection is not initialized")
+    return metrics
+
+
 def mongo_dependency(app: FastAPI) -> Callable[[], AsyncIOMotorDatabase]:
     def get_db() -> AsyncIOMotorDatabase:
         return get_database_from_state(app)
@@ -0,0 +1,82 @@
+import os
+import threading
+import time
+from pathlib import Path
+
+from fastapi import FastAPI
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.utils.snapshot import SnapshotReader, SnapshotRecord
+
+logger = get_logger(__name__)
+
+REDIRECT_SNAPSHOT_STATE_KEY = "redirect_snapshot"
+
+
+class RedirectSnapshot:
+    """Last-resort redirect table read from the exported snapshot file.
+
+    The file is only mapped the first time it is needed and is remapped when the exporter
+    replaces it. Snapshots older than ``max_staleness_seconds`` are never served.
+    """
+
+    def __init__(self, path: str | Path, max_staleness_seconds: int) -> None:
+        self._path = Path(path)
+        self._max_staleness_seconds = max_staleness_seconds
+        self._reader: SnapshotReader | None = None
+        self._mtime_ns: int | None = None
+        self._lock = threading.Lock()
+
+    def lookup(self, short_code: str) -> SnapshotRecord | None:
+        reader = self._current_reader()
+        if reader is None:
+            return None
+        if time.time() - reader.generated_at > self._max_staleness_seconds:
+            logger.warning("redirect snapshot too stale to serve", path=str(self._path))
+            return None
+        return reader.lookup(short_code)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._reader is not None:
+                self._reader.close()
+                self._reader = None
+
+    def _current_reader(self) -> SnapshotReader | None:
+        if self._max_staleness_seconds <= 0:
+            return None
+        try:
+            mtime_ns = os.stat(self._path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            if self._reader is None or mtime_ns != self._mtime_ns:
+                if self._reader is not None:
+                    self._reader.close()
+                try:
+                    self._reader = SnapshotReader(self._path)
+                except (OSError, ValueError) as exc:
+                    logger.warning("redirect snapshot unreadable", error=str(exc))
+                    self._reader = None
+                    return None
+                self._mtime_ns = mtime_ns
+            return self._reader
+
+
+async def init_redirect_snapshot(app: FastAPI) -> None:
+    app.state.redirect_snapshot = RedirectSnapshot(
+        settings.redirect_snapshot_path,
+        settings.redirect_snapshot_max_staleness_seconds,
+    )
+
+
+async def close_redirect_snapshot(app: FastAPI) -> None:
+    snapshot: RedirectSnapshot | None = getattr(app.state, REDIRECT_SNAPSHOT_STATE_KEY, None)
+    if snapshot:
+        snapshot.close()
+        delattr(app.state, REDIRECT_SNAPSHOT_STATE_KEY)
+
+
+def get_redirect_snapshot_from_state(app: FastAPI) -> RedirectSnapshot | None:
+    return getattr(app.state, REDIRECT_SNAPSHOT_STATE_KEY, None)
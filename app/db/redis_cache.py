@@ -0,0 +1,153 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from functools import partial
+from typing import Any
+from urllib.parse import urlsplit
+
+from fastapi import FastAPI
+from redis.asyncio import ConnectionPool, Redis
+from redis.asyncio.cluster import RedisCluster
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.utils.hash_ring import ConsistentHashRing
+
+CACHE_SHARDS_STATE_KEY = "cache_shards"
+
+CacheClient = Redis | RedisCluster
+
+
+class CacheShards:
+    """Routes ``url:*`` cache traffic to dedicated Redis nodes.
+
+    Either a single Redis Cluster client (slot routing is done by the server) or a set of
+    standalone nodes picked client-side with a consistent-hash ring on the short code.
+    Every node gets its own connection pool, separate from the broker/pub-sub connection.
+    """
+
+    def __init__(
+        self,
+        clients: dict[str, Redis],
+        cluster: RedisCluster | None = None,
+        ring_replicas: int = 128,
+    ) -> None:
+        if not clients and cluster is None:
+            raise ValueError("At least one cache node is required")
+        self._clients = clients
+        self._cluster = cluster
+        self._ring = ConsistentHashRing(clients.keys(), ring_replicas)
+
+    @property
+    def clients(self) -> list[CacheClient]:
+        if self._cluster is not None:
+            return [self._cluster]
+        return list(self._clients.values())
+
+    def name_for(self, short_code: str) -> str:
+        if self._cluster is not None:
+            return "cluster"
+        return self._ring.node_for(short_code)
+
+    def client_for(self, short_code: str) -> CacheClient:
+        if self._cluster is not None:
+            return self._cluster
+        return self._clients[self._ring.node_for(short_code)]
+
+    def group(self, short_codes: Iterable[str]) -> list[tuple[CacheClient, list[str]]]:
+        """Split codes by owning node so callers can pipeline one batch per node."""
+        if self._cluster is not None:
+            return [(self._cluster, list(short_codes))]
+        grouped: dict[str, list[str]] = {}
+        for short_code in short_codes:
+            grouped.setdefault(self._ring.node_for(short_code), []).append(short_code)
+        return [(self._clients[name], codes) for name, codes in grouped.items()]
+
+    async def health(self) -> list[dict[str, Any]]:
+        if self._cluster is not None:
+            cluster = self._cluster
+            if not cluster.get_nodes():
+                await cluster.initialize()
+            checks = [
+                _node_health(
+                    f"{node.host}:{node.port}",
+                    {
+                        "max_connections": node.max_connections,
+                        "created_connections": len(node._connections),
+                        "in_use_connections": len(node._connections) - len(node._free),
+                    },
+                    partial(cluster.ping, target_nodes=node),
+                )
+                for node in cluster.get_nodes()
+            ]
+        else:
+            checks = [
+                _node_health(_node_address(uri), _pool_stats(client.connection_pool), client.ping)
+                for uri, client in self._clients.items()
+            ]
+        return list(await asyncio.gather(*checks))
+
+    async def close(self) -> None:
+        if self._cluster is not None:
+            await self._cluster.close()
+        for client in self._clients.values():
+            await client.close()
+
+
+def _node_address(uri: str) -> str:
+    """``host:port`` of a node URI, so health output never echoes credentials."""
+    parsed = urlsplit(uri)
+    return f"{parsed.hostname}:{parsed.port or 6379}"
+
+
+def _pool_stats(pool: ConnectionPool) -> dict[str, Any]:
+    return {
+        "max_connections": getattr(pool, "max_connections", None),
+        "created_connections": getattr(pool, "_created_connections", None),
+        "in_use_connections": len(getattr(pool, "_in_use_connections", ())),
+    }
+
+
+async def _node_health(
+    address: str, pool_stats: dict[str, Any], ping: Callable[[], Awaitable[Any]]
+) -> dict[str, Any]:
+    report: dict[str, Any] = {"node": address, **pool_stats}
+    started = time.perf_counter()
+    try:
+        await ping()
+    except (RedisError, OSError) as exc:
+        report.update(status="down", error=str(exc))
+        return report
+    report.update(status="ok", ping_ms=round((time.perf_counter() - started) * 1000, 3))
+    return report
+
+
+def build_cache_shards() -> CacheShards:
+    uris = settings.cache_redis_uris
+    options: dict[str, Any] = {
+        "encoding": "utf-8",
+        "decode_responses": True,
+        "max_connections": settings.redis_cache_max_connections,
+    }
+    if settings.redis_cache_cluster:
+        return CacheShards({}, cluster=RedisCluster.from_url(uris[0], **options))
+    clients = {uri: Redis.from_url(uri, **options) for uri in uris}
+    return CacheShards(clients, ring_replicas=settings.redis_cache_ring_replicas)
+
+
+async def connect_cache_shards(app: FastAPI) -> None:
+    app.state.cache_shards = build_cache_shards()
+
+
+async def close_cache_shards(app: FastAPI) -> None:
+    shards: CacheShards | None = getattr(app.state, CACHE_SHARDS_STATE_KEY, None)
+    if shards:
+        await shards.close()
+        delattr(app.state, CACHE_SHARDS_STATE_KEY)
+
+
+def get_cache_shards_from_state(app: FastAPI) -> CacheShards:
+    shards: CacheShards | None = getattr(app.state, CACHE_SHARDS_STATE_KEY, None)
+    if shards is None:
+        raise RuntimeError("Cache shards are not initialized")
+    return shards
@@ -0,0 +1,431 @@
+import asyncio
+import contextlib
+import time
+from collections.abc import Mapping
+from pathlib import Path
+
+from fastapi import FastAPI
+from redis.asyncio import Redis
+from redis.asyncio.cluster import RedisCluster
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.redis import get_redis_from_state
+from app.db.redis_cache import CacheClient, CacheShards, get_cache_shards_from_state
+from app.utils.cache_record import CachedTarget
+from app.utils.local_cache import LocalTTLCache
+from app.utils.popularity import CountMinSketch, PopularityTtl
+from app.utils.shm_table import HotLinkTable
+
+logger = get_logger(__name__)
+
+# (record, ttl_seconds, force) as accepted by ``UrlCache.store``.
+CacheWrite = tuple[CachedTarget, int, bool]
+
+URL_CACHE_STATE_KEY = "url_cache"
+URL_CACHE_LISTENER_STATE_KEY = "url_cache_listener"
+HOT_LINKS_STATE_KEY = "hot_links"
+# How long a refresh-ahead claim blocks further refreshes of the same code if it never lands.
+REFRESH_CLAIM_SECONDS = 5.0
+
+# Writes the record unless the cached one carries a newer version. Legacy plain-string
+# entries fail to decode and are always overwritten.
+_COMPARE_AND_SET_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if current then
+  local ok, decoded = pcall(cjson.decode, current)
+  if ok and type(decoded) == 'table' and tonumber(decoded['v'])
+      and tonumber(decoded['v']) > tonumber(ARGV[2]) then
+    return 0
+  end
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[3])
+return 1
+"""
+
+# Deletes a tombstone (or missing marker) no newer than ARGV[1]; live records are kept.
+_CLEAR_TOMBSTONE_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if not current then
+  return 0
+end
+local ok, decoded = pcall(cjson.decode, current)
+if ok and type(decoded) == 'table' and decoded['d']
+    and (tonumber(decoded['v']) or 0) <= tonumber(ARGV[1]) then
+  redis.call('DEL', KEYS[1])
+  return 1
+end
+return 0
+"""
+
+
+# Seeds a missing click counter from the last flushed count, then claims one click if the
+# link is still under quota. Returns 1 when the click is allowed and 0 once exhausted.
+_CLAIM_SCRIPT = """
+redis.call('SET', KEYS[1], ARGV[2], 'NX', 'EX', ARGV[3])
+if tonumber(redis.call('GET', KEYS[1])) >= tonumber(ARGV[1]) then
+  return 0
+end
+redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+
+class UrlCache:
+    """Redis-backed redirect cache with a per-process LRU in front of it.
+
+    Every write carries the document version and goes through a compare-and-set script,
+    so a slow cache miss holding an old read can never overwrite a newer target. Records
+    live on the cache shards; updates and deletes are broadcast on a pub/sub channel of
+    the primary Redis so every worker drops its local copy. Under ``app.serve`` the
+    host-wide shared-memory hot table is consulted before anything else.
+
+    Links with a click quota keep a ``clicks:{<code>}`` counter on the primary Redis, not on
+    the cache nodes: those evict under memory pressure and do not persist, and a lost
+    counter would hand out its clicks again. Quota links are never kept in the local cache,
+    which cannot count.
+
+    With a popularity sketch, every redirect read is counted in process and ``ttl_for``
+    scales the TTL with recent popularity; reads of hot records close to expiry are
+    flagged for a refresh ahead of time.
+    """
+
+    def __init__(
+        self,
+        shards: CacheShards,
+        pubsub_redis: Redis,
+        local_cache: LocalTTLCache[CachedTarget] | None = None,
+        invalidation_channel: str = "url:invalidate",
+        hot_links: HotLinkTable | None = None,
+        counter_ttl_seconds: int = 30 * 86400,
+        popularity: CountMinSketch | None = None,
+        ttl_policy: PopularityTtl | None = None,
+    ) -> None:
+        self._shards = shards
+        self._redis = pubsub_redis
+        self._local = local_cache
+        self._hot = hot_links
+        self._channel = invalidation_channel
+        self._counter_ttl_seconds = counter_ttl_seconds
+        self._popularity = popularity if ttl_policy is not None else None
+        self._ttl_policy = ttl_policy
+        self._refresh_claims: dict[str, float] = {}
+        self._scripts = {
+            id(client): client.register_script(_COMPARE_AND_SET_SCRIPT)
+            for client in shards.clients
+        }
+        self._clear_scripts = {
+            id(client): client.register_script(_CLEAR_TOMBSTONE_SCRIPT)
+            for client in shards.clients
+        }
+        self._claim_script = pubsub_redis.register_script(_CLAIM_SCRIPT)
+
+    @staticmethod
+    def key(short_code: str) -> str:
+        # The hash tag keeps every per-code key in one Redis Cluster slot.
+        return f"url:{{{short_code}}}"
+
+    @staticmethod
+    def counter_key(short_code: str) -> str:
+        return f"clicks:{{{short_code}}}"
+
+    def _client(self, short_code: str) -> CacheClient:
+        return self._shards.client_for(short_code)
+
+    async def get(self, short_code: str) -> CachedTarget | None:
+        if self._hot is not None:
+            hot_target = self._hot.lookup(short_code)
+            if hot_target is not None:
+                return CachedTarget(target_url=hot_target)
+        if self._local is not None:
+            local = self._local.get(short_code)
+            if local is not None:
+                return local
+        record = CachedTarget.decode(await self._client(short_code).get(self.key(short_code)))
+        if record is not None:
+            self._remember(short_code, record)
+        return record
+
+    async def get_for_redirect(
+        self, short_code: str
+    ) -> tuple[CachedTarget | None, bool, bool]:
+        """Read the record for a redirect, claiming one click if the link has a quota.
+
+        Returns the record, whether the click is within quota (always true for links
+        without one), and whether the caller should refresh the cached record ahead of its
+        expiry. The hot table and local cache never hold quota links.
+        """
+        count = self._popularity.add(short_code) if self._popularity is not None else 0
+        if self._hot is not None:
+            hot_target = self._hot.lookup(short_code)
+            if hot_target is not None:
+                return CachedTarget(target_url=hot_target), True, False
+        if self._local is not None:
+            local = self._local.get(short_code)
+            if local is not None:
+                return local, True, False
+        key = self.key(short_code)
+        async with self._client(short_code).pipeline(transaction=False) as pipe:
+            raw, remaining_ms = await pipe.get(key).pttl(key).execute()
+        record = CachedTarget.decode(raw)
+        if record is None:
+            return None, True, False
+        self._remember(short_code, record)
+        if record.deleted or record.is_expired():
+            return record, True, False
+        allowed = await self.claim_click(short_code, record)
+        expires_in_ms = (
+            int((record.expires_at - time.time()) * 1000) if record.expires_at is not None else None
+        )
+        refresh = (
+            self._ttl_policy is not None
+            and self._ttl_policy.should_refresh(count, int(remaining_ms), expires_in_ms)
+            and self._claim_refresh(short_code)
+        )
+        return record, allowed, refresh
+
+    def ttl_for(self, short_code: str) -> int | None:
+        """Popularity-scaled TTL for ``short_code``; None when no policy is configured."""
+        if self._ttl_policy is None:
+            return None
+        count = self._popularity.estimate(short_code) if self._popularity is not None else 0
+        return self._ttl_policy.ttl_for(count)
+
+    def _claim_refresh(self, short_code: str) -> bool:
+        """Let one refresh per code through until it lands or its claim lapses."""
+        now = time.monotonic()
+        deadline = self._refresh_claims.get(short_code)
+        if deadline is not None and deadline > now:
+            return False
+        if len(self._refresh_claims) > 10000:
+            self._refresh_claims = {
+                code: until for code, until in self._refresh_claims.items() if until > now
+            }
+        self._refresh_claims[short_code] = now + REFRESH_CLAIM_SECONDS
+        return True
+
+    async def claim_click(self, short_code: str, record: CachedTarget) -> bool:
+        """Claim one click against the link's quota; true when it is within quota."""
+        if record.max_clicks is None:
+            return True
+        claimed = await self._claim_script(
+            keys=[self.counter_key(short_code)],
+            args=[record.max_clicks, record.clicks_used, self._counter_ttl_seconds],
+        )
+        return bool(claimed)
+
+    async def store(
+        self,
+        short_code: str,
+        record: CachedTarget,
+        ttl_seconds: int,
+        force: bool = False,
+    ) -> bool:
+        """Cache ``record``; unless ``force`` is set, older versions never replace newer ones."""
+        if ttl_seconds <= 0:
+            await self.delete(short_code)
+            return False
+        key = self.key(short_code)
+        client = self._client(short_code)
+        if force:
+            await client.set(key, record.encode(), ex=ttl_seconds)
+            stored = True
+        else:
+            compare_and_set = self._scripts[id(client)]
+            stored = bool(
+                await compare_and_set(
+                    keys=[key], args=[record.encode(), record.version, ttl_seconds]
+                )
+            )
+        if stored:
+            self._remember(short_code, record)
+        self._refresh_claims.pop(short_code, None)
+        return stored
+
+    async def store_many(self, entries: Mapping[str, CacheWrite]) -> int:
+        """Apply many ``store`` calls with one pipelined round trip per cache node.
+
+        Each entry is ``(record, ttl_seconds, force)`` with the same meaning as ``store``;
+        a non-positive TTL deletes the key. Returns how many records were written.
+        """
+        stored = 0
+        for client, short_codes in self._shards.group(entries):
+            for short_code in short_codes:
+                self._evict_local(short_code)
+            if isinstance(client, RedisCluster):
+                # Cluster pipelines cannot load scripts, so fall back to concurrent writes.
+                results = await asyncio.gather(
+                    *(self.store(code, *entries[code]) for code in short_codes)
+                )
+                stored += sum(1 for result in results if result)
+                continue
+            compare_and_set = self._scripts[id(client)]
+            async with client.pipeline(transaction=False) as pipe:
+                for short_code in short_codes:
+                    record, ttl_seconds, force = entries[short_code]
+                    key = self.key(short_code)
+                    if ttl_seconds <= 0:
+                        pipe.delete(key)
+                    elif force:
+                        pipe.set(key, record.encode(), ex=ttl_seconds)
+                    else:
+                        await compare_and_set(
+                            keys=[key],
+                            args=[record.encode(), record.version, ttl_seconds],
+                            client=pipe,
+                        )
+                results = await pipe.execute()
+            stored += sum(
+                1
+                for short_code, result in zip(short_codes, results, strict=True)
+                if entries[short_code][1] > 0 and result
+            )
+        return stored
+
+    async def clear_tombstone(self, short_code: str, version: int) -> bool:
+        """Drop a tombstone or missing marker no newer than ``version``; records are kept."""
+        self._evict_local(short_code)
+        client = self._client(short_code)
+        clear = self._clear_scripts[id(client)]
+        return bool(await clear(keys=[self.key(short_code)], args=[version]))
+
+    async def clear_tombstones(self, versions: Mapping[str, int]) -> int:
+        """Pipelined ``clear_tombstone`` per cache node; returns how many keys were dropped."""
+        cleared = 0
+        for client, short_codes in self._shards.group(versions):
+            if isinstance(client, RedisCluster):
+                results = await asyncio.gather(
+                    *(self.clear_tombstone(code, versions[code]) for code in short_codes)
+                )
+                cleared += sum(1 for result in results if result)
+                continue
+            for short_code in short_codes:
+                self._evict_local(short_code)
+            clear = self._clear_scripts[id(client)]
+            async with client.pipeline(transaction=False) as pipe:
+                for short_code in short_codes:
+                    await clear(
+                        keys=[self.key(short_code)], args=[versions[short_code]], client=pipe
+                    )
+                results = await pipe.execute()
+            cleared += sum(1 for result in results if result)
+        return cleared
+
+    async def delete(self, short_code: str) -> None:
+        self._evict_local(short_code)
+        await self._client(short_code).delete(self.key(short_code))
+
+    async def broadcast_invalidation(self, *short_codes: str) -> None:
+        for short_code in short_codes:
+            self._evict_local(short_code)
+        if not short_codes:
+            return
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for short_code in short_codes:
+                pipe.publish(self._channel, short_code)
+            await pipe.execute()
+
+    async def listen_for_invalidations(self) -> None:
+        """Evict local entries named on the invalidation channel until cancelled."""
+        if self._local is None and self._hot is None:
+            return
+        backoff = 0.5
+        while True:
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self._channel)
+                # Anything published while we were disconnected is lost, so start clean.
+                if self._local is not None:
+                    self._local.clear()
+                backoff = 0.5
+                async for message in pubsub.listen():
+                    data = message.get("data")
+                    if isinstance(data, bytes):
+                        data = data.decode("utf-8")
+                    if isinstance(data, str):
+                        self._evict_local(data)
+            except RedisError as exc:
+                logger.warning("cache invalidation listener disconnected", error=str(exc))
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                with contextlib.suppress(RedisError):
+                    await pubsub.reset()
+
+    def _evict_local(self, short_code: str) -> None:
+        if self._local is not None:
+            self._local.invalidate(short_code)
+        if self._hot is not None:
+            self._hot.invalidate(short_code)
+
+    def _remember(self, short_code: str, record: CachedTarget) -> None:
+        if self._local is None:
+            return
+        if record.deleted or record.max_clicks is not None:
+            self._local.invalidate(short_code)
+            return
+        ttl = None
+        if record.expires_at is not None:
+            ttl = record.expires_at - time.time()
+        self._local.set(short_code, record, ttl)
+
+
+async def init_url_cache(app: FastAPI) -> None:
+    local_cache: LocalTTLCache[CachedTarget] | None = None
+    if settings.local_cache_ttl_seconds > 0 and settings.local_cache_max_entries > 0:
+        local_cache = LocalTTLCache(
+            settings.local_cache_max_entries, settings.local_cache_ttl_seconds
+        )
+    hot_links: HotLinkTable | None = None
+    if settings.hot_table_path and Path(settings.hot_table_path).exists():
+        hot_links = HotLinkTable.open(settings.hot_table_path)
+        app.state.hot_links = hot_links
+    popularity: CountMinSketch | None = None
+    ttl_policy: PopularityTtl | None = None
+    if settings.cache_popularity_width > 0:
+        popularity = CountMinSketch(
+            settings.cache_popularity_width, settings.cache_popularity_depth
+        )
+        ttl_policy = PopularityTtl(
+            default_seconds=settings.redis_cache_ttl_seconds,
+            min_seconds=settings.cache_ttl_min_seconds,
+            max_seconds=settings.cache_ttl_max_seconds,
+            hot_threshold=settings.cache_hot_threshold,
+            refresh_ahead_ratio=settings.cache_refresh_ahead_ratio,
+        )
+    url_cache = UrlCache(
+        get_cache_shards_from_state(app),
+        get_redis_from_state(app),
+        local_cache,
+        settings.cache_invalidation_channel,
+        hot_links,
+        settings.click_quota_counter_ttl_seconds,
+        popularity,
+        ttl_policy,
+    )
+    app.state.url_cache = url_cache
+    app.state.url_cache_listener = asyncio.create_task(url_cache.listen_for_invalidations())
+
+
+async def close_url_cache(app: FastAPI) -> None:
+    listener: asyncio.Task | None = getattr(app.state, URL_CACHE_LISTENER_STATE_KEY, None)
+    if listener:
+        listener.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await listener
+        delattr(app.state, URL_CACHE_LISTENER_STATE_KEY)
+    hot_links: HotLinkTable | None = getattr(app.state, HOT_LINKS_STATE_KEY, None)
+    if hot_links:
+        hot_links.close()
+        delattr(app.state, HOT_LINKS_STATE_KEY)
+    if hasattr(app.state, URL_CACHE_STATE_KEY):
+        delattr(app.state, URL_CACHE_STATE_KEY)
+
+
+def get_url_cache_from_state(app: FastAPI) -> UrlCache:
+    url_cache: UrlCache | None = getattr(app.state, URL_CACHE_STATE_KEY, None)
+    if url_cache is None:
+        raise RuntimeError("URL cache is not initialized")
+    return url_cache
@@ -0,0 +1,74 @@
+import asyncio
+import importlib
+import time
+from collections.abc import Awaitable
+
+from fastapi import FastAPI
+from pymongo.errors import PyMongoError
+from redis.exceptions import RedisError
+
+from app.core.logging import get_logger
+from app.db.mongo import get_database_from_state, get_redirect_database_from_state
+from app.db.redis import get_redis_from_state
+from app.db.redis_cache import get_cache_shards_from_state
+
+logger = get_logger(__name__)
+
+TASK_WARMUP_STATE_KEY = "task_warmup"
+# Imported by the first redirect that enqueues a click; Celery dominates the import cost.
+DEFERRED_MODULES = ("app.tasks.analytics",)
+
+
+async def _timed(name: str, operation: Awaitable[object]) -> tuple[str, float | None]:
+    started = time.perf_counter()
+    try:
+        await operation
+    except (PyMongoError, RedisError, OSError) as exc:
+        logger.warning("connection warmup failed", target=name, error=str(exc))
+        return name, None
+    return name, round((time.perf_counter() - started) * 1000, 1)
+
+
+async def warm_connections(app: FastAPI, timeout_seconds: float) -> dict[str, float | None]:
+    """Open the Mongo and Redis connections concurrently before the worker takes traffic.
+
+    Clients connect lazily, so without this the first redirects pay for server selection
+    and every TCP/TLS handshake one after another. Failures are logged, never fatal: the
+    worker still starts and the request path reports errors as it does today.
+    """
+    if timeout_seconds <= 0:
+        return {}
+    pings = [
+        _timed("mongo_admin", get_database_from_state(app).command("ping")),
+        _timed("mongo_redirect", get_redirect_database_from_state(app).command("ping")),
+        _timed("redis", get_redis_from_state(app).ping()),
+    ]
+    for index, client in enumerate(get_cache_shards_from_state(app).clients):
+        pings.append(_timed(f"cache_{index}", client.ping()))
+    try:
+        results = dict(await asyncio.wait_for(asyncio.gather(*pings), timeout_seconds))
+    except TimeoutError:
+        logger.warning("connection warmup timed out", timeout_seconds=timeout_seconds)
+        return {}
+    logger.info("connections warmed", **{name: ms for name, ms in results.items()})
+    return results
+
+
+def start_deferred_imports(app: FastAPI) -> None:
+    """Import the Celery task modules in a thread once startup is done.
+
+    Keeps Celery off the startup path without making the first click pay for it.
+    """
+    app.state.task_warmup = asyncio.create_task(
+        asyncio.to_thread(lambda: [importlib.import_module(name) for name in DEFERRED_MODULES])
+    )
+
+
+async def stop_deferred_imports(app: FastAPI) -> None:
+    task: asyncio.Task | None = getattr(app.state, TASK_WARMUP_STATE_KEY, None)
+    if task:
+        try:
+            await task
+        except Exception as exc:  # pragma: no cover - import errors surface on first use
+            logger.warning("deferred import failed", error=str(exc))
+        delattr(app.state, TASK_WARMUP_STATE_KEY)
@@ -1,6 +1,7 @@
+import asyncio
 from contextlib import asynccontextmanager
 
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.responses import RedirectResponse
 
 from app.api import deps
@@ -9,8 +10,17 @@ from app.core.config import settings
 from app.core.logging import configure_logging
 from app.db.indexes import ensure_indexes
 from app.db.mongo import close_mongo_connection, connect_to_mongo
+from app.db.redirect_snapshot import close_redirect_snapshot, init_redirect_snapshot
 from app.db.redis import close_redis_connection, connect_to_redis
-from app.services.url_service import UrlService
+from app.db.redis_cache import close_cache_shards, connect_cache_shards
+from app.db.url_cache import close_url_cache, init_url_cache
+from app.db.warmup import start_deferred_imports, stop_deferred_imports, warm_connections
+from app.services.url_service import (
+    ClickQuotaExceededError,
+    ClickQuotaUnavailableError,
+    UrlService,
+)
+from app.utils.routing import RedirectContext
 
 
 @asynccontextmanager
@@ -18,10 +28,21 @@ async def lifespan(app: FastAPI):
     configure_logging()
     await connect_to_mongo(app)
     await connect_to_redis(app)
-    await ensure_indexes(app)
+    await connect_cache_shards(app)
+    startup = [warm_connections(app, settings.startup_warmup_timeout_seconds)]
+    if settings.mongodb_ensure_indexes_on_startup:
+        startup.append(ensure_indexes(app))
+    await asyncio.gather(*startup)
+    await init_url_cache(app)
+    await init_redirect_snapshot(app)
+    start_deferred_imports(app)
     try:
         yield
     finally:
+        await stop_deferred_imports(app)
+        await close_redirect_snapshot(app)
+        await close_url_cache(app)
+        await close_cache_shards(app)
         await close_redis_connection(app)
         await close_mongo_connection(app)
 
@@ -43,9 +64,20 @@ app = create_application()
 @app.get("/{short_code}", include_in_schema=False)
 async def redirect_short_url(
     short_code: str,
+    request: Request,
     url_service: UrlService = Depends(deps.get_url_service),
 ):
-    target = await url_service.resolve_short_code(short_code)
+    context = RedirectContext.from_headers(
+        request.headers,
+        request.client.host if request.client else None,
+        settings.routing_country_header,
+    )
+    try:
+        target = await url_service.resolve_short_code(short_code, context)
+    except ClickQuotaExceededError as exc:
+        raise HTTPException(status_code=410, detail="Click quota exhausted") from exc
+    except ClickQuotaUnavailableError as exc:
+        raise HTTPException(status_code=503, detail="Click quota temporarily unavailable") from exc
     if not target:
         raise HTTPException(status_code=404, detail="Short URL not found")
     return RedirectResponse(target, status_code=307)
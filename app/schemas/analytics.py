@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from app.schemas.common import MongoModel
+
+
+class DailyClicks(MongoModel):
+    day: datetime
+    clicks: int
+
+
+class TopLink(MongoModel):
+    short_code: str
+    clicks: int
+
+
+class OwnerAnalyticsSummary(MongoModel):
+    window_days: int
+    start: datetime
+    end: datetime
+    total_clicks: int
+    daily: list[DailyClicks]
+    top_links: list[TopLink]
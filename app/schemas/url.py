@@ -1,6 +1,8 @@
 from datetime import datetime
+from typing import Annotated, Any, Literal
 
-from pydantic import AnyUrl, Field
+from pydantic import AnyUrl, Field, StringConstraints, TypeAdapter, model_validator
+from typing_extensions import TypedDict
 
 from app.schemas.common import MongoModel, PyObjectId
 
@@ -9,14 +11,61 @@ class URLBase(MongoModel):
     target_url: AnyUrl
 
 
+RoutingName = Annotated[str, StringConstraints(pattern=r"^[A-Za-z0-9_-]{1,32}$")]
+
+
+class RoutingVariant(MongoModel):
+    name: RoutingName
+    target_url: AnyUrl
+    weight: int = Field(ge=1, le=10000)
+
+
+class RoutingRule(MongoModel):
+    """Sends matching visitors to ``target_url``; every given criterion must match."""
+
+    name: RoutingName
+    target_url: AnyUrl
+    countries: list[Annotated[str, StringConstraints(pattern=r"^[A-Za-z]{2}$")]] | None = None
+    devices: list[Literal["mobile", "tablet", "desktop", "bot"]] | None = None
+    languages: list[
+        Annotated[str, StringConstraints(pattern=r"^[A-Za-z]{1,8}(-[A-Za-z0-9]{1,8})*$")]
+    ] | None = None
+
+    @model_validator(mode="after")
+    def _require_criterion(self) -> "RoutingRule":
+        if not (self.countries or self.devices or self.languages):
+            raise ValueError("Routing rules need countries, devices or languages")
+        return self
+
+
+class URLRouting(MongoModel):
+    """Per-link routing: the first matching rule wins, otherwise a weighted variant."""
+
+    rules: list[RoutingRule] = Field(default_factory=list, max_length=32)
+    variants: list[RoutingVariant] = Field(default_factory=list, max_length=16)
+
+    @model_validator(mode="after")
+    def _require_routes(self) -> "URLRouting":
+        if not self.rules and not self.variants:
+            raise ValueError("Routing needs at least one rule or variant")
+        names = [route.name for route in (*self.rules, *self.variants)]
+        if len(names) != len(set(names)):
+            raise ValueError("Routing rule and variant names must be unique")
+        return self
+
+
 class URLCreate(URLBase):
     custom_alias: str | None = Field(default=None, min_length=4, max_length=32)
     expires_in_seconds: int | None = Field(default=None, ge=60, le=31536000)
+    max_clicks: int | None = Field(default=None, ge=1, le=1_000_000_000)
+    routing: URLRouting | None = None
 
 
 class URLUpdate(MongoModel):
     target_url: AnyUrl | None = None
     expires_in_seconds: int | None = Field(default=None, ge=60, le=31536000)
+    max_clicks: int | None = Field(default=None, ge=1, le=1_000_000_000)
+    routing: URLRouting | None = None
 
 
 class URLRead(URLBase):
@@ -27,6 +76,8 @@ class URLRead(URLBase):
     expires_at: datetime | None = None
     created_at: datetime
     updated_at: datetime
+    max_clicks: int | None = None
+    routing: URLRouting | None = None
 
 
 class URLAnalytics(MongoModel):
@@ -38,3 +89,62 @@ class URLAnalytics(MongoModel):
 
 class URLWithAnalytics(URLRead):
     analytics: URLAnalytics | None = None
+
+
+class URLBulkSelection(MongoModel):
+    """Links owned by the caller matching every given criterion."""
+
+    short_codes: list[str] | None = Field(default=None, min_length=1, max_length=10000)
+    created_before: datetime | None = None
+    code_prefix: str | None = Field(default=None, min_length=1, max_length=32)
+
+    @model_validator(mode="after")
+    def _require_criterion(self) -> "URLBulkSelection":
+        if self.short_codes is None and self.created_before is None and self.code_prefix is None:
+            raise ValueError("Provide short_codes, created_before or code_prefix")
+        return self
+
+
+class URLBulkDelete(URLBulkSelection):
+    pass
+
+
+class URLBulkExpire(URLBulkSelection):
+    expires_in_seconds: int = Field(ge=60, le=31536000)
+
+
+class URLBulkResult(MongoModel):
+    operation: Literal["delete", "expire"]
+    status: Literal["completed", "queued"]
+    matched: int
+    affected: int = 0
+    job_id: str | None = None
+
+
+class URLBulkJob(MongoModel):
+    job_id: str
+    status: Literal["queued", "running", "completed", "failed"]
+    operation: Literal["delete", "expire"] | None = None
+    total: int | None = None
+    processed: int = 0
+    affected: int = 0
+    error: str | None = None
+
+
+class URLReadRow(TypedDict):
+    """Pre-flattened ``URLRead`` used to serialize trusted documents without model instances."""
+
+    target_url: str
+    id: str
+    short_code: str
+    short_url: str
+    owner_id: str
+    expires_at: datetime | None
+    created_at: datetime
+    updated_at: datetime
+    max_clicks: int | None
+    routing: dict[str, Any] | None
+
+
+url_create_adapter = TypeAdapter(URLCreate)
+url_row_list_adapter = TypeAdapter(list[URLReadRow])
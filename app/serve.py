@@ -0,0 +1,170 @@
+"""Production entry point: ``python -m app.serve``.
+
+Runs ``app.main:app`` under a multi-worker uvicorn supervisor and owns the host-wide
+shared-memory hot link table. The supervisor process publishes the most clicked links
+into the table every ``HOT_TABLE_REFRESH_SECONDS``; workers map the same file read-mostly,
+so hot redirects are answered without Redis and table memory stays constant per host no
+matter how many workers run.
+"""
+
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+import uvicorn
+from pymongo import MongoClient
+from redis import Redis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.logging import configure_logging, get_logger
+from app.utils.shm_table import HotLinkEntry, HotLinkTable
+from app.utils.time import utc_day_range, utc_now
+
+logger = get_logger(__name__)
+
+
+def _default_table_path() -> Path:
+    shm = Path("/dev/shm")
+    directory = shm if shm.is_dir() else Path(tempfile.gettempdir())
+    return directory / f"url-shortener-hot-links-{settings.serve_port}"
+
+
+class HotLinkRefresher:
+    """Keeps the hot link table filled with the most clicked links of the recent window.
+
+    Invalidation broadcasts are applied to the table directly and remembered for the
+    duration of a refresh, so a snapshot built from a read that predates an update or
+    delete never republishes the stale target.
+    """
+
+    def __init__(self, table: HotLinkTable) -> None:
+        self._table = table
+        self._lock = threading.Lock()
+        self._invalidated_during_refresh: set[str] | None = None
+
+    def refresh_once(self, client: MongoClient) -> int:
+        with self._lock:
+            self._invalidated_during_refresh = set()
+        try:
+            entries = self._load_hot_links(client)
+            with self._lock:
+                stored = self._table.publish(entries)
+                for short_code in self._invalidated_during_refresh:
+                    self._table.invalidate(short_code)
+        finally:
+            with self._lock:
+                self._invalidated_during_refresh = None
+        return stored
+
+    def invalidate(self, short_code: str) -> None:
+        with self._lock:
+            self._table.invalidate(short_code)
+            if self._invalidated_during_refresh is not None:
+                self._invalidated_during_refresh.add(short_code)
+
+    def run(self, stop: threading.Event) -> None:
+        client = MongoClient(
+            str(settings.mongodb_uri), tz_aware=True, appname="url-shortener-serve"
+        )
+        try:
+            while not stop.is_set():
+                try:
+                    stored = self.refresh_once(client)
+                    logger.info("hot link table refreshed", entries=stored)
+                except Exception as exc:  # pragma: no cover - keep serving stale table
+                    logger.warning("hot link table refresh failed", error=str(exc))
+                stop.wait(settings.hot_table_refresh_seconds)
+        finally:
+            client.close()
+
+    def listen(self, stop: threading.Event) -> None:
+        while not stop.is_set():
+            redis = Redis.from_url(str(settings.redis_uri), decode_responses=True)
+            pubsub = redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(settings.cache_invalidation_channel)
+                while not stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and isinstance(message.get("data"), str):
+                        self.invalidate(message["data"])
+            except RedisError as exc:
+                logger.warning("hot link invalidation listener disconnected", error=str(exc))
+                stop.wait(1.0)
+            finally:
+                pubsub.close()
+                redis.close()
+
+    def _load_hot_links(self, client: MongoClient) -> list[HotLinkEntry]:
+        database = client[settings.mongodb_database]
+        db_config = settings.mongo_database_settings
+        window_start = utc_day_range(settings.hot_table_window_days)[0]
+        ranked = database[db_config["link_rollups"]].aggregate(
+            [
+                {"$match": {"day": {"$gte": window_start}}},
+                {"$group": {"_id": "$short_code", "clicks": {"$sum": "$clicks"}}},
+                {"$sort": {"clicks": -1}},
+                {"$limit": settings.hot_table_max_entries},
+            ]
+        )
+        codes = [doc["_id"] for doc in ranked]
+        if not codes:
+            return []
+
+        now = utc_now()
+        targets: dict[str, HotLinkEntry] = {}
+        for doc in database[db_config["urls"]].find(
+            # Quota links must reach Redis so every click is counted, and routed links need
+            # their rules, which the table does not hold.
+            {"short_code": {"$in": codes}, "max_clicks": None, "routing": None},
+            projection={"_id": 0, "short_code": 1, "target_url": 1, "expires_at": 1},
+        ):
+            expires_at = doc.get("expires_at")
+            if expires_at and expires_at <= now:
+                continue
+            targets[doc["short_code"]] = (
+                doc["short_code"],
+                doc["target_url"],
+                expires_at.timestamp() if expires_at else None,
+            )
+        return [targets[code] for code in codes if code in targets]
+
+
+def main() -> None:
+    configure_logging()
+    path = Path(settings.hot_table_path) if settings.hot_table_path else _default_table_path()
+    table = HotLinkTable.create(path, settings.hot_table_slots, settings.hot_table_heap_bytes)
+    # Workers are separate interpreters and read their settings from the environment.
+    os.environ["HOT_TABLE_PATH"] = str(path)
+
+    refresher = HotLinkRefresher(table)
+    stop = threading.Event()
+    threads = [
+        threading.Thread(target=target, args=(stop,), name=name, daemon=True)
+        for target, name in (
+            (refresher.run, "hot-link-refresh"),
+            (refresher.listen, "hot-link-listen"),
+        )
+    ]
+    for thread in threads:
+        thread.start()
+
+    try:
+        uvicorn.run(
+            "app.main:app",
+            host=settings.serve_host,
+            port=settings.serve_port,
+            workers=settings.serve_workers or os.cpu_count() or 1,
+            proxy_headers=True,
+        )
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=5)
+        table.close()
+        path.unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    main()
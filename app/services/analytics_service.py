@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+
+from app.schemas.analytics import DailyClicks, OwnerAnalyticsSummary, TopLink
+from app.utils.time import utc_day_range, utc_day_start, utc_now
+
+
+@dataclass(slots=True)
+class AnalyticsServiceConfig:
+    owner_rollup_collection: str
+
+
+class AnalyticsService:
+    """Owner-level analytics served from the daily rollups kept by the click pipeline.
+
+    Reads never touch raw click events or per-link rollups: daily totals and top links
+    both cost at most ``days`` owner rollup documents, however many links the owner has.
+    """
+
+    def __init__(self, database: AsyncIOMotorDatabase, config: AnalyticsServiceConfig) -> None:
+        self._owner_rollups: AsyncIOMotorCollection = database[config.owner_rollup_collection]
+
+    async def get_daily_clicks(self, owner_id: str, days: int) -> list[DailyClicks]:
+        owner_ref = self._to_object_id(owner_id)
+        window = utc_day_range(days)
+        cursor = self._owner_rollups.find(
+            {"owner_id": owner_ref, "day": {"$gte": window[0]}},
+            projection={"_id": 0, "day": 1, "clicks": 1},
+        )
+        counts: dict[datetime, int] = {}
+        async for doc in cursor:
+            counts[self._normalize_day(doc["day"])] = int(doc.get("clicks", 0))
+        return [DailyClicks(day=day, clicks=counts.get(day, 0)) for day in window]
+
+    async def get_top_links(self, owner_id: str, days: int, limit: int = 10) -> list[TopLink]:
+        """Merge the daily ``top`` lists kept on the owner rollups across the window.
+
+        Each day's list is exact. A link's window total only counts the days on which it
+        made that day's list, so links just below the cut on some days can be undercounted.
+        """
+        owner_ref = self._to_object_id(owner_id)
+        window = utc_day_range(days)
+        cursor = self._owner_rollups.find(
+            {"owner_id": owner_ref, "day": {"$gte": window[0]}},
+            projection={"_id": 0, "top": 1},
+        )
+        totals: dict[str, int] = {}
+        async for doc in cursor:
+            for entry in doc.get("top", ()):
+                short_code = entry["short_code"]
+                totals[short_code] = totals.get(short_code, 0) + int(entry["clicks"])
+        ranked = sorted(totals.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [TopLink(short_code=short_code, clicks=clicks) for short_code, clicks in ranked]
+
+    async def get_summary(
+        self, owner_id: str, days: int, top_limit: int = 10
+    ) -> OwnerAnalyticsSummary:
+        daily, top_links = await asyncio.gather(
+            self.get_daily_clicks(owner_id, days),
+            self.get_top_links(owner_id, days, top_limit),
+        )
+        return OwnerAnalyticsSummary(
+            window_days=days,
+            start=daily[0].day,
+            end=utc_now(),
+            total_clicks=sum(item.clicks for item in daily),
+            daily=daily,
+            top_links=top_links,
+        )
+
+    def _normalize_day(self, value: datetime) -> datetime:
+        return utc_day_start(value)
+
+    def _to_object_id(self, value: str) -> ObjectId:
+        if not ObjectId.is_valid(value):
+            raise ValueError("Invalid owner identifier")
+        return ObjectId(value)
@@ -0,0 +1,206 @@
+import asyncio
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure, PyMongoError
+from redis.exceptions import RedisError
+
+from app.core.logging import get_logger
+from app.db.url_cache import CacheWrite, UrlCache
+from app.utils.cache_record import CachedTarget
+
+logger = get_logger(__name__)
+
+CHECKPOINT_ID = "urls-cache-sync"
+# Only changes to these fields alter what a redirect returns; click counters are ignored.
+REDIRECT_FIELDS = ("target_url", "expires_at", "version", "max_clicks", "routing")
+# ChangeStreamHistoryLost / ChangeStreamFatalError: the token fell off the oplog.
+HISTORY_LOST_CODES = {280, 286}
+
+
+def change_stream_pipeline() -> list[dict[str, Any]]:
+    touched = [
+        {f"updateDescription.updatedFields.{field}": {"$exists": True}} for field in REDIRECT_FIELDS
+    ]
+    touched.append({"updateDescription.removedFields": {"$in": list(REDIRECT_FIELDS)}})
+    return [
+        {
+            "$match": {
+                "$or": [
+                    {"operationType": {"$in": ["insert", "replace", "delete"]}},
+                    {"operationType": "update", "$or": touched},
+                ]
+            }
+        },
+        {
+            "$project": {
+                "operationType": 1,
+                "documentKey": 1,
+                **{
+                    f"fullDocument.{field}": 1
+                    for field in ("short_code", "quota_used", *REDIRECT_FIELDS)
+                },
+                "fullDocumentBeforeChange.short_code": 1,
+                "fullDocumentBeforeChange.version": 1,
+            }
+        },
+    ]
+
+
+def plan_cache_changes(
+    events: Iterable[Mapping[str, Any]],
+) -> tuple[dict[str, tuple[CachedTarget, bool]], int]:
+    """Coalesce change events into the final cache record per short code.
+
+    Returns ``{code: (record, inserted)}`` plus the number of deletes that could not be
+    mapped to a code because no pre-image was recorded. Inserted records are not cached:
+    a new link only clears a stale tombstone or missing marker and is cached by its first
+    redirect, so bulk imports never flood the cache with links nobody has clicked.
+    Everything else goes through the version compare-and-set.
+    """
+    planned: dict[str, tuple[CachedTarget, bool]] = {}
+    unresolved = 0
+    for event in events:
+        operation = event.get("operationType")
+        if operation == "delete":
+            before = event.get("fullDocumentBeforeChange") or {}
+            short_code = before.get("short_code")
+            if short_code is None:
+                unresolved += 1
+                continue
+            tombstone = CachedTarget.tombstone(int(before.get("version", 0)) + 1)
+            planned[short_code] = (tombstone, False)
+        elif operation in ("insert", "replace", "update"):
+            # ``updateLookup`` yields the current document, or nothing once it was deleted;
+            # in that case the delete event follows and settles the entry.
+            doc = event.get("fullDocument") or {}
+            short_code = doc.get("short_code")
+            if short_code is None:
+                continue
+            planned[short_code] = (CachedTarget.from_document(doc), operation == "insert")
+    return planned, unresolved
+
+
+@dataclass(slots=True)
+class CacheSyncConfig:
+    url_collection: str
+    checkpoint_collection: str
+    cache_ttl_seconds: int
+    tombstone_ttl_seconds: int = 60
+    batch_size: int = 500
+    max_await_ms: int = 500
+    enable_pre_images: bool = True
+
+
+class UrlCacheSync:
+    """Mirrors every change to the ``urls`` collection into the redirect cache.
+
+    Tails a change stream so writes made outside the API (TTL expiry, admin scripts, other
+    services) reach Redis and every worker's local cache. Events are coalesced per code
+    and written in pipelined batches; the resume token is checkpointed in Mongo after each
+    batch so a restart picks up where the last run stopped instead of rescanning.
+    """
+
+    def __init__(
+        self, database: AsyncIOMotorDatabase, cache: UrlCache, config: CacheSyncConfig
+    ) -> None:
+        self._database = database
+        self._urls = database[config.url_collection]
+        self._checkpoints = database[config.checkpoint_collection]
+        self._cache = cache
+        self._config = config
+        self._resume_token: Mapping[str, Any] | None = None
+
+    async def run(self, stop: asyncio.Event) -> None:
+        if self._config.enable_pre_images:
+            await self._enable_pre_images()
+        backoff = 0.5
+        while not stop.is_set():
+            try:
+                await self._consume(stop)
+                backoff = 0.5
+            except OperationFailure as exc:
+                if exc.code not in HISTORY_LOST_CODES:
+                    raise
+                # Entries changed in the gap are bounded by the cache TTL.
+                logger.warning("cache sync resume token expired, restarting from now")
+                await self._save_checkpoint(None)
+            except (PyMongoError, RedisError) as exc:
+                logger.warning("cache sync interrupted", error=str(exc))
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+
+    async def apply(self, events: list[Mapping[str, Any]]) -> int:
+        planned, unresolved = plan_cache_changes(events)
+        if unresolved:
+            logger.warning("delete events without pre-image skipped", count=unresolved)
+        if not planned:
+            return 0
+        writes: dict[str, CacheWrite] = {}
+        inserted: dict[str, int] = {}
+        for short_code, (record, is_insert) in planned.items():
+            if is_insert:
+                inserted[short_code] = record.version
+            else:
+                writes[short_code] = (record, self._ttl(record), False)
+        if writes:
+            await self._cache.store_many(writes)
+        if inserted:
+            # A newer record or tombstone the API wrote since the insert is left alone.
+            await self._cache.clear_tombstones(inserted)
+        await self._cache.broadcast_invalidation(*planned)
+        return len(planned)
+
+    async def _consume(self, stop: asyncio.Event) -> None:
+        self._resume_token = await self._load_checkpoint()
+        async with self._urls.watch(
+            change_stream_pipeline(),
+            full_document="updateLookup",
+            full_document_before_change="whenAvailable",
+            start_after=self._resume_token,
+            max_await_time_ms=self._config.max_await_ms,
+            batch_size=self._config.batch_size,
+        ) as stream:
+            pending: list[Mapping[str, Any]] = []
+            while stream.alive and not stop.is_set():
+                change = await stream.try_next()
+                if change is not None:
+                    pending.append(change)
+                    if len(pending) < self._config.batch_size:
+                        continue
+                if pending:
+                    applied = await self.apply(pending)
+                    logger.debug("cache sync batch applied", events=len(pending), codes=applied)
+                    pending = []
+                if stream.resume_token != self._resume_token:
+                    await self._save_checkpoint(stream.resume_token)
+
+    def _ttl(self, record: CachedTarget) -> int:
+        if record.deleted:
+            return self._config.tombstone_ttl_seconds
+        if record.expires_at is not None:
+            return max(0, int(record.expires_at - datetime.now(UTC).timestamp()))
+        return self._config.cache_ttl_seconds
+
+    async def _enable_pre_images(self) -> None:
+        try:
+            await self._database.command(
+                "collMod", self._urls.name, changeStreamPreAndPostImages={"enabled": True}
+            )
+        except OperationFailure as exc:
+            logger.warning("could not enable change stream pre-images", error=str(exc))
+
+    async def _load_checkpoint(self) -> Mapping[str, Any] | None:
+        doc = await self._checkpoints.find_one({"_id": CHECKPOINT_ID})
+        return doc.get("resume_token") if doc else None
+
+    async def _save_checkpoint(self, token: Mapping[str, Any] | None) -> None:
+        await self._checkpoints.update_one(
+            {"_id": CHECKPOINT_ID},
+            {"$set": {"resume_token": token, "updated_at": datetime.now(UTC)}},
+            upsert=True,
+        )
+        self._resume_token = token
@@ -1,42 +1,149 @@
 from __future__ import annotations
 
+import asyncio
+import re
+from collections.abc import Callable, Coroutine
 from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
 from typing import Any
+from uuid import uuid4
 
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
-from redis.asyncio import Redis
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+from redis.exceptions import RedisError
 
 from app.core.logging import get_logger
-from app.schemas.url import URLAnalytics, URLCreate, URLRead, URLWithAnalytics
+from app.db.redirect_snapshot import RedirectSnapshot
+from app.db.url_cache import CacheWrite, UrlCache
+from app.schemas.url import (
+    URLAnalytics,
+    URLBulkDelete,
+    URLBulkExpire,
+    URLBulkJob,
+    URLBulkResult,
+    URLBulkSelection,
+    URLCreate,
+    URLRead,
+    URLUpdate,
+    URLWithAnalytics,
+    url_row_list_adapter,
+)
+from app.utils.cache_record import CachedTarget
 from app.utils.id_generator import generate_short_code
+from app.utils.routing import RedirectContext
 from app.utils.time import utc_now
 
 logger = get_logger(__name__)
 
+REDIRECT_PROJECTION = {
+    "_id": 0,
+    "target_url": 1,
+    "expires_at": 1,
+    "version": 1,
+    "max_clicks": 1,
+    "quota_used": 1,
+    "routing": 1,
+}
+URL_READ_PROJECTION = {
+    "short_code": 1,
+    "target_url": 1,
+    "owner_id": 1,
+    "expires_at": 1,
+    "created_at": 1,
+    "updated_at": 1,
+    "max_clicks": 1,
+    "routing": 1,
+    "click_count": 1,
+    "last_clicked_at": 1,
+}
+
+CREATE_CACHE_MODES = ("sync", "concurrent", "background")
+BULK_PROJECTION = {
+    "short_code": 1,
+    "target_url": 1,
+    "version": 1,
+    "max_clicks": 1,
+    "quota_used": 1,
+    "routing": 1,
+}
+
+# Rounds a bulk delete retries links whose version moved since the chunk was read.
+BULK_DELETE_ATTEMPTS = 3
+
+# Called with (processed, affected) after every bulk chunk.
+BulkProgress = Callable[[int, int], None]
+
+# Strong references to fire-and-forget cache writes so they are not garbage collected.
+_background_tasks: set[asyncio.Task[Any]] = set()
+
+
+class ClickQuotaExceededError(Exception):
+    """The link has used up its ``max_clicks``."""
+
+
+class ClickQuotaUnavailableError(Exception):
+    """The link has a click quota but its counter cannot be reached."""
+
 
 @dataclass(slots=True)
 class UrlServiceConfig:
     cache_ttl_seconds: int
     url_collection: str
-    click_collection: str
+    tombstone_ttl_seconds: int = 60
+    negative_ttl_seconds: int = 5
+    create_cache_mode: str = "sync"
+    bulk_chunk_size: int = 500
+    bulk_inline_limit: int = 1000
+    bulk_job_collection: str = "bulk_jobs"
+
+
+def build_bulk_filter(owner_ref: ObjectId, selection: URLBulkSelection) -> dict[str, Any]:
+    """Mongo filter for the caller's links matching every criterion of ``selection``."""
+    query: dict[str, Any] = {"owner_id": owner_ref}
+    clauses: list[dict[str, Any]] = []
+    if selection.short_codes is not None:
+        clauses.append({"short_code": {"$in": selection.short_codes}})
+    if selection.code_prefix is not None:
+        # Anchored, case-sensitive prefixes are answered from the short_code index.
+        clauses.append({"short_code": {"$regex": f"^{re.escape(selection.code_prefix)}"}})
+    if selection.created_before is not None:
+        clauses.append({"created_at": {"$lt": selection.created_before}})
+    if len(clauses) == 1:
+        query.update(clauses[0])
+    else:
+        query["$and"] = clauses
+    return query
 
 
 class UrlService:
     def __init__(
         self,
         database: AsyncIOMotorDatabase,
-        redis: Redis,
+        cache: UrlCache,
         config: UrlServiceConfig,
+        lookup_database: AsyncIOMotorDatabase | None = None,
+        snapshot: RedirectSnapshot | None = None,
     ) -> None:
         self._database = database
-        self._redis = redis
+        self._cache = cache
+        self._snapshot = snapshot
         self._url_collection: AsyncIOMotorCollection = database[config.url_collection]
-        self._click_collection: AsyncIOMotorCollection = database[config.click_collection]
+        # Redirect misses may read from a separately tuned (e.g. secondary-preferred) pool.
+        self._lookup_collection: AsyncIOMotorCollection = (
+            lookup_database[config.url_collection]
+            if lookup_database is not None
+            else self._url_collection
+        )
+        self._bulk_job_collection: AsyncIOMotorCollection = database[config.bulk_job_collection]
         self._config = config
+        if config.create_cache_mode not in CREATE_CACHE_MODES:
+            raise ValueError(f"Unknown create cache mode: {config.create_cache_mode}")
 
-    async def create_short_url(self, payload: URLCreate, owner_id: str) -> URLRead:
+    async def create_short_url(
+        self, payload: URLCreate, owner_id: str, base_url: str = ""
+    ) -> URLRead:
         short_code = await self._ensure_unique_short_code(payload.custom_alias)
         now = utc_now()
         expires_at = (
@@ -51,148 +158,509 @@ class UrlService:
             "target_url": str(payload.target_url),
             "owner_id": owner_ref,
             "expires_at": expires_at,
+            "max_clicks": payload.max_clicks,
+            "routing": payload.routing.model_dump(mode="json") if payload.routing else None,
+            "version": 1,
             "created_at": now,
             "updated_at": now,
         }
-        result = await self._url_collection.insert_one(doc)
+        record = CachedTarget.from_document(doc)
+        mode = self._config.create_cache_mode
+        if mode == "concurrent":
+            result = await self._insert_with_concurrent_cache(doc, record)
+        else:
+            result = await self._url_collection.insert_one(doc)
+            # A fresh document outranks any tombstone left by a previous owner of the alias.
+            cache_write = self._cache_target(short_code, record, force=True)
+            if mode == "background":
+                self._spawn(cache_write)
+            else:
+                await cache_write
         doc["_id"] = result.inserted_id
-        await self._cache_target(short_code, doc["target_url"], expires_at)
-        return self._document_to_schema(doc, short_url="")
+        return self._document_to_schema(doc, base_url)
 
-    async def list_urls(self, owner_id: str, limit: int = 100, skip: int = 0) -> list[URLRead]:
+    async def list_urls_json(
+        self, owner_id: str, limit: int = 100, skip: int = 0, base_url: str = ""
+    ) -> bytes:
+        """Serialize an owner's URLs straight to JSON bytes without building models.
+
+        Documents come from our own collection, so the rows are trusted and only need
+        encoding; the output matches ``list[URLRead]`` serialization.
+        """
+        rows = await self._list_url_rows(owner_id, limit, skip, base_url)
+        return url_row_list_adapter.dump_json(rows)
+
+    async def update_url(
+        self, owner_id: str, short_code: str, payload: URLUpdate, base_url: str = ""
+    ) -> URLRead | None:
+        """Apply the fields present in ``payload``; an explicit null clears the setting."""
         owner_ref = self._to_object_id(owner_id)
-        cursor = (
-            self._url_collection.find({"owner_id": owner_ref})
-            .sort("created_at", -1)
-            .skip(skip)
-            .limit(limit)
+        now = utc_now()
+        provided = payload.model_fields_set
+        updates: dict[str, Any] = {}
+        cleared: dict[str, str] = {}
+        if payload.target_url is not None:
+            updates["target_url"] = str(payload.target_url)
+        if payload.expires_in_seconds is not None:
+            updates["expires_at"] = now + timedelta(seconds=payload.expires_in_seconds)
+        elif "expires_in_seconds" in provided:
+            cleared["expires_at"] = ""
+        if payload.max_clicks is not None:
+            updates["max_clicks"] = payload.max_clicks
+        elif "max_clicks" in provided:
+            cleared["max_clicks"] = ""
+        if payload.routing is not None:
+            updates["routing"] = payload.routing.model_dump(mode="json")
+        elif "routing" in provided:
+            cleared["routing"] = ""
+        if not updates and not cleared:
+            raise ValueError("No fields to update")
+        updates["updated_at"] = now
+        change: dict[str, Any] = {"$set": updates, "$inc": {"version": 1}}
+        if cleared:
+            change["$unset"] = cleared
+
+        doc = await self._url_collection.find_one_and_update(
+            {"owner_id": owner_ref, "short_code": short_code},
+            change,
+            projection={**URL_READ_PROJECTION, "version": 1, "quota_used": 1},
+            return_document=ReturnDocument.AFTER,
         )
-        items = [self._document_to_schema(doc, short_url="") async for doc in cursor]
-        return items
+        if not doc:
+            return None
+        await self._cache_target(short_code, CachedTarget.from_document(doc))
+        await self._cache.broadcast_invalidation(short_code)
+        return self._document_to_schema(doc, base_url)
 
     async def delete_url(self, owner_id: str, short_code: str) -> bool:
         owner_ref = self._to_object_id(owner_id)
-        result = await self._url_collection.delete_one(
-            {"owner_id": owner_ref, "short_code": short_code}
+        doc = await self._url_collection.find_one_and_delete(
+            {"owner_id": owner_ref, "short_code": short_code},
+            projection={"_id": 0, "version": 1},
         )
-        await self._redis.delete(self._cache_key(short_code))
-        return result.deleted_count > 0
+        if not doc:
+            return False
+        tombstone = CachedTarget.tombstone(int(doc.get("version", 0)) + 1)
+        await self._cache.store(short_code, tombstone, self._config.tombstone_ttl_seconds)
+        await self._cache.broadcast_invalidation(short_code)
+        return True
 
-    async def resolve_short_code(self, short_code: str) -> str | None:
-        cache_key = self._cache_key(short_code)
-        cached_target = await self._redis.get(cache_key)
-        if cached_target:
-            self._enqueue_click(short_code)
-            return cached_target
+    async def submit_bulk(
+        self, owner_id: str, payload: URLBulkDelete | URLBulkExpire
+    ) -> URLBulkResult:
+        """Run a bulk delete/expire inline, or queue it when the selection is large."""
+        operation = "expire" if isinstance(payload, URLBulkExpire) else "delete"
+        query = build_bulk_filter(self._to_object_id(owner_id), payload)
+        matched = await self._url_collection.count_documents(query)
+        if matched > self._config.bulk_inline_limit:
+            job_id = await self._enqueue_bulk_job(owner_id, operation, payload, matched)
+            return URLBulkResult(
+                operation=operation, status="queued", matched=matched, job_id=job_id
+            )
+        affected = await self.run_bulk(owner_id, payload)
+        return URLBulkResult(
+            operation=operation, status="completed", matched=matched, affected=affected
+        )
 
-        doc = await self._url_collection.find_one({"short_code": short_code})
-        if not doc:
+    async def run_bulk(
+        self,
+        owner_id: str,
+        payload: URLBulkDelete | URLBulkExpire,
+        progress: BulkProgress | None = None,
+    ) -> int:
+        """Apply ``payload`` in ``_id``-ordered chunks; returns how many links changed.
+
+        Each chunk is one ``delete_many``/``update_many`` (deletes retry links updated
+        concurrently) followed by one pipelined cache write per node and one pipelined
+        invalidation broadcast.
+        """
+        query = build_bulk_filter(self._to_object_id(owner_id), payload)
+        chunk_size = self._config.bulk_chunk_size
+        last_id: ObjectId | None = None
+        processed = affected = 0
+        while True:
+            page_query = query if last_id is None else {**query, "_id": {"$gt": last_id}}
+            docs = (
+                await self._url_collection.find(page_query, projection=BULK_PROJECTION)
+                .sort("_id", 1)
+                .limit(chunk_size)
+                .to_list(chunk_size)
+            )
+            if not docs:
+                break
+            last_id = docs[-1]["_id"]
+            if isinstance(payload, URLBulkExpire):
+                affected += await self._expire_chunk(docs, payload.expires_in_seconds)
+            else:
+                affected += await self._delete_chunk(docs)
+            processed += len(docs)
+            if progress is not None:
+                progress(processed, affected)
+            if len(docs) < chunk_size:
+                break
+        return affected
+
+    async def get_bulk_job(self, owner_id: str, job_id: str) -> URLBulkJob | None:
+        """Progress of a queued bulk job; None for unknown jobs and jobs of other owners."""
+        job = await self._bulk_job_collection.find_one(
+            {"_id": job_id, "owner_id": self._to_object_id(owner_id)},
+            projection={"_id": 0, "operation": 1, "total": 1},
+        )
+        if job is None:
             return None
+        from app.tasks.bulk import bulk_job_status
 
-        expires_at: datetime | None = doc.get("expires_at")
-        if expires_at and expires_at <= datetime.now(UTC):
-            await self._redis.delete(cache_key)
+        return await asyncio.to_thread(bulk_job_status, job_id, job["operation"], job["total"])
+
+    async def resolve_short_code(
+        self, short_code: str, context: RedirectContext | None = None
+    ) -> str | None:
+        """Target for a redirect, or None when the link is missing or expired.
+
+        Links with routing rules are evaluated against ``context`` from the cached record
+        and the chosen variant is recorded with the click.
+
+        Raises ``ClickQuotaExceededError`` once a link with ``max_clicks`` is used up, and
+        ``ClickQuotaUnavailableError`` while its click counter cannot be reached, since the
+        click could not be counted.
+        """
+        try:
+            cached, allowed, refresh = await self._cache.get_for_redirect(short_code)
+        except RedisError as exc:
+            logger.warning("redirect cache unavailable", short_code=short_code, error=str(exc))
+            cached, allowed, refresh = None, True, False
+        if cached and cached.deleted:
             return None
+        if cached and cached.target_url and not cached.is_expired():
+            if refresh:
+                self._spawn(self._refresh_ahead(short_code))
+            if not allowed:
+                raise ClickQuotaExceededError(short_code)
+            return self._route(short_code, cached, context)
 
-        target_url = doc.get("target_url")
-        await self._cache_target(short_code, target_url, expires_at)
-        self._enqueue_click(short_code)
-        return target_url
+        try:
+            doc = await self._find_redirect_document(short_code)
+        except PyMongoError as exc:
+            target = self._resolve_from_snapshot(short_code)
+            if target is None:
+                raise
+            logger.warning("serving redirect from snapshot", short_code=short_code, error=str(exc))
+            return target
+        if not doc:
+            await self._cache_missing(short_code)
+            return None
 
-    async def get_url_with_analytics(self, owner_id: str, short_code: str) -> URLWithAnalytics | None:
+        expires_at: datetime | None = doc.get("expires_at")
+        record = CachedTarget.from_document(doc)
+        try:
+            if expires_at and expires_at <= datetime.now(UTC):
+                await self._cache.delete(short_code)
+                return None
+            await self._cache_target(short_code, record)
+        except RedisError as exc:
+            logger.warning("failed to cache redirect", short_code=short_code, error=str(exc))
+            if record.is_expired():
+                return None
+        try:
+            allowed = await self._cache.claim_click(short_code, record)
+        except RedisError as exc:
+            raise ClickQuotaUnavailableError(short_code) from exc
+        if not allowed:
+            raise ClickQuotaExceededError(short_code)
+        return self._route(short_code, record, context)
+
+    async def get_url_with_analytics(
+        self, owner_id: str, short_code: str, base_url: str = ""
+    ) -> URLWithAnalytics | None:
         owner_ref = self._to_object_id(owner_id)
         doc = await self._url_collection.find_one(
-            {"owner_id": owner_ref, "short_code": short_code}
+            {"owner_id": owner_ref, "short_code": short_code},
+            projection=URL_READ_PROJECTION,
         )
         if not doc:
             return None
-        analytics = await self._build_analytics(short_code)
-        url_schema = self._document_to_schema(doc, short_url="")
-        return URLWithAnalytics(**url_schema.model_dump(), analytics=analytics)
+        analytics = self._build_analytics(doc)
+        row = self._document_to_row(doc, base_url)
+        return URLWithAnalytics.model_validate({**row, "analytics": analytics})
 
     async def refresh_cache(self, short_code: str) -> None:
-        doc = await self._url_collection.find_one({"short_code": short_code})
+        doc = await self._url_collection.find_one(
+            {"short_code": short_code}, projection=REDIRECT_PROJECTION
+        )
         if not doc:
             return
-        await self._cache_target(
-            short_code,
-            doc.get("target_url"),
-            doc.get("expires_at"),
+        await self._cache_target(short_code, CachedTarget.from_document(doc))
+
+    async def _cache_missing(self, short_code: str) -> None:
+        """Briefly cache a miss so repeated lookups of an unknown code stay off Mongo.
+
+        The marker is a version-0 tombstone written through the version check, so a create
+        racing the lookup (version 1, forced) always wins over it.
+        """
+        ttl = self._config.negative_ttl_seconds
+        if ttl <= 0:
+            return
+        try:
+            await self._cache.store(short_code, CachedTarget.tombstone(0), ttl)
+        except RedisError as exc:
+            logger.warning("failed to cache redirect miss", short_code=short_code, error=str(exc))
+
+    async def _refresh_ahead(self, short_code: str) -> None:
+        """Re-read a hot link before its cached record expires so it never misses."""
+        doc = await self._find_redirect_document(short_code)
+        if doc:
+            await self._cache_target(short_code, CachedTarget.from_document(doc))
+
+    def _resolve_from_snapshot(self, short_code: str) -> str | None:
+        if self._snapshot is None:
+            return None
+        found = self._snapshot.lookup(short_code)
+        if found is None:
+            return None
+        target_url, expires_at = found
+        if expires_at is not None and expires_at <= datetime.now(UTC).timestamp():
+            return None
+        return target_url
+
+    async def _delete_chunk(self, docs: list[dict[str, Any]]) -> int:
+        """Delete the chunk and tombstone each link above the version it was deleted at.
+
+        Each delete is conditioned on the version that was read, so a link a PATCH moved on
+        in between survives the round, is re-read, and is retried with its new version.
+        Otherwise its tombstone would lose the compare-and-set to the newer cached record.
+        """
+        ttl = self._config.tombstone_ttl_seconds
+        writes: dict[str, CacheWrite] = {}
+        deleted = 0
+        pending = docs
+        for _ in range(BULK_DELETE_ATTEMPTS):
+            result = await self._url_collection.delete_many(
+                {"$or": [{"_id": doc["_id"], "version": doc.get("version")} for doc in pending]}
+            )
+            deleted += result.deleted_count
+            survivors = await self._url_collection.find(
+                {"_id": {"$in": [doc["_id"] for doc in pending]}}, projection=BULK_PROJECTION
+            ).to_list(len(pending))
+            surviving_ids = {doc["_id"] for doc in survivors}
+            for doc in pending:
+                if doc["_id"] not in surviving_ids:
+                    tombstone = CachedTarget.tombstone(int(doc.get("version", 0)) + 1)
+                    writes[doc["short_code"]] = (tombstone, ttl, False)
+            pending = survivors
+            if not pending:
+                break
+        else:
+            logger.warning(
+                "bulk delete skipped links that kept changing",
+                short_codes=[doc["short_code"] for doc in pending],
+            )
+        await self._cache.store_many(writes)
+        await self._cache.broadcast_invalidation(*writes)
+        return deleted
+
+    async def _expire_chunk(self, docs: list[dict[str, Any]], expires_in_seconds: int) -> int:
+        now = datetime.now(UTC)
+        expires_at = now + timedelta(seconds=expires_in_seconds)
+        ids = [doc["_id"] for doc in docs]
+        result = await self._url_collection.update_many(
+            {"_id": {"$in": ids}},
+            {"$set": {"expires_at": expires_at, "updated_at": now}, "$inc": {"version": 1}},
+        )
+        # Cache what Mongo holds now rather than assuming version + 1: a PATCH landing
+        # between the find and the update has bumped the version as well.
+        updated = await self._url_collection.find(
+            {"_id": {"$in": ids}}, projection={**BULK_PROJECTION, "expires_at": 1}
+        ).to_list(len(ids))
+        writes = {}
+        for doc in updated:
+            record = CachedTarget.from_document(doc)
+            writes[doc["short_code"]] = (
+                record,
+                self._cache_ttl(doc["short_code"], record),
+                False,
+            )
+        await self._cache.store_many(writes)
+        await self._cache.broadcast_invalidation(*writes)
+        return result.modified_count
+
+    async def _list_url_rows(
+        self, owner_id: str, limit: int, skip: int, base_url: str
+    ) -> list[dict[str, Any]]:
+        owner_ref = self._to_object_id(owner_id)
+        cursor = (
+            self._url_collection.find({"owner_id": owner_ref}, projection=URL_READ_PROJECTION)
+            .sort("created_at", -1)
+            .skip(skip)
+            .limit(limit)
+        )
+        return [self._document_to_row(doc, base_url) async for doc in cursor]
+
+    async def _find_redirect_document(self, short_code: str) -> dict[str, Any] | None:
+        doc = await self._lookup_collection.find_one(
+            {"short_code": short_code}, projection=REDIRECT_PROJECTION
         )
+        if doc is None and self._lookup_collection is not self._url_collection:
+            # A lagging secondary may not have a just-created code yet; confirm on primary.
+            doc = await self._url_collection.find_one(
+                {"short_code": short_code}, projection=REDIRECT_PROJECTION
+            )
+        return doc
 
     async def _ensure_unique_short_code(self, requested_alias: str | None) -> str:
         if requested_alias:
-            exists = await self._url_collection.find_one({"short_code": requested_alias})
+            exists = await self._url_collection.find_one(
+                {"short_code": requested_alias}, projection={"_id": 1}
+            )
             if exists:
                 raise ValueError("Custom alias already in use")
             return requested_alias
 
         for _ in range(5):
             candidate = generate_short_code()
-            exists = await self._url_collection.find_one({"short_code": candidate})
+            exists = await self._url_collection.find_one(
+                {"short_code": candidate}, projection={"_id": 1}
+            )
             if not exists:
                 return candidate
         raise RuntimeError("Unable to generate unique short code, try again")
 
+    async def _insert_with_concurrent_cache(self, doc: dict[str, Any], record: CachedTarget) -> Any:
+        """Overlap the insert with the cache write.
+
+        Like the other modes the write is forced over any tombstone of a deleted link with
+        the same alias. If the insert fails (e.g. another request won the alias), the entry
+        is removed again; the winner's record is then simply re-read from Mongo on a miss.
+        """
+        short_code = doc["short_code"]
+        insert_result, cache_result = await asyncio.gather(
+            self._url_collection.insert_one(doc),
+            self._cache_target(short_code, record, force=True),
+            return_exceptions=True,
+        )
+        if isinstance(insert_result, BaseException):
+            if not isinstance(cache_result, BaseException):
+                await self._cache.delete(short_code)
+            raise insert_result
+        if isinstance(cache_result, BaseException):
+            logger.warning(
+                "failed to cache new short url", short_code=short_code, error=str(cache_result)
+            )
+        return insert_result
+
     async def _cache_target(
         self,
         short_code: str,
-        target_url: str,
-        expires_at: datetime | None,
+        record: CachedTarget,
+        force: bool = False,
     ) -> None:
-        ttl = self._config.cache_ttl_seconds
-        if expires_at:
-            ttl = max(0, int((expires_at - datetime.now(UTC)).total_seconds()))
-        if ttl <= 0:
-            await self._redis.delete(self._cache_key(short_code))
-            return
-        await self._redis.setex(self._cache_key(short_code), ttl, target_url)
-
-    async def _build_analytics(self, short_code: str) -> URLAnalytics:
-        total_clicks = await self._click_collection.count_documents({"short_code": short_code})
-        last_click = await self._click_collection.find_one(
-            {"short_code": short_code}, sort=[("created_at", -1)]
+        await self._cache.store(
+            short_code, record, self._cache_ttl(short_code, record), force=force
         )
-        analytics = URLAnalytics(
-            short_code=short_code,
-            total_clicks=total_clicks,
-            last_clicked_at=last_click.get("created_at") if last_click else None,
+
+    def _cache_ttl(self, short_code: str, record: CachedTarget) -> int:
+        ttl = self._cache.ttl_for(short_code)
+        if record.expires_at is not None:
+            remaining = max(0, int(record.expires_at - datetime.now(UTC).timestamp()))
+            return remaining if ttl is None else min(ttl, remaining)
+        return self._config.cache_ttl_seconds if ttl is None else ttl
+
+    def _spawn(self, coro: Coroutine[Any, Any, None]) -> None:
+        task = asyncio.create_task(coro)
+        _background_tasks.add(task)
+        task.add_done_callback(self._finish_background_task)
+
+    @staticmethod
+    def _finish_background_task(task: asyncio.Task[Any]) -> None:
+        _background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("background cache write failed", error=str(task.exception()))
+
+    def _build_analytics(self, doc: dict[str, Any]) -> URLAnalytics:
+        """Lifetime counters kept on the URL document by the click task.
+
+        Raw click events are compacted after ``CLICK_RETENTION_DAYS``, so they cannot
+        answer lifetime totals.
+        """
+        last_clicked_at = doc.get("last_clicked_at")
+        return URLAnalytics(
+            short_code=str(doc.get("short_code")),
+            total_clicks=int(doc.get("click_count", 0)),
+            last_clicked_at=self._normalize_datetime(last_clicked_at) if last_clicked_at else None,
             unique_visitors=None,
         )
-        return analytics
 
-    def _document_to_schema(self, doc: dict[str, Any], short_url: str) -> URLRead:
+    def _document_to_schema(self, doc: dict[str, Any], base_url: str = "") -> URLRead:
+        return URLRead.model_validate(self._document_to_row(doc, base_url))
+
+    def _document_to_row(self, doc: dict[str, Any], base_url: str = "") -> dict[str, Any]:
+        """Flatten a URL document into ``URLRead`` field order with ``short_url`` built inline."""
         object_id = doc.get("_id")
         if object_id is None:
             raise ValueError("Document missing identifier")
         short_code = str(doc.get("short_code"))
-        target_url = str(doc.get("target_url"))
-        owner_value = doc.get("owner_id")
-        owner_str = str(owner_value)
-
-        data: dict[str, Any] = {
+        expires_at = doc.get("expires_at")
+        return {
+            "target_url": str(doc.get("target_url")),
             "id": str(object_id),
             "short_code": short_code,
-            "short_url": short_url or short_code,
-            "target_url": target_url,
-            "owner_id": owner_str,
-            "expires_at": self._normalize_datetime(doc.get("expires_at")) if doc.get("expires_at") else None,
+            "short_url": f"{base_url}/{short_code}" if base_url else short_code,
+            "owner_id": str(doc.get("owner_id")),
+            "expires_at": self._normalize_datetime(expires_at) if expires_at else None,
             "created_at": self._normalize_datetime(doc.get("created_at")),
             "updated_at": self._normalize_datetime(doc.get("updated_at")),
+            "max_clicks": doc.get("max_clicks"),
+            "routing": doc.get("routing"),
         }
-        return URLRead.model_validate(data)
 
-    def _cache_key(self, short_code: str) -> str:
-        return f"url:{short_code}"
+    def _route(
+        self, short_code: str, record: CachedTarget, context: RedirectContext | None
+    ) -> str | None:
+        if record.routing is None:
+            self._enqueue_click(short_code)
+            return record.target_url
+        variant, target_url = record.routing.choose(
+            short_code, context or RedirectContext(), record.target_url or ""
+        )
+        self._enqueue_click(short_code, variant)
+        return target_url
 
-    def _enqueue_click(self, short_code: str) -> None:
+    def _enqueue_click(self, short_code: str, variant: str | None = None) -> None:
         try:
             from app.tasks.analytics import log_click_event
 
-            log_click_event.delay(short_code)
+            if variant is None:
+                log_click_event.delay(short_code)
+            else:
+                log_click_event.delay(short_code, variant)
         except Exception as exc:  # pragma: no cover - best effort logging
             logger.warning("failed to enqueue click event", short_code=short_code, error=str(exc))
 
+    async def _enqueue_bulk_job(
+        self,
+        owner_id: str,
+        operation: str,
+        payload: URLBulkDelete | URLBulkExpire,
+        total: int,
+    ) -> str:
+        """Record the job's owner under a fresh id, then queue the task with that id."""
+        from app.tasks.bulk import bulk_manage_urls
+
+        job_id = str(uuid4())
+        await self._bulk_job_collection.insert_one(
+            {
+                "_id": job_id,
+                "owner_id": self._to_object_id(owner_id),
+                "operation": operation,
+                "total": total,
+                "created_at": utc_now(),
+            }
+        )
+        bulk_manage_urls.apply_async(
+            (owner_id, operation, payload.model_dump(mode="json", exclude_none=True), total),
+            task_id=job_id,
+        )
+        return job_id
+
     def _to_object_id(self, value: str) -> ObjectId:
         if not ObjectId.is_valid(value):
             raise ValueError("Invalid owner identifier")
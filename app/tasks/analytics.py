@@ -1,17 +1,92 @@
 from datetime import UTC, datetime
+from typing import Any
 
-from pymongo import MongoClient
+from pymongo import MongoClient, ReturnDocument
+from pymongo.collection import Collection
+from pymongo.database import Database
 
 from app.core.config import settings
 from app.tasks.celery_app import celery_app
+from app.utils.time import utc_day_start
+
+# Links kept in each owner's daily ``top`` list; the largest limit the top-links API accepts.
+TOP_LINKS_PER_DAY = 100
 
 
 def _get_client() -> MongoClient:
     return MongoClient(str(settings.mongodb_uri))
 
 
+def record_click_rollups(
+    database: Database,
+    owner_id: Any,
+    short_code: str,
+    clicked_at: datetime,
+    clicks: int = 1,
+    variant: str | None = None,
+) -> None:
+    """Fold clicks into the per-owner and per-link daily rollups read by the analytics API.
+
+    Routed clicks also count towards ``variants.<name>`` on the link rollup, and the link's
+    new day total is offered to the owner's daily ``top`` list.
+    """
+    db_config = settings.mongo_database_settings
+    day = utc_day_start(clicked_at)
+    owner_rollups = database[db_config["owner_rollups"]]
+    owner_rollups.update_one(
+        {"owner_id": owner_id, "day": day},
+        {"$inc": {"clicks": clicks}},
+        upsert=True,
+    )
+    link_increments = {"clicks": clicks}
+    if variant is not None:
+        link_increments[f"variants.{variant}"] = clicks
+    link_day = database[db_config["link_rollups"]].find_one_and_update(
+        {"owner_id": owner_id, "day": day, "short_code": short_code},
+        {"$inc": link_increments},
+        projection={"_id": 0, "clicks": 1},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    _offer_top_link(owner_rollups, owner_id, day, short_code, int(link_day["clicks"]))
+
+
+def _offer_top_link(
+    owner_rollups: Collection, owner_id: Any, day: datetime, short_code: str, clicks: int
+) -> None:
+    """Keep the owner's daily ``top`` list at the ``TOP_LINKS_PER_DAY`` most clicked links.
+
+    Day totals only grow, so a link dropped from a full list comes back with its whole
+    total once it outranks the last entry, and each day's list stays exact.
+    """
+    day_filter = {"owner_id": owner_id, "day": day}
+    for _ in range(3):
+        raised = owner_rollups.update_one(
+            {**day_filter, "top.short_code": short_code},
+            {"$max": {"top.$.clicks": clicks}},
+        )
+        if raised.matched_count:
+            return
+        # $push re-sorts the whole list, so entries raised above are reordered here too.
+        pushed = owner_rollups.update_one(
+            {**day_filter, "top.short_code": {"$ne": short_code}},
+            {
+                "$push": {
+                    "top": {
+                        "$each": [{"short_code": short_code, "clicks": clicks}],
+                        "$sort": {"clicks": -1},
+                        "$slice": TOP_LINKS_PER_DAY,
+                    }
+                }
+            },
+        )
+        if pushed.matched_count:
+            return
+        # A concurrent click pushed the link between the two updates; raise it instead.
+
+
 @celery_app.task(name="analytics.log_click")
-def log_click_event(short_code: str) -> None:
+def log_click_event(short_code: str, variant: str | None = None) -> None:
     client = _get_client()
     try:
         database = client[settings.mongodb_database]
@@ -19,18 +94,25 @@ def log_click_event(short_code: str) -> None:
         urls_collection = database[settings.mongo_database_settings["urls"]]
 
         now = datetime.now(UTC)
-        clicks_collection.insert_one(
-            {
-                "short_code": short_code,
-                "created_at": now,
-            }
-        )
-        urls_collection.update_one(
+        url = urls_collection.find_one_and_update(
             {"short_code": short_code},
             {
                 "$inc": {"click_count": 1},
                 "$set": {"last_clicked_at": now, "updated_at": now},
             },
+            projection={"_id": 0, "owner_id": 1},
+        )
+        owner_id = url.get("owner_id") if url else None
+        clicks_collection.insert_one(
+            {
+                "short_code": short_code,
+                "owner_id": owner_id,
+                "variant": variant,
+                "created_at": now,
+                "rolled_up": owner_id is not None,
+            }
         )
+        if owner_id is not None:
+            record_click_rollups(database, owner_id, short_code, now, variant=variant)
     finally:  # pragma: no branch - always executes
         client.close()
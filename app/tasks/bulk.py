@@ -0,0 +1,109 @@
+import asyncio
+from typing import Any
+
+from celery import Task
+from celery.result import AsyncResult
+from celery.states import PENDING, STARTED, SUCCESS
+from motor.motor_asyncio import AsyncIOMotorClient
+from redis.asyncio import Redis
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.redis_cache import build_cache_shards
+from app.db.url_cache import UrlCache
+from app.schemas.url import URLBulkDelete, URLBulkExpire, URLBulkJob
+from app.services.url_service import UrlService, UrlServiceConfig
+from app.tasks.celery_app import celery_app
+
+logger = get_logger(__name__)
+
+PROGRESS = "PROGRESS"
+_JOB_STATUS = {
+    PENDING: "queued",
+    STARTED: "running",
+    PROGRESS: "running",
+    SUCCESS: "completed",
+}
+
+
+async def _run_bulk(
+    task: Task, owner_id: str, payload: URLBulkDelete | URLBulkExpire, meta: dict[str, Any]
+) -> int:
+    client = AsyncIOMotorClient(str(settings.mongodb_uri), tz_aware=True)
+    redis = Redis.from_url(str(settings.redis_uri), encoding="utf-8", decode_responses=True)
+    shards = build_cache_shards()
+    db_config = settings.mongo_database_settings
+    service = UrlService(
+        client[settings.mongodb_database],
+        UrlCache(shards, redis, invalidation_channel=settings.cache_invalidation_channel),
+        UrlServiceConfig(
+            cache_ttl_seconds=settings.redis_cache_ttl_seconds,
+            url_collection=db_config["urls"],
+            tombstone_ttl_seconds=settings.cache_tombstone_ttl_seconds,
+            bulk_chunk_size=settings.url_bulk_chunk_size,
+            bulk_job_collection=db_config["bulk_jobs"],
+        ),
+    )
+
+    def report(processed: int, affected: int) -> None:
+        meta.update(processed=processed, affected=affected)
+        task.update_state(state=PROGRESS, meta=meta)
+
+    try:
+        return await service.run_bulk(owner_id, payload, progress=report)
+    finally:
+        await shards.close()
+        await redis.close()
+        client.close()
+
+
+@celery_app.task(name="urls.bulk_manage", bind=True)
+def bulk_manage_urls(
+    self: Task, owner_id: str, operation: str, selection: dict, total: int | None = None
+) -> dict:
+    """Background bulk delete/expire; progress is published through the result backend.
+
+    Failures are returned in the result (``error``) rather than raised, so the progress
+    recorded in the job metadata survives for the status endpoint.
+    """
+    payload = (
+        URLBulkExpire.model_validate(selection)
+        if operation == "expire"
+        else URLBulkDelete.model_validate(selection)
+    )
+    meta: dict[str, Any] = {
+        "owner_id": owner_id,
+        "operation": operation,
+        "total": total,
+        "processed": 0,
+        "affected": 0,
+    }
+    self.update_state(state=PROGRESS, meta=meta)
+    try:
+        asyncio.run(_run_bulk(self, owner_id, payload, meta))
+    except Exception as exc:
+        logger.warning("bulk url job failed", job_id=self.request.id, error=str(exc))
+        return {**meta, "error": str(exc)}
+    logger.info("bulk url job finished", job_id=self.request.id, **meta)
+    return meta
+
+
+def bulk_job_status(job_id: str, operation: str, total: int | None) -> URLBulkJob:
+    """Progress of a recorded bulk job from the result backend.
+
+    Ownership is checked against the job record before this is called; until the worker
+    picks the task up the backend has no entry and the job is reported as queued.
+    """
+    result = AsyncResult(job_id, app=celery_app)
+    state = result.state
+    meta = result.info if isinstance(result.info, dict) else {}
+    status = "failed" if meta.get("error") else _JOB_STATUS.get(state, "failed")
+    return URLBulkJob(
+        job_id=job_id,
+        status=status,
+        operation=meta.get("operation", operation),
+        total=meta.get("total", total),
+        processed=meta.get("processed", 0),
+        affected=meta.get("affected", 0),
+        error=meta.get("error"),
+    )
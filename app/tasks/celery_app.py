@@ -6,6 +6,14 @@ celery_app = Celery(
     "url_shortener",
     broker=str(settings.celery_broker_url),
     backend=str(settings.celery_result_backend),
+    include=[
+        "app.tasks.analytics",
+        "app.tasks.bulk",
+        "app.tasks.imports",
+        "app.tasks.quotas",
+        "app.tasks.retention",
+        "app.tasks.snapshot",
+    ],
 )
 
 celery_app.conf.update(
@@ -15,6 +23,20 @@ celery_app.conf.update(
     result_serializer="json",
     accept_content=["json"],
     timezone="UTC",
+    beat_schedule={
+        "compact-click-events": {
+            "task": "retention.compact_click_events",
+            "schedule": float(settings.click_compaction_interval_seconds),
+        },
+        "flush-click-quota-counters": {
+            "task": "quotas.flush_click_counters",
+            "schedule": float(settings.click_quota_flush_interval_seconds),
+        },
+        "export-redirect-snapshot": {
+            "task": "snapshot.export_redirects",
+            "schedule": float(settings.redirect_snapshot_interval_seconds),
+        },
+    },
 )
 
 
@@ -0,0 +1,334 @@
+import hashlib
+import json
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import IO, Any
+
+from bson import ObjectId
+from celery import Task
+from pydantic import TypeAdapter, ValidationError
+from pymongo import MongoClient
+from pymongo.collection import Collection
+from pymongo.database import Database
+from pymongo.errors import BulkWriteError
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.schemas.url import url_create_adapter
+from app.tasks.celery_app import celery_app
+from app.utils.id_generator import ALPHABET
+from app.utils.import_reader import ImportFormat, RawImportRow, iter_import_rows
+
+logger = get_logger(__name__)
+
+DUPLICATE_KEY_ERROR = 11000
+# Salted candidates tried for a row without an alias before it is rejected.
+DERIVED_CODE_ATTEMPTS = 5
+# Column names used by common shortener exports, mapped onto URLCreate fields.
+FIELD_ALIASES = {
+    "url": "target_url",
+    "long_url": "target_url",
+    "destination": "target_url",
+    "alias": "custom_alias",
+    "code": "custom_alias",
+    "short_code": "custom_alias",
+    "slug": "custom_alias",
+}
+URL_FIELDS = ("target_url", "custom_alias", "max_clicks", "routing")
+
+_optional_datetime_adapter = TypeAdapter(datetime | None)
+
+
+@dataclass(slots=True)
+class ImportStats:
+    rows: int = 0
+    inserted: int = 0
+    already_imported: int = 0
+    conflicts: int = 0
+    invalid: int = 0
+    offset: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def rows_per_second(self) -> float:
+        elapsed = time.monotonic() - self.started_at
+        return round(self.rows / elapsed, 1) if elapsed > 0 else 0.0
+
+    def report(self) -> dict[str, Any]:
+        counts = asdict(self)
+        counts.pop("started_at")
+        return {**counts, "rows_per_second": self.rows_per_second}
+
+
+def _get_client() -> MongoClient:
+    return MongoClient(str(settings.mongodb_uri), tz_aware=True)
+
+
+def _derived_code(seed: str, offset: int, attempt: int = 0, length: int = 8) -> str:
+    """Stable code for a row without an alias, so a replayed chunk finds its own rows.
+
+    ``attempt`` salts the hash when an earlier candidate belongs to another link.
+    """
+    key = f"{seed}:{offset}" if attempt == 0 else f"{seed}:{offset}:{attempt}"
+    value = int.from_bytes(hashlib.blake2b(key.encode()).digest()[:12], "big")
+    chars = []
+    for _ in range(length):
+        value, index = divmod(value, len(ALPHABET))
+        chars.append(ALPHABET[index])
+    return "".join(chars)
+
+
+def _build_document(row: RawImportRow, owner_ref: ObjectId, now: datetime) -> dict[str, Any]:
+    """Validate one row with the shared ``URLCreate`` adapter; raises ValueError.
+
+    ``short_code`` stays None for rows without an alias; ``_write_chunk`` derives one.
+    """
+    if row.fields is None:
+        raise ValueError(row.error or "unreadable row")
+    fields = {FIELD_ALIASES.get(name, name): value for name, value in row.fields.items()}
+    try:
+        payload = url_create_adapter.validate_python(
+            {name: fields[name] for name in URL_FIELDS if name in fields}
+        )
+        expires_at = _optional_datetime_adapter.validate_python(fields.get("expires_at"))
+        created_at = _optional_datetime_adapter.validate_python(fields.get("created_at"))
+    except ValidationError as exc:
+        raise ValueError(exc.errors(include_url=False)[0]["msg"]) from exc
+    if expires_at is not None:
+        expires_at = expires_at if expires_at.tzinfo else expires_at.replace(tzinfo=UTC)
+        if expires_at <= now:
+            raise ValueError("link already expired")
+    if created_at is not None and created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=UTC)
+    return {
+        "short_code": payload.custom_alias,
+        "target_url": str(payload.target_url),
+        "owner_id": owner_ref,
+        "expires_at": expires_at,
+        "max_clicks": payload.max_clicks,
+        "routing": payload.routing.model_dump(mode="json") if payload.routing else None,
+        "version": 1,
+        "created_at": created_at or now,
+        "updated_at": now,
+    }
+
+
+class _Rejects:
+    def __init__(self, handle: IO[str] | None) -> None:
+        self._handle = handle
+
+    def add(self, offset: int, reason: str, fields: dict[str, Any] | None = None) -> None:
+        if self._handle is not None:
+            record = {"offset": offset, "reason": reason, "row": fields}
+            self._handle.write(json.dumps(record, default=str) + "\n")
+
+
+def _write_chunk(
+    urls: Collection,
+    owner_ref: ObjectId,
+    seed: str,
+    chunk: list[tuple[RawImportRow, dict[str, Any]]],
+    stats: ImportStats,
+    rejects: _Rejects,
+) -> None:
+    """Insert a chunk with one ``$in`` lookup and one unordered ``insert_many`` per round.
+
+    A taken explicit alias is a conflict. A derived code taken by another link is derived
+    again with the next salt, and only those rows go through another round.
+    """
+    attempts: dict[int, int] = {}
+    for index, (row, doc) in enumerate(chunk):
+        if doc["short_code"] is None:
+            attempts[index] = 0
+            doc["short_code"] = _derived_code(seed, row.offset)
+    remaining = list(range(len(chunk)))
+    while remaining:
+        remaining = _write_round(urls, owner_ref, chunk, remaining, attempts, stats, rejects)
+        for index in remaining:
+            row, doc = chunk[index]
+            attempts[index] += 1
+            doc["short_code"] = _derived_code(seed, row.offset, attempts[index])
+
+
+def _write_round(
+    urls: Collection,
+    owner_ref: ObjectId,
+    chunk: list[tuple[RawImportRow, dict[str, Any]]],
+    indices: list[int],
+    attempts: dict[int, int],
+    stats: ImportStats,
+    rejects: _Rejects,
+) -> list[int]:
+    """Write ``chunk[indices]``; returns the rows whose derived code needs another try."""
+    existing = {
+        doc["short_code"]: doc
+        for doc in urls.find(
+            {"short_code": {"$in": [chunk[index][1]["short_code"] for index in indices]}},
+            projection={"_id": 0, "short_code": 1, "owner_id": 1, "target_url": 1},
+        )
+    }
+    retry: list[int] = []
+
+    def collided(index: int, reason: str) -> None:
+        row, _ = chunk[index]
+        if index not in attempts:
+            stats.conflicts += 1
+            rejects.add(row.offset, reason, row.fields)
+        elif attempts[index] + 1 < DERIVED_CODE_ATTEMPTS:
+            retry.append(index)
+        else:
+            stats.conflicts += 1
+            rejects.add(row.offset, "no free short code", row.fields)
+
+    pending: list[int] = []
+    seen: set[str] = set()
+    for index in indices:
+        row, doc = chunk[index]
+        short_code = doc["short_code"]
+        found = existing.get(short_code)
+        if found is not None:
+            if found.get("owner_id") == owner_ref and found.get("target_url") == doc["target_url"]:
+                # Written by an earlier run that stopped before its checkpoint.
+                stats.already_imported += 1
+            else:
+                collided(index, "alias already in use")
+            continue
+        if short_code in seen:
+            collided(index, "alias repeated in input")
+            continue
+        seen.add(short_code)
+        pending.append(index)
+    if not pending:
+        return retry
+    try:
+        result = urls.insert_many([chunk[index][1] for index in pending], ordered=False)
+        stats.inserted += len(result.inserted_ids)
+    except BulkWriteError as exc:
+        errors = exc.details.get("writeErrors", [])
+        if any(error.get("code") != DUPLICATE_KEY_ERROR for error in errors):
+            raise
+        # Codes taken between the lookup and the insert.
+        stats.inserted += exc.details.get("nInserted", 0)
+        for error in errors:
+            collided(pending[error["index"]], "alias already in use")
+    return retry
+
+
+def import_links(
+    database: Database,
+    path: str | Path,
+    owner_id: str,
+    fmt: ImportFormat | None = None,
+    checkpoint_id: str | None = None,
+    chunk_size: int = 1000,
+    rejects: IO[str] | None = None,
+    progress: Callable[[ImportStats], None] | None = None,
+) -> ImportStats:
+    """Stream links from ``path`` into the URL collection for ``owner_id``.
+
+    Memory is bounded by ``chunk_size`` whatever the file size. After every chunk the byte
+    offset and counters are checkpointed under ``import:<checkpoint_id>``; a later run with
+    the same id resumes from there, and rows re-read after a crash are recognised as
+    already imported instead of conflicting with themselves.
+    """
+    if not ObjectId.is_valid(owner_id):
+        raise ValueError("Invalid owner identifier")
+    owner_ref = ObjectId(owner_id)
+    path = Path(path)
+    db_config = settings.mongo_database_settings
+    urls = database[db_config["urls"]]
+    checkpoints = database[db_config["checkpoints"]]
+    checkpoint_key = f"import:{checkpoint_id or f'{owner_id}:{path.name}'}"
+
+    stats = ImportStats()
+    saved = checkpoints.find_one({"_id": checkpoint_key})
+    if saved:
+        for name, value in saved.get("stats", {}).items():
+            if name in ImportStats.__dataclass_fields__ and name != "started_at":
+                setattr(stats, name, value)
+        logger.info("resuming import", checkpoint=checkpoint_key, offset=stats.offset)
+    resumed_rows = stats.rows
+    stats.started_at = time.monotonic()
+
+    def save_checkpoint(completed: bool = False) -> None:
+        counts = stats.report()
+        counts.pop("rows_per_second")
+        checkpoints.update_one(
+            {"_id": checkpoint_key},
+            {
+                "$set": {
+                    "path": str(path),
+                    "stats": counts,
+                    "completed": completed,
+                    "updated_at": datetime.now(UTC),
+                }
+            },
+            upsert=True,
+        )
+
+    rejected = _Rejects(rejects)
+    chunk: list[tuple[RawImportRow, dict[str, Any]]] = []
+    next_offset = stats.offset
+
+    def flush() -> None:
+        if chunk:
+            _write_chunk(urls, owner_ref, checkpoint_key, chunk, stats, rejected)
+            chunk.clear()
+        stats.offset = next_offset
+        save_checkpoint()
+        if progress is not None:
+            progress(stats)
+
+    now = datetime.now(UTC)
+    for row in iter_import_rows(path, fmt, start_offset=stats.offset):
+        stats.rows += 1
+        next_offset = row.next_offset
+        try:
+            chunk.append((row, _build_document(row, owner_ref, now)))
+        except ValueError as exc:
+            stats.invalid += 1
+            rejected.add(row.offset, str(exc), row.fields)
+        if stats.rows % chunk_size == 0:
+            flush()
+            now = datetime.now(UTC)
+    flush()
+    save_checkpoint(completed=True)
+    logger.info(
+        "import finished",
+        checkpoint=checkpoint_key,
+        resumed_rows=resumed_rows,
+        **stats.report(),
+    )
+    return stats
+
+
+@celery_app.task(name="imports.load_links", bind=True)
+def load_links(
+    self: Task,
+    path: str,
+    owner_id: str,
+    fmt: ImportFormat | None = None,
+    checkpoint_id: str | None = None,
+) -> dict[str, Any]:
+    """Import a file visible to the worker; progress is published through the result backend."""
+
+    def report(stats: ImportStats) -> None:
+        self.update_state(state="PROGRESS", meta={"owner_id": owner_id, **stats.report()})
+
+    client = _get_client()
+    try:
+        stats = import_links(
+            client[settings.mongodb_database],
+            path,
+            owner_id,
+            fmt=fmt,
+            checkpoint_id=checkpoint_id,
+            chunk_size=settings.import_chunk_size,
+            progress=report,
+        )
+    finally:  # pragma: no branch - always executes
+        client.close()
+    return {"owner_id": owner_id, **stats.report()}
@@ -0,0 +1,78 @@
+from collections.abc import Iterator
+
+from pymongo import MongoClient, UpdateOne
+from pymongo.database import Database
+from redis import Redis
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.tasks.celery_app import celery_app
+
+logger = get_logger(__name__)
+
+COUNTER_PATTERN = "clicks:{*}"
+_COUNTER_PREFIX = "clicks:{"
+
+
+def _get_client() -> MongoClient:
+    return MongoClient(str(settings.mongodb_uri), tz_aware=True)
+
+
+def _counter_batches(redis: Redis, batch_size: int) -> Iterator[dict[str, int]]:
+    keys: list[str] = []
+    for key in redis.scan_iter(match=COUNTER_PATTERN, count=batch_size):
+        keys.append(key)
+        if len(keys) >= batch_size:
+            yield _read_counters(redis, keys)
+            keys = []
+    if keys:
+        yield _read_counters(redis, keys)
+
+
+def _read_counters(redis: Redis, keys: list[str]) -> dict[str, int]:
+    values = redis.mget(keys)
+    return {
+        key[len(_COUNTER_PREFIX) : -1]: int(value)
+        for key, value in zip(keys, values, strict=True)
+        if value is not None
+    }
+
+
+def flush_click_counters(database: Database, redis: Redis, batch_size: int) -> int:
+    """Persist Redis click counters into ``quota_used``; returns how many links changed.
+
+    ``$max`` keeps the stored count monotonic, so a counter that was lost and reseeded
+    from an older baseline never rolls the persisted value back.
+    """
+    urls = database[settings.mongo_database_settings["urls"]]
+    updated = 0
+    for counters in _counter_batches(redis, batch_size):
+        if not counters:
+            continue
+        result = urls.bulk_write(
+            [
+                UpdateOne(
+                    {"short_code": short_code, "max_clicks": {"$ne": None}},
+                    {"$max": {"quota_used": used}},
+                )
+                for short_code, used in counters.items()
+            ],
+            ordered=False,
+        )
+        updated += result.modified_count
+    return updated
+
+
+@celery_app.task(name="quotas.flush_click_counters")
+def flush_click_counters_task() -> int:
+    client = _get_client()
+    redis = Redis.from_url(str(settings.redis_uri), decode_responses=True)
+    try:
+        updated = flush_click_counters(
+            client[settings.mongodb_database], redis, settings.click_quota_flush_batch_size
+        )
+    finally:  # pragma: no branch - always executes
+        redis.close()
+        client.close()
+    logger.info("flushed click quota counters", updated=updated)
+    return updated
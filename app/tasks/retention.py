@@ -0,0 +1,152 @@
+import gzip
+import os
+from collections import Counter
+from collections.abc import Callable, Sequence
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from bson import json_util
+from pymongo import ASCENDING, MongoClient
+from pymongo.database import Database
+from redis import Redis
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.tasks.analytics import record_click_rollups
+from app.tasks.celery_app import celery_app
+from app.utils.time import utc_day_start
+
+logger = get_logger(__name__)
+
+RETENTION_LOCK_KEY = "lock:retention:click_events"
+
+
+def _get_client() -> MongoClient:
+    return MongoClient(str(settings.mongodb_uri), tz_aware=True)
+
+
+def _archive_batch(archive_dir: Path, batch: Sequence[dict[str, Any]]) -> Path:
+    """Write a batch as gzip NDJSON and fsync it before the caller deletes the raw events.
+
+    The file name is derived from the first event so a run that crashed between archiving
+    and deleting rewrites the same file instead of producing a duplicate archive.
+    """
+    first = batch[0]
+    created_at: datetime = first["created_at"]
+    name = f"click_events-{created_at:%Y%m%dT%H%M%S}-{first['_id']}.ndjson.gz"
+    path = archive_dir / name
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as handle:
+        for doc in batch:
+            handle.write(json_util.dumps(doc).encode("utf-8"))
+            handle.write(b"\n")
+        handle.flush()
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp_path, path)
+    return path
+
+
+def _roll_up_pending(database: Database, batch: Sequence[dict[str, Any]]) -> int:
+    """Fold events that predate ingest-time rollups into the daily rollup collections."""
+    pending = [doc for doc in batch if not doc.get("rolled_up")]
+    if not pending:
+        return 0
+
+    missing_owner = {doc["short_code"] for doc in pending if doc.get("owner_id") is None}
+    owners: dict[str, Any] = {}
+    if missing_owner:
+        urls = database[settings.mongo_database_settings["urls"]]
+        for url in urls.find(
+            {"short_code": {"$in": list(missing_owner)}},
+            projection={"_id": 0, "short_code": 1, "owner_id": 1},
+        ):
+            owners[url["short_code"]] = url.get("owner_id")
+
+    counts: Counter[tuple[Any, str, datetime]] = Counter()
+    for doc in pending:
+        owner_id = doc.get("owner_id") or owners.get(doc["short_code"])
+        if owner_id is None:
+            continue
+        counts[(owner_id, doc["short_code"], utc_day_start(doc["created_at"]))] += 1
+
+    for (owner_id, short_code, day), clicks in counts.items():
+        record_click_rollups(database, owner_id, short_code, day, clicks=clicks)
+    # Marked before the batch is deleted, so a run that dies in between does not count
+    # these events a second time when it retries the batch.
+    database[settings.mongo_database_settings["clicks"]].update_many(
+        {"_id": {"$in": [doc["_id"] for doc in pending]}}, {"$set": {"rolled_up": True}}
+    )
+    return sum(counts.values())
+
+
+def compact_events(
+    database: Database,
+    archive_dir: Path,
+    cutoff: datetime,
+    batch_size: int,
+    on_batch: Callable[[], None] | None = None,
+) -> dict[str, int]:
+    """Archive, roll up and delete events created before ``cutoff``, oldest first.
+
+    Every step is safe to repeat: a retried batch rewrites the same archive file and
+    skips events already marked ``rolled_up``.
+    """
+    clicks = database[settings.mongo_database_settings["clicks"]]
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    archived = 0
+    rolled_up = 0
+    while True:
+        batch = list(
+            clicks.find({"created_at": {"$lt": cutoff}})
+            .sort([("created_at", ASCENDING), ("_id", ASCENDING)])
+            .limit(batch_size)
+        )
+        if not batch:
+            break
+        path = _archive_batch(archive_dir, batch)
+        rolled_up += _roll_up_pending(database, batch)
+        clicks.delete_many({"_id": {"$in": [doc["_id"] for doc in batch]}})
+        archived += len(batch)
+        logger.info("archived click events", path=str(path), count=len(batch))
+        if on_batch is not None:
+            on_batch()
+    return {"archived": archived, "rolled_up": rolled_up}
+
+
+@celery_app.task(name="retention.compact_click_events")
+def compact_click_events() -> dict[str, int]:
+    """Archive, roll up, and delete raw click events older than the retention window.
+
+    Runs from Celery beat. The TTL index on ``created_at`` expires events only after the
+    additional grace period, so it acts as a safety net if this job stops running.
+    """
+    if settings.click_retention_days <= 0:
+        return {"archived": 0, "rolled_up": 0}
+
+    redis = Redis.from_url(str(settings.redis_uri))
+    lock = redis.lock(
+        RETENTION_LOCK_KEY,
+        timeout=settings.click_compaction_interval_seconds,
+        blocking=False,
+    )
+    if not lock.acquire():
+        logger.info("click compaction already running, skipping")
+        redis.close()
+        return {"archived": 0, "rolled_up": 0}
+
+    client = _get_client()
+    try:
+        cutoff = utc_day_start(datetime.now(UTC) - timedelta(days=settings.click_retention_days))
+        return compact_events(
+            client[settings.mongodb_database],
+            Path(settings.click_archive_dir),
+            cutoff,
+            settings.click_compaction_batch_size,
+            on_batch=lock.reacquire,
+        )
+    finally:  # pragma: no branch - always executes
+        client.close()
+        lock.release()
+        redis.close()
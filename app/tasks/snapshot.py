@@ -0,0 +1,60 @@
+from datetime import UTC, datetime
+from pathlib import Path
+
+from pymongo import ASCENDING, MongoClient
+from pymongo.database import Database
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.tasks.celery_app import celery_app
+from app.utils.snapshot import SnapshotWriter
+
+logger = get_logger(__name__)
+
+
+def _get_client() -> MongoClient:
+    return MongoClient(str(settings.mongodb_uri), tz_aware=True)
+
+
+def export_redirect_snapshot(database: Database, path: str | Path, page_records: int) -> int:
+    """Stream every active link, ordered by code, into the offline redirect snapshot."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    now = datetime.now(UTC)
+    cursor = (
+        database[settings.mongo_database_settings["urls"]]
+        .find(
+            # Quota links are left out: the snapshot cannot count their clicks.
+            {
+                "$or": [{"expires_at": None}, {"expires_at": {"$gt": now}}],
+                "max_clicks": None,
+            },
+            projection={"_id": 0, "short_code": 1, "target_url": 1, "expires_at": 1},
+        )
+        .sort("short_code", ASCENDING)
+        .batch_size(5000)
+    )
+    with SnapshotWriter(path, page_records=page_records) as writer:
+        for doc in cursor:
+            expires_at = doc.get("expires_at")
+            writer.add(
+                doc["short_code"],
+                doc["target_url"],
+                expires_at.timestamp() if expires_at else None,
+            )
+    return writer.record_count
+
+
+@celery_app.task(name="snapshot.export_redirects")
+def export_redirects() -> int:
+    client = _get_client()
+    try:
+        count = export_redirect_snapshot(
+            client[settings.mongodb_database],
+            settings.redirect_snapshot_path,
+            settings.redirect_snapshot_page_records,
+        )
+    finally:  # pragma: no branch - always executes
+        client.close()
+    logger.info("exported redirect snapshot", path=settings.redirect_snapshot_path, count=count)
+    return count
@@ -0,0 +1,87 @@
+import json
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+from app.utils.routing import CompiledRouting
+
+
+@dataclass(slots=True, frozen=True)
+class CachedTarget:
+    """Redirect record stored under ``url:<code>``.
+
+    ``version`` mirrors the ``version`` field of the URL document and only ever grows, so a
+    writer holding an older read can detect that it lost the race. Tombstones (``deleted``)
+    pin a removed code for a short time so a slow cache miss cannot resurrect it. Links with
+    a click quota carry ``max_clicks`` and the last click count flushed to Mongo
+    (``clicks_used``), which seeds the Redis counter if it was lost. Links with routing
+    rules carry them pre-compiled so a redirect never needs another lookup.
+    """
+
+    target_url: str | None
+    version: int = 0
+    expires_at: float | None = None
+    deleted: bool = False
+    max_clicks: int | None = None
+    clicks_used: int = 0
+    routing: CompiledRouting | None = None
+
+    @classmethod
+    def from_document(cls, doc: dict) -> "CachedTarget":
+        expires_at: datetime | None = doc.get("expires_at")
+        routing = doc.get("routing")
+        return cls(
+            target_url=doc.get("target_url"),
+            version=int(doc.get("version", 0)),
+            expires_at=expires_at.timestamp() if expires_at else None,
+            max_clicks=doc.get("max_clicks"),
+            clicks_used=int(doc.get("quota_used", 0)),
+            routing=CompiledRouting.compile(routing) if routing else None,
+        )
+
+    @classmethod
+    def tombstone(cls, version: int) -> "CachedTarget":
+        return cls(target_url=None, version=version, deleted=True)
+
+    def is_expired(self, now: float | None = None) -> bool:
+        if self.expires_at is None:
+            return False
+        return self.expires_at <= (time.time() if now is None else now)
+
+    def encode(self) -> str:
+        payload: dict[str, object] = {"v": self.version}
+        if self.deleted:
+            payload["d"] = 1
+        else:
+            payload["t"] = self.target_url
+        if self.expires_at is not None:
+            payload["e"] = self.expires_at
+        if self.max_clicks is not None:
+            payload["q"] = self.max_clicks
+            payload["c"] = self.clicks_used
+        if self.routing is not None:
+            payload["r"] = self.routing.compact()
+        return json.dumps(payload, separators=(",", ":"))
+
+    @classmethod
+    def decode(cls, raw: str | bytes | None) -> "CachedTarget | None":
+        if raw is None:
+            return None
+        if isinstance(raw, bytes):
+            raw = raw.decode("utf-8")
+        if not raw.startswith("{"):
+            # Entries written before versioning hold the bare target URL.
+            return cls(target_url=raw)
+        try:
+            payload = json.loads(raw)
+        except ValueError:
+            return None
+        return cls(
+            target_url=payload.get("t"),
+            version=int(payload.get("v", 0)),
+            expires_at=payload.get("e"),
+            deleted=bool(payload.get("d")),
+            max_clicks=payload.get("q"),
+            clicks_used=int(payload.get("c", 0)),
+            routing=CompiledRouting.from_compact(payload["r"]) if payload.get("r") else None,
+        )
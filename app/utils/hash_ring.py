@@ -0,0 +1,52 @@
+import bisect
+import hashlib
+from collections.abc import Iterable
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class ConsistentHashRing:
+    """Maps keys onto nodes so that adding or removing a node only moves ~1/N of the keys.
+
+    Each node is placed on the ring ``replicas`` times to even out the key distribution.
+    """
+
+    def __init__(self, nodes: Iterable[str], replicas: int = 128) -> None:
+        if replicas < 1:
+            raise ValueError("Hash ring needs at least one replica per node")
+        self._replicas = replicas
+        self._nodes: list[str] = []
+        self._points: list[int] = []
+        self._owners: list[str] = []
+        for node in nodes:
+            self.add_node(node)
+
+    @property
+    def nodes(self) -> list[str]:
+        return list(self._nodes)
+
+    def add_node(self, node: str) -> None:
+        if node in self._nodes:
+            raise ValueError(f"Node already on ring: {node}")
+        self._nodes.append(node)
+        for replica in range(self._replicas):
+            point = _hash(f"{node}#{replica}")
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._owners.insert(index, node)
+
+    def remove_node(self, node: str) -> None:
+        if node not in self._nodes:
+            raise ValueError(f"Node not on ring: {node}")
+        self._nodes.remove(node)
+        keep = [(p, o) for p, o in zip(self._points, self._owners, strict=True) if o != node]
+        self._points = [point for point, _ in keep]
+        self._owners = [owner for _, owner in keep]
+
+    def node_for(self, key: str) -> str:
+        if not self._points:
+            raise LookupError("Hash ring has no nodes")
+        index = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[index]
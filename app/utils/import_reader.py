@@ -0,0 +1,76 @@
+import csv
+import json
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Literal
+
+ImportFormat = Literal["csv", "ndjson"]
+
+_SUFFIX_FORMATS: dict[str, ImportFormat] = {
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".json": "ndjson",
+}
+
+
+@dataclass(slots=True)
+class RawImportRow:
+    """One input record; ``offset``/``next_offset`` are byte positions in the file."""
+
+    offset: int
+    next_offset: int
+    fields: dict[str, Any] | None
+    error: str | None = None
+
+
+def detect_format(path: str | Path) -> ImportFormat:
+    suffix = Path(path).suffix.lower()
+    if suffix not in _SUFFIX_FORMATS:
+        raise ValueError(f"Cannot infer import format from '{suffix}', pass csv or ndjson")
+    return _SUFFIX_FORMATS[suffix]
+
+
+def iter_import_rows(
+    path: str | Path, fmt: ImportFormat | None = None, start_offset: int = 0
+) -> Iterator[RawImportRow]:
+    """Lazily yield the records of a CSV (with header) or NDJSON file, one line at a time.
+
+    Byte offsets let a caller checkpoint ``next_offset`` and resume with ``start_offset``.
+    CSV fields must not contain embedded newlines. Empty CSV cells are dropped.
+    """
+    fmt = fmt or detect_format(path)
+    with open(path, "rb") as handle:
+        header: list[str] = []
+        if fmt == "csv":
+            header_line = handle.readline().decode("utf-8-sig")
+            header = [name.strip().lower() for name in next(csv.reader([header_line]), [])]
+            if not header:
+                return
+        if start_offset > handle.tell():
+            handle.seek(start_offset)
+        offset = handle.tell()
+        for raw in iter(handle.readline, b""):
+            position, offset = offset, offset + len(raw)
+            try:
+                text = raw.decode("utf-8").strip()
+            except UnicodeDecodeError:
+                yield RawImportRow(position, offset, None, "invalid UTF-8")
+                continue
+            if not text:
+                continue
+            if fmt == "csv":
+                values = next(csv.reader([text]))
+                fields = {name: value for name, value in zip(header, values) if value != ""}
+                yield RawImportRow(position, offset, fields)
+                continue
+            try:
+                fields = json.loads(text)
+            except ValueError as exc:
+                yield RawImportRow(position, offset, None, f"invalid JSON: {exc}")
+                continue
+            if not isinstance(fields, dict):
+                yield RawImportRow(position, offset, None, "expected a JSON object")
+                continue
+            yield RawImportRow(position, offset, fields)
@@ -0,0 +1,120 @@
+import hashlib
+import math
+import sys
+from array import array
+from dataclasses import dataclass
+from functools import lru_cache
+
+# Counters halved per row on each addition while an aging pass is running.
+AGE_CHUNK = 4096
+
+
+@lru_cache(maxsize=4)
+def _halving_mask(counters: int) -> int:
+    """Clears the bit each 32-bit counter receives from its neighbour when shifted as one int."""
+    counter = b"\xff\xff\xff\x7f" if sys.byteorder == "little" else b"\x7f\xff\xff\xff"
+    return int.from_bytes(counter * counters, sys.byteorder)
+
+
+def _halve(counters: memoryview) -> None:
+    data = counters.cast("B")
+    value = int.from_bytes(data, sys.byteorder) >> 1
+    data[:] = (value & _halving_mask(len(counters))).to_bytes(len(data), sys.byteorder)
+
+
+class CountMinSketch:
+    """Approximate per-key access counts in fixed memory (``depth * width`` counters).
+
+    Estimates never undercount; conservative update keeps overcounting from collisions
+    low. Every ``sample_size`` additions all counters are halved, so counts reflect recent
+    traffic and a link that was viral last week cools down again. The halving runs in place,
+    ``AGE_CHUNK`` counters per row on each addition, so no single request pays for a pass.
+    """
+
+    def __init__(self, width: int, depth: int = 4, sample_size: int | None = None) -> None:
+        if width < 1 or depth < 1 or depth > 16:
+            raise ValueError("Sketch needs width >= 1 and 1 <= depth <= 16")
+        self._width = width
+        self._depth = depth
+        self._rows = [array("I", bytes(4 * width)) for _ in range(depth)]
+        self._sample_size = sample_size or 10 * width
+        self._additions = 0
+        self._age_cursor: int | None = None
+
+    def _slots(self, key: str) -> list[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=4 * self._depth).digest()
+        return [
+            int.from_bytes(digest[4 * row : 4 * row + 4], "little") % self._width
+            for row in range(self._depth)
+        ]
+
+    def add(self, key: str) -> int:
+        """Count one access to ``key`` and return its new estimate."""
+        slots = self._slots(key)
+        estimate = min(row[slot] for row, slot in zip(self._rows, slots, strict=True)) + 1
+        if estimate <= 0xFFFFFFFF:
+            for row, slot in zip(self._rows, slots, strict=True):
+                if row[slot] < estimate:
+                    row[slot] = estimate
+        self._additions += 1
+        if self._additions >= self._sample_size and self._age_cursor is None:
+            self._additions = 0
+            self._age_cursor = 0
+        if self._age_cursor is not None:
+            self._age_step()
+        return estimate
+
+    def estimate(self, key: str) -> int:
+        return min(row[slot] for row, slot in zip(self._rows, self._slots(key), strict=True))
+
+    def _age_step(self) -> None:
+        start = self._age_cursor or 0
+        stop = min(start + AGE_CHUNK, self._width)
+        for row in self._rows:
+            _halve(memoryview(row)[start:stop])
+        self._age_cursor = stop if stop < self._width else None
+
+
+@dataclass(slots=True, frozen=True)
+class PopularityTtl:
+    """Maps a recent access count to a cache TTL.
+
+    A link seen once gets ``min_seconds``; from ``hot_threshold`` accesses on it gets
+    ``max_seconds``, and counts in between are interpolated on a log scale. A count of
+    zero means no signal (creates, updates) and keeps ``default_seconds``.
+    """
+
+    default_seconds: int
+    min_seconds: int
+    max_seconds: int
+    hot_threshold: int
+    refresh_ahead_ratio: float = 0.0
+
+    def ttl_for(self, count: int) -> int:
+        if count <= 0:
+            return self.default_seconds
+        if count >= self.hot_threshold:
+            return self.max_seconds
+        if count == 1 or self.hot_threshold <= 1:
+            return self.min_seconds
+        position = math.log(count) / math.log(self.hot_threshold)
+        return int(self.min_seconds * (self.max_seconds / self.min_seconds) ** position)
+
+    def is_hot(self, count: int) -> bool:
+        return count >= self.hot_threshold
+
+    def should_refresh(
+        self, count: int, remaining_ms: int, expires_in_ms: int | None = None
+    ) -> bool:
+        """True when a hot link's cached record is in the last stretch of its TTL.
+
+        The stretch is measured against the TTL a refresh would grant, which the link's own
+        expiry (``expires_in_ms``) caps: a record already cached up to that point cannot be
+        extended, so re-reading it would only cost a Mongo round trip.
+        """
+        if self.refresh_ahead_ratio <= 0 or not self.is_hot(count) or remaining_ms <= 0:
+            return False
+        granted_ms = self.max_seconds * 1000
+        if expires_in_ms is not None:
+            granted_ms = min(granted_ms, expires_in_ms)
+        return remaining_ms < granted_ms * self.refresh_ahead_ratio
@@ -0,0 +1,200 @@
+import bisect
+import hashlib
+import random
+import re
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+DEVICE_BITS = {"mobile": 1, "tablet": 2, "desktop": 4, "bot": 8}
+DEFAULT_VARIANT = "default"
+
+_BOT_UA = re.compile(r"bot|crawl|spider|slurp|preview|curl|wget|python-|httpclient|java/", re.I)
+_TABLET_UA = re.compile(r"ipad|tablet|kindle|silk/|playbook|android(?!.*mobi)", re.I)
+_MOBILE_UA = re.compile(r"mobi|iphone|ipod|android|blackberry|opera mini|windows phone", re.I)
+
+
+def classify_device(user_agent: str | None) -> str:
+    if not user_agent:
+        return "bot"
+    if _BOT_UA.search(user_agent):
+        return "bot"
+    if _TABLET_UA.search(user_agent):
+        return "tablet"
+    if _MOBILE_UA.search(user_agent):
+        return "mobile"
+    return "desktop"
+
+
+def parse_accept_language(header: str | None, limit: int = 6) -> tuple[str, ...]:
+    """Language tags in preference order, each followed by its primary subtag.
+
+    ``"pt-BR,en;q=0.8"`` becomes ``("pt-br", "pt", "en")``. Tags with ``q=0`` are dropped.
+    """
+    if not header:
+        return ()
+    weighted: list[tuple[float, int, str]] = []
+    for index, part in enumerate(header.split(",")[: limit * 2]):
+        tag, _, params = part.strip().partition(";")
+        tag = tag.strip().lower()
+        if not tag or tag == "*":
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                continue
+        if quality > 0:
+            weighted.append((-quality, index, tag))
+    tags: list[str] = []
+    for _, _, tag in sorted(weighted)[:limit]:
+        for candidate in (tag, tag.split("-", 1)[0]):
+            if candidate not in tags:
+                tags.append(candidate)
+    return tuple(tags)
+
+
+@dataclass(slots=True, frozen=True)
+class RedirectContext:
+    """What a redirect request offers the routing rules."""
+
+    country: str | None = None
+    device: str = "desktop"
+    languages: tuple[str, ...] = ()
+    visitor_key: str | None = None
+
+    @classmethod
+    def from_headers(
+        cls, headers: Mapping[str, str], client_host: str | None, country_header: str
+    ) -> "RedirectContext":
+        user_agent = headers.get("user-agent")
+        country = headers.get(country_header)
+        return cls(
+            country=country.strip().upper() if country else None,
+            device=classify_device(user_agent),
+            languages=parse_accept_language(headers.get("accept-language")),
+            visitor_key=f"{client_host or ''}|{user_agent or ''}",
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class CompiledRule:
+    name: str
+    target_url: str
+    countries: frozenset[str]
+    device_mask: int
+    languages: frozenset[str]
+
+    def matches(self, context: RedirectContext) -> bool:
+        if self.countries and context.country not in self.countries:
+            return False
+        if self.device_mask and not self.device_mask & DEVICE_BITS.get(context.device, 0):
+            return False
+        if self.languages and self.languages.isdisjoint(context.languages):
+            return False
+        return True
+
+
+@dataclass(slots=True, frozen=True)
+class CompiledRouting:
+    """Routing rules flattened for per-redirect evaluation.
+
+    Match rules are checked in order and the first hit wins; otherwise a weighted variant
+    is picked by bisecting cumulative weights, bucketed on the visitor so repeat visits
+    land on the same variant. ``compact`` is the JSON-friendly form kept in the cache.
+    """
+
+    rules: tuple[CompiledRule, ...] = ()
+    variant_names: tuple[str, ...] = ()
+    variant_targets: tuple[str, ...] = ()
+    cumulative_weights: tuple[int, ...] = ()
+
+    @classmethod
+    def compile(cls, routing: Mapping[str, Any]) -> "CompiledRouting":
+        """Build from the ``routing`` sub-document stored on a link."""
+        rules = tuple(
+            CompiledRule(
+                name=rule["name"],
+                target_url=str(rule["target_url"]),
+                countries=frozenset(code.upper() for code in rule.get("countries") or ()),
+                device_mask=_device_mask(rule.get("devices") or ()),
+                languages=frozenset(tag.lower() for tag in rule.get("languages") or ()),
+            )
+            for rule in routing.get("rules") or ()
+        )
+        variants = routing.get("variants") or ()
+        cumulative: list[int] = []
+        total = 0
+        for variant in variants:
+            total += int(variant["weight"])
+            cumulative.append(total)
+        return cls(
+            rules=rules,
+            variant_names=tuple(variant["name"] for variant in variants),
+            variant_targets=tuple(str(variant["target_url"]) for variant in variants),
+            cumulative_weights=tuple(cumulative),
+        )
+
+    @classmethod
+    def from_compact(cls, compact: Mapping[str, Any]) -> "CompiledRouting":
+        return cls(
+            rules=tuple(
+                CompiledRule(name, target, frozenset(countries), mask, frozenset(languages))
+                for name, target, countries, mask, languages in compact.get("m", ())
+            ),
+            variant_names=tuple(name for name, _, _ in compact.get("w", ())),
+            variant_targets=tuple(target for _, target, _ in compact.get("w", ())),
+            cumulative_weights=tuple(weight for _, _, weight in compact.get("w", ())),
+        )
+
+    def compact(self) -> dict[str, Any]:
+        return {
+            "m": [
+                [
+                    rule.name,
+                    rule.target_url,
+                    sorted(rule.countries),
+                    rule.device_mask,
+                    sorted(rule.languages),
+                ]
+                for rule in self.rules
+            ],
+            "w": [
+                list(variant)
+                for variant in zip(
+                    self.variant_names,
+                    self.variant_targets,
+                    self.cumulative_weights,
+                    strict=True,
+                )
+            ],
+        }
+
+    def choose(
+        self, short_code: str, context: RedirectContext, default_target: str
+    ) -> tuple[str, str]:
+        """Return ``(variant, target_url)`` for one redirect."""
+        for rule in self.rules:
+            if rule.matches(context):
+                return rule.name, rule.target_url
+        if not self.cumulative_weights:
+            return DEFAULT_VARIANT, default_target
+        total = self.cumulative_weights[-1]
+        if context.visitor_key:
+            digest = hashlib.blake2b(
+                f"{short_code}|{context.visitor_key}".encode(), digest_size=8
+            ).digest()
+            bucket = int.from_bytes(digest, "big") % total
+        else:
+            bucket = random.randrange(total)
+        index = bisect.bisect_right(self.cumulative_weights, bucket)
+        return self.variant_names[index], self.variant_targets[index]
+
+
+def _device_mask(devices: Iterable[str]) -> int:
+    mask = 0
+    for device in devices:
+        mask |= DEVICE_BITS[device]
+    return mask
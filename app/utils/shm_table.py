@@ -0,0 +1,188 @@
+import hashlib
+import mmap
+import os
+import struct
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
+MAGIC = b"HLT1"
+# magic, slot_count, heap_size, entry_count, generation, built_at
+_HEADER = struct.Struct("<4sIIIQd")
+HEADER_SIZE = 64
+# hash, heap offset, code length, target length, expires_at (0 = never), flags
+_SLOT = struct.Struct("<QIHHdB7x")
+SLOT_SIZE = _SLOT.size
+
+FLAG_LIVE = 1
+FLAG_INVALIDATED = 2
+
+_GENERATION_OFFSET = 16
+_GENERATION = struct.Struct("<Q")
+_FLAGS_OFFSET_IN_SLOT = 24
+
+HotLinkEntry = tuple[str, str, float | None]
+
+
+def _hash_code(short_code: str) -> int:
+    digest = hashlib.blake2b(short_code.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") or 1
+
+
+class HotLinkTable:
+    """Fixed-slot, open-addressing ``short_code -> target`` table in a memory-mapped file.
+
+    One process publishes snapshots; any number of processes map the same file and read
+    it without locks. Publishing uses a seqlock: the generation counter is odd while a
+    snapshot is being written, and readers discard any lookup that straddled a change, so
+    a reader sees either a complete snapshot or a miss, never a torn entry. Individual
+    entries can be invalidated in place by flipping their flag byte.
+    """
+
+    def __init__(self, path: Path, handle: mmap.mmap) -> None:
+        self.path = path
+        self._mmap = handle
+        magic, slot_count, heap_size, _, _, _ = _HEADER.unpack_from(handle, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not a hot link table: {path}")
+        self._slot_count = slot_count
+        self._heap_size = heap_size
+        self._slots_offset = HEADER_SIZE
+        self._heap_offset = HEADER_SIZE + slot_count * SLOT_SIZE
+
+    @classmethod
+    def create(cls, path: str | Path, slot_count: int, heap_size: int) -> "HotLinkTable":
+        if slot_count < 1 or heap_size < 1:
+            raise ValueError("Hot link table needs at least one slot and one heap byte")
+        path = Path(path)
+        size = HEADER_SIZE + slot_count * SLOT_SIZE + heap_size
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as handle:
+            handle.write(_HEADER.pack(MAGIC, slot_count, heap_size, 0, 0, 0.0))
+            handle.truncate(size)
+        os.replace(tmp_path, path)
+        return cls.open(path)
+
+    @classmethod
+    def open(cls, path: str | Path) -> "HotLinkTable":
+        path = Path(path)
+        with open(path, "r+b") as handle:
+            mapped = mmap.mmap(handle.fileno(), 0)
+        return cls(path, mapped)
+
+    @property
+    def slot_count(self) -> int:
+        return self._slot_count
+
+    @property
+    def generation(self) -> int:
+        return _GENERATION.unpack_from(self._mmap, _GENERATION_OFFSET)[0]
+
+    @property
+    def entry_count(self) -> int:
+        return _HEADER.unpack_from(self._mmap, 0)[3]
+
+    @property
+    def built_at(self) -> float:
+        return _HEADER.unpack_from(self._mmap, 0)[5]
+
+    def publish(self, entries: Iterable[HotLinkEntry]) -> int:
+        """Replace the table contents; returns how many entries fit.
+
+        Entries beyond half the slot count, or that no longer fit in the string heap,
+        are skipped so probe chains stay short.
+        """
+        max_entries = self._slot_count // 2
+        slots = bytearray(self._slot_count * SLOT_SIZE)
+        heap = bytearray()
+        stored = 0
+        for short_code, target_url, expires_at in entries:
+            if stored >= max_entries:
+                break
+            code_bytes = short_code.encode("utf-8")
+            target_bytes = target_url.encode("utf-8")
+            if len(code_bytes) > 0xFFFF or len(target_bytes) > 0xFFFF:
+                continue
+            if len(heap) + len(code_bytes) + len(target_bytes) > self._heap_size:
+                continue
+            code_hash = _hash_code(short_code)
+            index = code_hash % self._slot_count
+            while _SLOT.unpack_from(slots, index * SLOT_SIZE)[0]:
+                index = (index + 1) % self._slot_count
+            _SLOT.pack_into(
+                slots,
+                index * SLOT_SIZE,
+                code_hash,
+                len(heap),
+                len(code_bytes),
+                len(target_bytes),
+                expires_at or 0.0,
+                FLAG_LIVE,
+            )
+            heap += code_bytes + target_bytes
+            stored += 1
+
+        generation = self.generation
+        begin = generation + 1 if generation % 2 == 0 else generation
+        _GENERATION.pack_into(self._mmap, _GENERATION_OFFSET, begin)
+        self._mmap[self._slots_offset : self._heap_offset] = slots
+        self._mmap[self._heap_offset : self._heap_offset + len(heap)] = heap
+        _HEADER.pack_into(
+            self._mmap,
+            0,
+            MAGIC,
+            self._slot_count,
+            self._heap_size,
+            stored,
+            begin,
+            time.time(),
+        )
+        _GENERATION.pack_into(self._mmap, _GENERATION_OFFSET, begin + 1)
+        return stored
+
+    def lookup(self, short_code: str, now: float | None = None) -> str | None:
+        before = self.generation
+        if before % 2:
+            return None
+        found = self._find(short_code)
+        if found is None:
+            return None
+        _, offset, code_len, target_len, expires_at, flags = found
+        if flags != FLAG_LIVE:
+            return None
+        if expires_at and expires_at <= (time.time() if now is None else now):
+            return None
+        start = self._heap_offset + offset + code_len
+        target = bytes(self._mmap[start : start + target_len])
+        if self.generation != before:
+            return None
+        return target.decode("utf-8", errors="replace")
+
+    def invalidate(self, short_code: str) -> bool:
+        found = self._find(short_code)
+        if found is None:
+            return False
+        slot_offset = found[0]
+        self._mmap[slot_offset + _FLAGS_OFFSET_IN_SLOT] = FLAG_INVALIDATED
+        return True
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def _find(self, short_code: str) -> tuple[int, int, int, int, float, int] | None:
+        code_hash = _hash_code(short_code)
+        code_bytes = short_code.encode("utf-8")
+        index = code_hash % self._slot_count
+        for _ in range(self._slot_count):
+            slot_offset = self._slots_offset + index * SLOT_SIZE
+            slot_hash, offset, code_len, target_len, expires_at, flags = _SLOT.unpack_from(
+                self._mmap, slot_offset
+            )
+            if slot_hash == 0:
+                return None
+            if slot_hash == code_hash and code_len == len(code_bytes):
+                start = self._heap_offset + offset
+                if self._mmap[start : start + code_len] == code_bytes:
+                    return slot_offset, offset, code_len, target_len, expires_at, flags
+            index = (index + 1) % self._slot_count
+        return None
@@ -0,0 +1,161 @@
+import mmap
+import os
+import struct
+import time
+from pathlib import Path
+from types import TracebackType
+
+MAGIC = b"URLSNAP1"
+# magic, record_count, index_offset, index_count, page_records, generated_at
+_HEADER = struct.Struct("<8sQQIId")
+HEADER_SIZE = 64
+# code length, target length, expires_at (0 = never)
+_RECORD = struct.Struct("<HHd")
+_OFFSET = struct.Struct("<Q")
+
+SnapshotRecord = tuple[str, float | None]
+
+
+class SnapshotWriter:
+    """Streams ``short_code -> target`` records, in ascending code order, into a snapshot.
+
+    Layout: a fixed header, the sorted records, then a sparse index holding the byte offset
+    of every ``page_records``-th record. Only the sparse index is kept in memory while
+    writing. The file is written next to ``path`` and moved into place on ``close``.
+    """
+
+    def __init__(self, path: str | Path, page_records: int = 64) -> None:
+        if page_records < 1:
+            raise ValueError("Snapshot pages must hold at least one record")
+        self.path = Path(path)
+        self._tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        self._page_records = page_records
+        self._handle = open(self._tmp_path, "wb")
+        self._handle.write(b"\0" * HEADER_SIZE)
+        self._offsets: list[int] = []
+        self._count = 0
+        self._last_code: bytes | None = None
+
+    @property
+    def record_count(self) -> int:
+        return self._count
+
+    def add(self, short_code: str, target_url: str, expires_at: float | None = None) -> None:
+        code_bytes = short_code.encode("utf-8")
+        target_bytes = target_url.encode("utf-8")
+        if self._last_code is not None and code_bytes <= self._last_code:
+            raise ValueError("Snapshot records must be added in strictly ascending order")
+        if len(code_bytes) > 0xFFFF or len(target_bytes) > 0xFFFF:
+            raise ValueError("Snapshot record is too large")
+        if self._count % self._page_records == 0:
+            self._offsets.append(self._handle.tell())
+        self._handle.write(_RECORD.pack(len(code_bytes), len(target_bytes), expires_at or 0.0))
+        self._handle.write(code_bytes)
+        self._handle.write(target_bytes)
+        self._last_code = code_bytes
+        self._count += 1
+
+    def close(self) -> Path:
+        index_offset = self._handle.tell()
+        for offset in self._offsets:
+            self._handle.write(_OFFSET.pack(offset))
+        self._handle.seek(0)
+        self._handle.write(
+            _HEADER.pack(
+                MAGIC,
+                self._count,
+                index_offset,
+                len(self._offsets),
+                self._page_records,
+                time.time(),
+            )
+        )
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+        self._handle.close()
+        os.replace(self._tmp_path, self.path)
+        return self.path
+
+    def abort(self) -> None:
+        self._handle.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self) -> "SnapshotWriter":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class SnapshotReader:
+    """Memory-mapped, read-only view of a snapshot.
+
+    Lookups binary-search the on-disk sparse index and scan a single page, so resident
+    memory grows with the pages actually touched rather than with the table size.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as handle:
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, index_offset, index_count, page_records, generated_at = (
+            _HEADER.unpack_from(self._mmap, 0)
+        )
+        if magic != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"Not a redirect snapshot: {path}")
+        self.record_count = count
+        self.generated_at = generated_at
+        self._index_offset = index_offset
+        self._index_count = index_count
+        self._page_records = page_records
+
+    def lookup(self, short_code: str) -> SnapshotRecord | None:
+        code_bytes = short_code.encode("utf-8")
+        page = self._find_page(code_bytes)
+        if page is None:
+            return None
+        position = self._page_offset(page)
+        for _ in range(min(self._page_records, self.record_count - page * self._page_records)):
+            code, target, expires_at, position = self._read_record(position)
+            if code == code_bytes:
+                return target.decode("utf-8"), expires_at or None
+            if code > code_bytes:
+                return None
+        return None
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def _page_offset(self, page: int) -> int:
+        return _OFFSET.unpack_from(self._mmap, self._index_offset + page * _OFFSET.size)[0]
+
+    def _first_code(self, page: int) -> bytes:
+        return self._read_record(self._page_offset(page))[0]
+
+    def _find_page(self, code_bytes: bytes) -> int | None:
+        low, high = 0, self._index_count - 1
+        found: int | None = None
+        while low <= high:
+            middle = (low + high) // 2
+            if self._first_code(middle) <= code_bytes:
+                found = middle
+                low = middle + 1
+            else:
+                high = middle - 1
+        return found
+
+    def _read_record(self, position: int) -> tuple[bytes, bytes, float, int]:
+        code_len, target_len, expires_at = _RECORD.unpack_from(self._mmap, position)
+        start = position + _RECORD.size
+        code = self._mmap[start : start + code_len]
+        target = self._mmap[start + code_len : start + code_len + target_len]
+        return code, target, expires_at, start + code_len + target_len
@@ -1,5 +1,17 @@
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
 
 
 def utc_now() -> datetime:
     return datetime.now(UTC)
+
+
+def utc_day_start(value: datetime) -> datetime:
+    value = value if value.tzinfo else value.replace(tzinfo=UTC)
+    return value.astimezone(UTC).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def utc_day_range(days: int, end: datetime | None = None) -> list[datetime]:
+    if days < 1:
+        raise ValueError("Day range must cover at least one day")
+    last_day = utc_day_start(end or utc_now())
+    return [last_day - timedelta(days=offset) for offset in range(days - 1, -1, -1)]
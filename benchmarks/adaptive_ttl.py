@@ -0,0 +1,154 @@
+"""Redis hit ratio and memory for flat vs popularity-aware cache TTLs.
+
+Replays a trace (generated Zipfian by default, or ``--trace`` from
+``benchmarks.traffic``) against a simulated Redis on a virtual clock. A day of traffic
+replays in seconds, and the TTL decisions come from the same ``CountMinSketch`` and
+``PopularityTtl`` that the API uses. Memory is the number of resident keys times the
+measured size of one cached record. Pass ``--redis-uri`` to measure that size with
+``MEMORY USAGE`` on a real server; otherwise it is estimated.
+
+    python -m benchmarks.adaptive_ttl --links 200000 --requests 2000000 --rate 25
+"""
+
+import argparse
+import heapq
+import os
+import time
+from collections.abc import Iterable
+
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("REDIS_URI", "redis://localhost:6379/0")
+os.environ.setdefault("CELERY_BROKER_URL", "redis://localhost:6379/1")
+os.environ.setdefault("CELERY_RESULT_BACKEND", "redis://localhost:6379/2")
+
+from app.db.url_cache import UrlCache  # noqa: E402
+from app.utils.cache_record import CachedTarget  # noqa: E402
+from app.utils.popularity import CountMinSketch, PopularityTtl  # noqa: E402
+from benchmarks.traffic import read_trace, zipf_trace  # noqa: E402
+
+# Redis keeps a dict entry, key and value objects and an expires entry per key.
+ESTIMATED_KEY_OVERHEAD_BYTES = 96
+SAMPLE_RECORD = CachedTarget(
+    target_url="https://example.com/campaigns/2024/landing-page", version=3
+)
+
+
+def _record_bytes(redis_uri: str | None) -> int:
+    key = UrlCache.key("z0000000")
+    value = SAMPLE_RECORD.encode()
+    if not redis_uri:
+        return len(key) + len(value) + ESTIMATED_KEY_OVERHEAD_BYTES
+    from redis import Redis
+
+    client = Redis.from_url(redis_uri)
+    try:
+        client.set(key, value, ex=60)
+        return int(client.memory_usage(key, samples=0))
+    finally:
+        client.delete(key)
+        client.close()
+
+
+def simulate(
+    trace: Iterable[tuple[float, str]],
+    flat_ttl: int,
+    policy: PopularityTtl | None,
+    workers: int,
+    sketch_width: int,
+    sample_seconds: float = 60.0,
+) -> dict[str, float]:
+    """Replay ``trace`` against a TTL-only cache; returns hit ratio and key counts."""
+    sketches = [CountMinSketch(sketch_width) for _ in range(workers)] if policy else []
+    expiry: dict[str, float] = {}
+    deadlines: list[tuple[float, str]] = []
+    hits = misses = refreshes = 0
+    resident_samples: list[int] = []
+    next_sample = sample_seconds
+    for index, (now, code) in enumerate(trace):
+        while deadlines and deadlines[0][0] <= now:
+            deadline, expired = heapq.heappop(deadlines)
+            if expiry.get(expired) == deadline:
+                del expiry[expired]
+        while now >= next_sample:
+            resident_samples.append(len(expiry))
+            next_sample += sample_seconds
+        # Requests are spread round-robin, so each worker's sketch sees 1/workers of them.
+        count = sketches[index % workers].add(code) if policy else 0
+        cached_until = expiry.get(code)
+        if cached_until is not None:
+            hits += 1
+            if policy is None or not policy.should_refresh(count, int((cached_until - now) * 1000)):
+                continue
+            refreshes += 1
+        else:
+            misses += 1
+        ttl = policy.ttl_for(count) if policy else flat_ttl
+        expiry[code] = now + ttl
+        heapq.heappush(deadlines, (now + ttl, code))
+    total = hits + misses
+    return {
+        "requests": total,
+        "hit_ratio": hits / total if total else 0.0,
+        "mongo_reads": misses + refreshes,
+        "refreshes": refreshes,
+        "mean_keys": sum(resident_samples) / len(resident_samples) if resident_samples else 0,
+        "peak_keys": max(resident_samples, default=0),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--trace", default=None, help="CSV of offset_seconds,short_code")
+    parser.add_argument("--links", type=int, default=200_000)
+    parser.add_argument("--requests", type=int, default=1_000_000)
+    parser.add_argument("--rate", type=float, default=12.0, help="requests per second")
+    parser.add_argument("--exponent", type=float, default=0.9)
+    parser.add_argument("--workers", type=int, default=4, help="sketches (API workers)")
+    parser.add_argument("--flat-ttl", type=int, default=3600)
+    parser.add_argument("--min-ttl", type=int, default=600)
+    parser.add_argument("--max-ttl", type=int, default=86400)
+    parser.add_argument("--hot-threshold", type=int, default=4)
+    parser.add_argument("--refresh-ratio", type=float, default=0.1)
+    parser.add_argument("--sketch-width", type=int, default=65536)
+    parser.add_argument("--redis-uri", default=None, help="measure bytes per key here")
+    args = parser.parse_args()
+
+    def trace() -> Iterable[tuple[float, str]]:
+        if args.trace:
+            return read_trace(args.trace)
+        return zipf_trace(args.links, args.requests, args.rate, args.exponent)
+
+    def adaptive(refresh_ratio: float) -> PopularityTtl:
+        return PopularityTtl(
+            default_seconds=args.flat_ttl,
+            min_seconds=args.min_ttl,
+            max_seconds=args.max_ttl,
+            hot_threshold=args.hot_threshold,
+            refresh_ahead_ratio=refresh_ratio,
+        )
+
+    bytes_per_key = _record_bytes(args.redis_uri)
+    profiles = [
+        (f"flat {args.flat_ttl}s", None),
+        ("adaptive", adaptive(0.0)),
+        ("adaptive+refresh", adaptive(args.refresh_ratio)),
+    ]
+    print(f"bytes per cached key: {bytes_per_key} ({'measured' if args.redis_uri else 'est.'})")
+    print(
+        f"{'policy':<18}{'hit ratio':>10}{'mongo reads':>13}{'refreshes':>11}"
+        f"{'mean keys':>11}{'mean MiB':>10}{'peak MiB':>10}{'sim s':>8}"
+    )
+    for label, policy in profiles:
+        started = time.perf_counter()
+        result = simulate(trace(), args.flat_ttl, policy, args.workers, args.sketch_width)
+        print(
+            f"{label:<18}{result['hit_ratio']:>10.3f}{result['mongo_reads']:>13}"
+            f"{result['refreshes']:>11}{result['mean_keys']:>11.0f}"
+            f"{result['mean_keys'] * bytes_per_key / 2**20:>10.2f}"
+            f"{result['peak_keys'] * bytes_per_key / 2**20:>10.2f}"
+            f"{time.perf_counter() - started:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Create-path latency under concurrent load for each ``URL_CREATE_CACHE_MODE``.
+
+Mongo and Redis are replaced by in-memory fakes with configurable round-trip latency and
+jitter, so the numbers isolate how the cache write is scheduled rather than server speed.
+
+    python -m benchmarks.create_latency --requests 2000 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+from types import SimpleNamespace
+from typing import Any
+
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("REDIS_URI", "redis://localhost:6379/0")
+os.environ.setdefault("CELERY_BROKER_URL", "redis://localhost:6379/1")
+os.environ.setdefault("CELERY_RESULT_BACKEND", "redis://localhost:6379/2")
+
+from bson import ObjectId  # noqa: E402
+
+from app.schemas.url import URLCreate  # noqa: E402
+from app.services.url_service import (  # noqa: E402
+    CREATE_CACHE_MODES,
+    UrlService,
+    UrlServiceConfig,
+)
+
+
+async def _round_trip(latency_ms: float, jitter_ms: float) -> None:
+    await asyncio.sleep(max(0.0, random.gauss(latency_ms, jitter_ms)) / 1000)
+
+
+class FakeCollection:
+    def __init__(self, latency_ms: float, jitter_ms: float) -> None:
+        self._latency_ms = latency_ms
+        self._jitter_ms = jitter_ms
+
+    async def find_one(self, *_: Any, **__: Any) -> None:
+        await _round_trip(self._latency_ms, self._jitter_ms)
+        return None
+
+    async def insert_one(self, _: dict[str, Any]) -> SimpleNamespace:
+        await _round_trip(self._latency_ms, self._jitter_ms)
+        return SimpleNamespace(inserted_id=ObjectId())
+
+
+class FakeCache:
+    def __init__(self, latency_ms: float, jitter_ms: float) -> None:
+        self._latency_ms = latency_ms
+        self._jitter_ms = jitter_ms
+
+    async def store(self, *_: Any, **__: Any) -> bool:
+        await _round_trip(self._latency_ms, self._jitter_ms)
+        return True
+
+    async def delete(self, *_: Any) -> None:
+        await _round_trip(self._latency_ms, self._jitter_ms)
+
+    def ttl_for(self, *_: Any) -> None:
+        return None
+
+
+def _percentile(samples: list[float], percentile: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(percentile / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _run_mode(mode: str, args: argparse.Namespace) -> list[float]:
+    collection = FakeCollection(args.mongo_ms, args.jitter_ms)
+    database = {"urls": collection, "bulk_jobs": collection}
+    config = UrlServiceConfig(
+        cache_ttl_seconds=3600,
+        url_collection="urls",
+        create_cache_mode=mode,
+    )
+    cache = FakeCache(args.redis_ms, args.jitter_ms)
+    service = UrlService(database, cache, config)  # type: ignore[arg-type]
+    payload = URLCreate(target_url="https://example.com/landing")
+    owner_id = str(ObjectId())
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies: list[float] = []
+
+    async def one() -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await service.create_short_url(payload, owner_id)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    await asyncio.gather(*(one() for _ in range(args.requests)))
+    await asyncio.sleep(args.redis_ms / 1000 * 4)  # let background writes drain
+    return latencies
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--mongo-ms", type=float, default=2.0)
+    parser.add_argument("--redis-ms", type=float, default=0.8)
+    parser.add_argument("--jitter-ms", type=float, default=0.4)
+    args = parser.parse_args()
+
+    print(f"{'mode':<12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+    for mode in CREATE_CACHE_MODES:
+        latencies = await _run_mode(mode, args)
+        print(
+            f"{mode:<12}"
+            f"{_percentile(latencies, 50):>10.2f}"
+            f"{_percentile(latencies, 95):>10.2f}"
+            f"{_percentile(latencies, 99):>10.2f}"
+            f"{statistics.fmean(latencies):>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
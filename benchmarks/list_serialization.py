@@ -0,0 +1,101 @@
+"""CPU cost of turning a page of URL documents into the ``GET /api/v1/urls/`` response body.
+
+``before`` reproduces the previous path: one ``URLRead.model_validate`` per document, a
+``model_copy`` per item to attach ``short_url``, then FastAPI re-validating the list against
+``response_model`` and serializing it. ``after`` is ``UrlService.list_urls_json``: documents
+are flattened once and encoded straight to JSON bytes by a TypeAdapter.
+
+    python -m benchmarks.list_serialization --items 500 --repeat 200
+"""
+
+import argparse
+import os
+import statistics
+import time
+from datetime import timedelta
+from typing import Any
+
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("REDIS_URI", "redis://localhost:6379/0")
+os.environ.setdefault("CELERY_BROKER_URL", "redis://localhost:6379/1")
+os.environ.setdefault("CELERY_RESULT_BACKEND", "redis://localhost:6379/2")
+
+from bson import ObjectId  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.schemas.url import URLRead, url_row_list_adapter  # noqa: E402
+from app.services.url_service import UrlService, UrlServiceConfig  # noqa: E402
+from app.utils.time import utc_now  # noqa: E402
+
+BASE_URL = "https://sho.rt"
+# What FastAPI built from ``response_model=list[URLRead]`` on the previous path.
+url_read_list_adapter = TypeAdapter(list[URLRead])
+
+
+def _documents(count: int) -> list[dict[str, Any]]:
+    owner_id = ObjectId()
+    now = utc_now()
+    return [
+        {
+            "_id": ObjectId(),
+            "short_code": f"code{index:04d}",
+            "target_url": f"https://example.com/campaign/{index}?utm_source=bench",
+            "owner_id": owner_id,
+            "expires_at": now + timedelta(days=30) if index % 3 == 0 else None,
+            "created_at": now - timedelta(minutes=index),
+            "updated_at": now,
+        }
+        for index in range(count)
+    ]
+
+
+def _before(service: UrlService, docs: list[dict[str, Any]]) -> bytes:
+    items: list[URLRead] = []
+    for doc in docs:
+        row = service._document_to_row(doc)
+        item = URLRead.model_validate(row)
+        items.append(
+            item.model_copy(update={"short_url": f"{BASE_URL}/{item.short_code}"})
+        )
+    validated = url_read_list_adapter.validate_python(items)
+    return url_read_list_adapter.dump_json(validated)
+
+
+def _after(service: UrlService, docs: list[dict[str, Any]]) -> bytes:
+    rows = [service._document_to_row(doc, BASE_URL) for doc in docs]
+    return url_row_list_adapter.dump_json(rows)
+
+
+def _measure(
+    func: Any, service: UrlService, docs: list[dict[str, Any]], repeat: int
+) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(service, docs)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    config = UrlServiceConfig(cache_ttl_seconds=3600, url_collection="urls")
+    collections = {"urls": None, "bulk_jobs": None}
+    service = UrlService(collections, None, config)  # type: ignore[arg-type]
+    docs = _documents(args.items)
+    assert _before(service, docs) == _after(service, docs), "outputs diverged"
+
+    print(f"{'path':<8}{'median ms':>12}{'p95 ms':>10}{'items/s':>12}")
+    for name, func in (("before", _before), ("after", _after)):
+        timings = sorted(_measure(func, service, docs, args.repeat))
+        median = statistics.median(timings)
+        p95 = timings[int(0.95 * (len(timings) - 1))]
+        print(f"{name:<8}{median:>12.3f}{p95:>10.3f}{args.items / median * 1000:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,400 @@
+"""Replay recorded or synthetic traffic against a running instance for capacity planning.
+
+Streams a trace of ``offset_seconds,short_code[,op]`` lines, where ``op`` is
+``redirect`` (the default), ``create`` or ``list``. Each request is issued at its offset
+divided by ``--speedup``, over one pooled ``httpx`` client. Without ``--trace`` a Zipfian
+trace is generated, and ``--create-ratio``/``--list-ratio`` mix in ``/api/v1/urls``
+calls. Every ``--interval`` seconds it prints throughput, latency percentiles, the Redis
+cache hit ratio (``--cache-redis``) and MongoDB command counts. Mongo counts come from
+``/api/v1/health/mongo``, which reports one worker's counters, so run the target with a
+single worker or scale the numbers. Redis hits do not include the local cache or the hot
+link table. One process tops out at a few thousand requests per second; past that, run
+several with ``--shard 0/4`` .. ``--shard 3/4``.
+
+    python -m benchmarks.replay --trace prod.csv --speedup 20 --cache-redis redis://localhost:6380/0
+    python -m benchmarks.replay --seed-links 5000 --links 5000 --requests 100000 --rate 2000
+"""
+
+import argparse
+import asyncio
+import contextlib
+import csv
+import itertools
+import random
+import time
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from typing import IO, Any
+
+import httpx
+
+from benchmarks.traffic import link_code, zipf_trace
+
+OPS = ("redirect", "create", "list")
+API_PREFIX = "/api/v1"
+
+
+def read_ops(path: str) -> Iterator[tuple[float, str, str]]:
+    """Stream ``(offset, short_code, op)`` from a trace CSV; offsets start at zero."""
+    first: float | None = None
+    with open(path, newline="", encoding="utf-8") as handle:
+        for row in csv.reader(handle):
+            if len(row) < 2 or row[0].startswith("#"):
+                continue
+            offset = float(row[0])
+            first = offset if first is None else first
+            op = row[2].strip() if len(row) > 2 and row[2].strip() else "redirect"
+            if op not in OPS:
+                raise ValueError(f"Unknown operation '{op}' in trace")
+            yield offset - first, row[1], op
+
+
+def synthetic_ops(
+    links: int,
+    requests: int,
+    rate: float,
+    exponent: float,
+    create_ratio: float,
+    list_ratio: float,
+    seed: int,
+) -> Iterator[tuple[float, str, str]]:
+    chooser = random.Random(seed + 2)
+    for offset, code in zipf_trace(links, requests, rate, exponent, seed):
+        draw = chooser.random()
+        if draw < create_ratio:
+            yield offset, code, "create"
+        elif draw < create_ratio + list_ratio:
+            yield offset, code, "list"
+        else:
+            yield offset, code, "redirect"
+
+
+def shard(
+    events: Iterable[tuple[float, str, str]], index: int, count: int
+) -> Iterator[tuple[float, str, str]]:
+    """Every ``count``-th event starting at ``index``, to split one trace across processes."""
+    return itertools.islice(events, index, None, count)
+
+
+def percentile(samples: list[float], percent: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))]
+
+
+class Window:
+    """Results collected between two reports."""
+
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = {op: [] for op in OPS}
+        self.statuses: Counter[str] = Counter()
+        self.errors = 0
+        self.late = 0
+        self.max_lag_ms = 0.0
+
+
+class Replayer:
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        args: argparse.Namespace,
+        csv_file: IO[str] | None = None,
+    ) -> None:
+        self._client = client
+        self._args = args
+        self._headers: dict[str, str] = {}
+        self._window = Window()
+        self._total = Window()
+        self._created = itertools.count()
+        self._cache_nodes: list[Any] = []
+        self._redis_baseline: tuple[int, int] | None = None
+        self._mongo_baseline: Counter[str] | None = None
+        self._redis_start: tuple[int, int] | None = None
+        self._mongo_start: Counter[str] | None = None
+        self._last_report = 0.0
+        self._csv = csv.writer(csv_file) if csv_file is not None else None
+
+    async def login(self) -> None:
+        credentials = {"email": self._args.email, "password": self._args.password}
+        await self._client.post(f"{API_PREFIX}/auth/register", json=credentials)
+        response = await self._client.post(f"{API_PREFIX}/auth/login", json=credentials)
+        response.raise_for_status()
+        self._headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def seed(self, links: int) -> None:
+        """Create ``link_code(0..links-1)`` so synthetic redirects resolve."""
+        pending = iter(range(links))
+
+        async def worker() -> None:
+            for rank in pending:
+                code = link_code(rank)
+                response = await self._client.post(
+                    f"{API_PREFIX}/urls/",
+                    json={"target_url": f"https://example.com/{code}", "custom_alias": code},
+                    headers=self._headers,
+                )
+                if response.status_code not in (201, 400):  # 400: alias exists already
+                    response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(min(self._args.concurrency, 64))))
+        print(f"seeded {links} links in {time.perf_counter() - started:.1f}s")
+
+    async def _send(self, op: str, code: str, lag_ms: float) -> None:
+        started = time.perf_counter()
+        try:
+            if op == "redirect":
+                response = await self._client.get(f"/{code}", follow_redirects=False)
+            elif op == "create":
+                response = await self._client.post(
+                    f"{API_PREFIX}/urls/",
+                    json={"target_url": f"https://example.com/{code}/{next(self._created)}"},
+                    headers=self._headers,
+                )
+            else:
+                response = await self._client.get(
+                    f"{API_PREFIX}/urls/", params={"limit": 20}, headers=self._headers
+                )
+            status = str(response.status_code)
+        except httpx.HTTPError as exc:
+            status = type(exc).__name__
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        for window in (self._window, self._total):
+            window.latencies[op].append(elapsed_ms)
+            window.statuses[f"{op}:{status}"] += 1
+            if not status.isdigit() or status.startswith("5"):
+                window.errors += 1
+            if lag_ms > self._args.late_ms:
+                window.late += 1
+            window.max_lag_ms = max(window.max_lag_ms, lag_ms)
+
+    async def run(self, events: Iterable[tuple[float, str, str]]) -> None:
+        limit = asyncio.Semaphore(self._args.concurrency)
+        in_flight: set[asyncio.Task[None]] = set()
+
+        async def bounded(op: str, code: str, lag_ms: float) -> None:
+            try:
+                await self._send(op, code, lag_ms)
+            finally:
+                limit.release()
+
+        await self._start_metrics()
+        reporter = asyncio.create_task(self._report_every(self._args.interval))
+        started = time.perf_counter()
+        try:
+            for offset, code, op in events:
+                delay = started + offset / self._args.speedup - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                await limit.acquire()
+                lag_ms = max(0.0, time.perf_counter() - started - offset / self._args.speedup)
+                task = asyncio.create_task(bounded(op, code, lag_ms * 1000))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            await asyncio.gather(*in_flight)
+        finally:
+            reporter.cancel()
+            await self._report(time.perf_counter() - started, final=True)
+            for node in self._cache_nodes:
+                await node.aclose()
+
+    async def _start_metrics(self) -> None:
+        if self._args.cache_redis:
+            from redis.asyncio import Redis
+
+            self._cache_nodes = [
+                Redis.from_url(uri.strip()) for uri in self._args.cache_redis.split(",")
+            ]
+        self._redis_start = self._redis_baseline = await self._redis_counters()
+        self._mongo_start = self._mongo_baseline = await self._mongo_counters()
+        if self._csv is not None:
+            self._csv.writerow(
+                [
+                    "elapsed_s",
+                    "requests",
+                    "rps",
+                    "redirect_p50_ms",
+                    "redirect_p95_ms",
+                    "redirect_p99_ms",
+                    "api_p95_ms",
+                    "errors",
+                    "late",
+                    "cache_hit_ratio",
+                    "mongo_commands",
+                    "mongo_finds",
+                ]
+            )
+
+    async def _redis_counters(self) -> tuple[int, int] | None:
+        if not self._cache_nodes:
+            return None
+        hits = misses = 0
+        for node in self._cache_nodes:
+            stats = await node.info("stats")
+            hits += int(stats.get("keyspace_hits", 0))
+            misses += int(stats.get("keyspace_misses", 0))
+        return hits, misses
+
+    async def _mongo_counters(self) -> Counter[str] | None:
+        if not self._args.mongo_metrics:
+            return None
+        try:
+            response = await self._client.get(f"{API_PREFIX}/health/mongo")
+            response.raise_for_status()
+        except httpx.HTTPError:
+            return None
+        commands: Counter[str] = Counter()
+        for profile in response.json().get("profiles", []):
+            commands.update(profile.get("commands", {}))
+        return commands
+
+    async def _report_every(self, interval: float) -> None:
+        started = time.perf_counter()
+        while True:
+            await asyncio.sleep(interval)
+            await self._report(time.perf_counter() - started)
+
+    async def _report(self, elapsed: float, final: bool = False) -> None:
+        window = self._total if final else self._window
+        if not final:
+            self._window = Window()
+        redis_now, mongo_now = await self._redis_counters(), await self._mongo_counters()
+        redis_base = self._redis_start if final else self._redis_baseline
+        mongo_base = self._mongo_start if final else self._mongo_baseline
+        hit_ratio: float | None = None
+        if redis_now is not None and redis_base is not None:
+            hits, misses = redis_now[0] - redis_base[0], redis_now[1] - redis_base[1]
+            hit_ratio = hits / (hits + misses) if hits + misses else None
+        mongo_commands = mongo_finds = None
+        if mongo_now is not None and mongo_base is not None:
+            delta = mongo_now - mongo_base
+            # The health call itself is not a Mongo command, so the delta is app traffic.
+            mongo_commands, mongo_finds = sum(delta.values()), delta.get("find", 0)
+        if not final:
+            self._redis_baseline = redis_now or self._redis_baseline
+            self._mongo_baseline = mongo_now if mongo_now is not None else self._mongo_baseline
+
+        redirects = window.latencies["redirect"]
+        api = window.latencies["create"] + window.latencies["list"]
+        requests = sum(len(samples) for samples in window.latencies.values())
+        span = elapsed if final else elapsed - self._last_report
+        self._last_report = elapsed
+        row = [
+            round(elapsed, 1),
+            requests,
+            round(requests / span, 1) if span else 0,
+            round(percentile(redirects, 50), 2),
+            round(percentile(redirects, 95), 2),
+            round(percentile(redirects, 99), 2),
+            round(percentile(api, 95), 2),
+            window.errors,
+            window.late,
+            "" if hit_ratio is None else round(hit_ratio, 4),
+            "" if mongo_commands is None else mongo_commands,
+            "" if mongo_finds is None else mongo_finds,
+        ]
+        label = "total" if final else f"{elapsed:7.1f}s"
+        print(
+            f"{label:>8} {row[2]:>9} req/s  redirect p50/p95/p99 {row[3]}/{row[4]}/{row[5]} ms"
+            f"  api p95 {row[6]} ms  errors {row[7]}  late {row[8]}"
+            f"  hit {row[9] if row[9] != '' else 'n/a'}"
+            f"  mongo cmds {row[10] if row[10] != '' else 'n/a'}"
+            f" finds {row[11] if row[11] != '' else 'n/a'}"
+        )
+        if final:
+            print(f"  max dispatch lag {window.max_lag_ms:.1f} ms")
+            for key, count in sorted(window.statuses.items()):
+                print(f"  {key:<24}{count:>10}")
+        elif self._csv is not None:
+            self._csv.writerow(row)
+
+
+async def _main(args: argparse.Namespace, csv_file: IO[str] | None) -> None:
+    if args.trace:
+        events: Iterable[tuple[float, str, str]] = read_ops(args.trace)
+    else:
+        events = synthetic_ops(
+            args.links,
+            args.requests,
+            args.rate,
+            args.exponent,
+            args.create_ratio,
+            args.list_ratio,
+            args.seed,
+        )
+    if args.shard:
+        index, count = args.shard
+        events = shard(events, index, count)
+    limits = httpx.Limits(
+        max_connections=args.concurrency, max_keepalive_connections=args.concurrency
+    )
+    async with httpx.AsyncClient(
+        base_url=args.base_url, limits=limits, timeout=args.timeout
+    ) as client:
+        replayer = Replayer(client, args, csv_file)
+        await replayer.login()
+        if args.seed_links:
+            await replayer.seed(args.seed_links)
+        await replayer.run(events)
+
+
+def _parse_shard(value: str) -> tuple[int, int]:
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError("expected I/N, e.g. 0/4") from exc
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError("need 0 <= I < N")
+    return index, count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--trace", default=None, help="CSV of offset_seconds,short_code[,op]")
+    parser.add_argument("--speedup", type=float, default=1.0, help="replay N times faster")
+    parser.add_argument("--concurrency", type=int, default=256, help="max requests in flight")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--interval", type=float, default=5.0, help="seconds between reports")
+    parser.add_argument("--late-ms", type=float, default=50.0, help="dispatch lag counted late")
+    parser.add_argument("--links", type=int, default=10_000, help="synthetic: distinct links")
+    parser.add_argument("--requests", type=int, default=100_000, help="synthetic: total")
+    parser.add_argument("--rate", type=float, default=500.0, help="synthetic: requests/s")
+    parser.add_argument("--exponent", type=float, default=1.0, help="synthetic: Zipf skew")
+    parser.add_argument("--create-ratio", type=float, default=0.0)
+    parser.add_argument("--list-ratio", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--seed-links", type=int, default=0, help="create z-codes 0..N-1")
+    parser.add_argument("--email", default="replay@example.com")
+    parser.add_argument("--password", default="replay-password")
+    parser.add_argument("--cache-redis", default=None, help="comma-separated cache nodes")
+    parser.add_argument(
+        "--no-mongo-metrics",
+        dest="mongo_metrics",
+        action="store_false",
+        help="skip polling /api/v1/health/mongo",
+    )
+    parser.add_argument("--csv", default=None, help="write per-interval rows here")
+    parser.add_argument(
+        "--shard",
+        type=_parse_shard,
+        default=None,
+        help="I/N: replay every N-th request starting at I, one process per shard",
+    )
+    args = parser.parse_args()
+    if args.speedup <= 0 or args.concurrency < 1:
+        parser.error("--speedup must be positive and --concurrency at least 1")
+    with contextlib.ExitStack() as stack:
+        csv_file = (
+            stack.enter_context(open(args.csv, "w", newline="", encoding="utf-8"))
+            if args.csv
+            else None
+        )
+        asyncio.run(_main(args, csv_file))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Worker cold start: import time, lifespan startup, and time to the first redirect.
+
+Each run is a fresh interpreter, so nothing is shared with earlier runs. The child imports
+``app.main``, enters the lifespan (connection warmup, optional index build), then
+issues one redirect through the ASGI app. Point ``MONGODB_URI``/``REDIS_URI`` at real
+servers; with ``--code`` unset the redirect is a miss (404), which still exercises the
+Redis and MongoDB round trips.
+
+    python -m benchmarks.startup --runs 5 --compare
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("REDIS_URI", "redis://localhost:6379/0")
+os.environ.setdefault("CELERY_BROKER_URL", "redis://localhost:6379/1")
+os.environ.setdefault("CELERY_RESULT_BACKEND", "redis://localhost:6379/2")
+
+HEAVY_MODULES = ("celery", "kombu", "jose", "passlib")
+# What ``app.main`` used to pull in eagerly: ``--compare`` preloads these and builds the
+# indexes on startup to reproduce the previous boot sequence.
+EAGER_MODULES = ("app.tasks.analytics", "jose.jwt", "passlib.context")
+
+
+async def _startup_and_redirect(code: str) -> dict[str, float | int]:
+    import httpx
+
+    from app.main import app
+
+    started = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.get(f"/{code}", follow_redirects=False)
+        done = time.perf_counter()
+    return {
+        "startup_ms": (ready - started) * 1000,
+        "first_redirect_ms": (done - ready) * 1000,
+        "status": response.status_code,
+    }
+
+
+def _child(code: str, eager: bool) -> None:
+    started = time.perf_counter()
+    if eager:
+        import importlib
+
+        for name in EAGER_MODULES:
+            importlib.import_module(name)
+    import app.main  # noqa: F401
+
+    imported = time.perf_counter()
+    result = {
+        "import_ms": (imported - started) * 1000,
+        "heavy_modules": sorted(name for name in HEAVY_MODULES if name in sys.modules),
+        **asyncio.run(_startup_and_redirect(code)),
+    }
+    result["to_first_redirect_ms"] = (time.perf_counter() - started) * 1000
+    print(json.dumps(result))
+
+
+def _run(code: str, eager: bool) -> dict:
+    env = dict(os.environ)
+    if eager:
+        env["MONGODB_ENSURE_INDEXES_ON_STARTUP"] = "true"
+    command = [sys.executable, "-m", "benchmarks.startup", "--child", "--code", code]
+    if eager:
+        command.append("--eager")
+    output = subprocess.run(command, env=env, capture_output=True, text=True)
+    if output.returncode != 0:
+        error = output.stderr.strip().splitlines()[-1:] or ["no output"]
+        raise SystemExit(f"startup run failed ({'eager' if eager else 'lazy'}): {error[0]}")
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def _report(label: str, runs: list[dict]) -> None:
+    print(f"{label}: heavy modules after import = {runs[-1]['heavy_modules'] or 'none'}")
+    print(f"  {'metric':<22}{'median ms':>12}{'min ms':>12}{'max ms':>12}")
+    for metric in ("import_ms", "startup_ms", "first_redirect_ms", "to_first_redirect_ms"):
+        values = [run[metric] for run in runs]
+        print(
+            f"  {metric:<22}{statistics.median(values):>12.1f}"
+            f"{min(values):>12.1f}{max(values):>12.1f}"
+        )
+    print(f"  first redirect status = {runs[-1]['status']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--code", default="startup-bench-miss")
+    parser.add_argument(
+        "--compare", action="store_true", help="also run the eager-import + index-build boot"
+    )
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--eager", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.code, args.eager)
+        return
+    profiles = [("lazy", False)] + ([("eager", True)] if args.compare else [])
+    for label, eager in profiles:
+        _report(label, [_run(args.code, eager) for _ in range(args.runs)])
+
+
+if __name__ == "__main__":
+    main()
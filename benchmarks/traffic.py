@@ -0,0 +1,86 @@
+"""Synthetic redirect traffic shared by the benchmarks.
+
+A trace is a CSV file of ``offset_seconds,short_code`` lines in time order, so recorded
+production traffic (e.g. exported from access logs) can be replayed the same way as the
+generated Zipfian traces.
+
+    python -m benchmarks.traffic --links 100000 --requests 1000000 --rate 50 trace.csv
+"""
+
+import argparse
+import bisect
+import csv
+import itertools
+import random
+from collections.abc import Iterable, Iterator
+
+
+class ZipfSampler:
+    """Draws ranks ``0..n-1`` with ``P(k)`` proportional to ``1 / (k + 1) ** exponent``."""
+
+    def __init__(self, n: int, exponent: float = 1.0, seed: int | None = None) -> None:
+        if n < 1:
+            raise ValueError("Need at least one rank")
+        self._cumulative = list(itertools.accumulate((k + 1) ** -exponent for k in range(n)))
+        self._total = self._cumulative[-1]
+        self._random = random.Random(seed)
+
+    def sample(self) -> int:
+        return bisect.bisect_left(self._cumulative, self._random.random() * self._total)
+
+
+def link_code(rank: int) -> str:
+    return f"z{rank:07d}"
+
+
+def zipf_trace(
+    links: int,
+    requests: int,
+    rate_per_second: float,
+    exponent: float = 1.0,
+    seed: int | None = 7,
+) -> Iterator[tuple[float, str]]:
+    """Poisson arrivals at ``rate_per_second`` over Zipf-distributed link ranks."""
+    sampler = ZipfSampler(links, exponent, seed)
+    arrivals = random.Random(None if seed is None else seed + 1)
+    offset = 0.0
+    for _ in range(requests):
+        offset += arrivals.expovariate(rate_per_second)
+        yield offset, link_code(sampler.sample())
+
+
+def read_trace(path: str) -> Iterator[tuple[float, str]]:
+    with open(path, newline="", encoding="utf-8") as handle:
+        for row in csv.reader(handle):
+            if len(row) >= 2 and not row[0].startswith("#"):
+                yield float(row[0]), row[1]
+
+
+def write_trace(path: str, trace: Iterable[tuple[float, str]]) -> int:
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        for offset, code in trace:
+            writer.writerow((f"{offset:.6f}", code))
+            count += 1
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path")
+    parser.add_argument("--links", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=1_000_000)
+    parser.add_argument("--rate", type=float, default=50.0, help="requests per second")
+    parser.add_argument("--exponent", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    count = write_trace(
+        args.path,
+        zipf_trace(args.links, args.requests, args.rate, args.exponent, args.seed),
+    )
+    print(f"wrote {count} requests over {args.links} links to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import os
+import shutil
+import socket
+import subprocess
+import time
+import uuid
+from collections.abc import AsyncIterator, Callable, Iterator
+from typing import Any
+
+import pytest
+
+# Settings are read at import time; point required connection strings at local defaults
+# so modules can be imported without a .env file.
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("REDIS_URI", "redis://localhost:6379/0")
+os.environ.setdefault("CELERY_BROKER_URL", "redis://localhost:6379/1")
+os.environ.setdefault("CELERY_RESULT_BACKEND", "redis://localhost:6379/2")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until(check: Callable[[], Any], timeout: float = 15.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if check():
+                return
+        except Exception:
+            if time.monotonic() > deadline:
+                raise
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.05)
+
+
+@pytest.fixture(scope="session")
+def mongo_uri(tmp_path_factory: pytest.TempPathFactory) -> Iterator[str]:
+    """A Mongo server for service and task tests.
+
+    ``TEST_MONGODB_URI`` points the tests at an existing server; otherwise a throwaway
+    ``mongod`` is started, and the tests are skipped where the binary is unavailable.
+    """
+    existing = os.environ.get("TEST_MONGODB_URI")
+    if existing:
+        yield existing
+        return
+    if shutil.which("mongod") is None:
+        pytest.skip("mongod binary not available")
+    from pymongo import MongoClient
+
+    port = free_port()
+    process = subprocess.Popen(
+        [
+            "mongod",
+            "--port",
+            str(port),
+            "--bind_ip",
+            "127.0.0.1",
+            "--dbpath",
+            str(tmp_path_factory.mktemp("mongo")),
+        ],
+        stdout=subprocess.DEVNULL,
+    )
+    uri = f"mongodb://127.0.0.1:{port}/?directConnection=true"
+    try:
+        client = MongoClient(uri)
+        wait_until(lambda: client.admin.command("ping")["ok"])
+        client.close()
+        yield uri
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+@pytest.fixture(scope="session")
+def redis_uri(tmp_path_factory: pytest.TempPathFactory) -> Iterator[str]:
+    if shutil.which("redis-server") is None:
+        pytest.skip("redis-server binary not available")
+    from redis import Redis
+
+    port = free_port()
+    process = subprocess.Popen(
+        [
+            "redis-server",
+            "--port",
+            str(port),
+            "--save",
+            "",
+            "--dir",
+            str(tmp_path_factory.mktemp("redis")),
+        ],
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        client = Redis(port=port)
+        wait_until(client.ping)
+        client.close()
+        yield f"redis://127.0.0.1:{port}/0"
+    finally:
+        process.terminate()
+        process.wait(timeout=5)
+
+
+@pytest.fixture
+async def mongo_database(mongo_uri: str) -> AsyncIterator[Any]:
+    """A fresh Motor database per test, dropped afterwards."""
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(mongo_uri, tz_aware=True)
+    name = f"test_{uuid.uuid4().hex[:12]}"
+    yield client[name]
+    await client.drop_database(name)
+    client.close()
+
+
+@pytest.fixture
+def sync_mongo_database(mongo_uri: str) -> Iterator[Any]:
+    """A fresh PyMongo database per test (for Celery task code), dropped afterwards."""
+    from pymongo import MongoClient
+
+    client = MongoClient(mongo_uri, tz_aware=True)
+    name = f"test_{uuid.uuid4().hex[:12]}"
+    yield client[name]
+    client.drop_database(name)
+    client.close()
+
+
+@pytest.fixture
+async def url_cache(redis_uri: str) -> AsyncIterator[Any]:
+    """A ``UrlCache`` on a single flushed Redis node that also carries pub/sub."""
+    from redis.asyncio import Redis
+
+    from app.db.redis_cache import CacheShards
+    from app.db.url_cache import UrlCache
+
+    client = Redis.from_url(redis_uri, decode_responses=True)
+    await client.flushdb()
+    yield UrlCache(CacheShards({redis_uri: client}), client)
+    await client.aclose()
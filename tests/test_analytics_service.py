@@ -0,0 +1,132 @@
+"""Owner analytics over the daily click rollups, against a real Mongo database."""
+
+from datetime import timedelta
+from typing import Any
+
+import pytest
+
+pytest.importorskip("motor")
+pytest.importorskip("celery")
+
+from bson import ObjectId  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.services.analytics_service import AnalyticsService, AnalyticsServiceConfig  # noqa: E402
+from app.tasks import analytics  # noqa: E402
+from app.tasks.analytics import record_click_rollups  # noqa: E402
+from app.utils.time import utc_day_start, utc_now  # noqa: E402
+
+OWNER = ObjectId()
+OTHER_OWNER = ObjectId()
+TODAY = utc_day_start(utc_now())
+
+
+@pytest.fixture
+def service(mongo_database: Any) -> AnalyticsService:
+    config = AnalyticsServiceConfig(owner_rollup_collection="owner_rollups")
+    return AnalyticsService(mongo_database, config)
+
+
+async def _seed_owner_days(database: Any, *days: tuple[ObjectId, int, int]) -> None:
+    await database["owner_rollups"].insert_many(
+        [
+            {"owner_id": owner, "day": TODAY - timedelta(days=ago), "clicks": clicks}
+            for owner, ago, clicks in days
+        ]
+    )
+
+
+async def _seed_top_links(database: Any, *days: tuple[ObjectId, int, dict[str, int]]) -> None:
+    for owner, ago, top in days:
+        await database["owner_rollups"].update_one(
+            {"owner_id": owner, "day": TODAY - timedelta(days=ago)},
+            {"$set": {"top": [{"short_code": code, "clicks": n} for code, n in top.items()]}},
+            upsert=True,
+        )
+
+
+def test_clicks_fold_into_owner_and_link_rollups(sync_mongo_database: Any) -> None:
+    now = utc_now()
+    record_click_rollups(sync_mongo_database, OWNER, "promo", now)
+    record_click_rollups(sync_mongo_database, OWNER, "promo", now, variant="mobile")
+    record_click_rollups(sync_mongo_database, OWNER, "docs", now - timedelta(days=1))
+
+    names = settings.mongo_database_settings
+    owner_days = {
+        doc["day"]: doc["clicks"] for doc in sync_mongo_database[names["owner_rollups"]].find()
+    }
+    assert owner_days == {TODAY: 2, TODAY - timedelta(days=1): 1}
+    promo = sync_mongo_database[names["link_rollups"]].find_one({"short_code": "promo"})
+    assert (promo["day"], promo["clicks"], promo["variants"]) == (TODAY, 2, {"mobile": 1})
+    today = sync_mongo_database[names["owner_rollups"]].find_one({"day": TODAY})
+    assert today["top"] == [{"short_code": "promo", "clicks": 2}]
+
+
+def test_daily_top_list_keeps_the_most_clicked_links(
+    sync_mongo_database: Any, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(analytics, "TOP_LINKS_PER_DAY", 2)
+    now = utc_now()
+    for short_code, clicks in (("a", 3), ("b", 2), ("c", 1)):
+        record_click_rollups(sync_mongo_database, OWNER, short_code, now, clicks=clicks)
+
+    def top() -> list[tuple[str, int]]:
+        names = settings.mongo_database_settings
+        doc = sync_mongo_database[names["owner_rollups"]].find_one({"owner_id": OWNER})
+        return sorted((entry["short_code"], entry["clicks"]) for entry in doc["top"])
+
+    assert top() == [("a", 3), ("b", 2)]
+    # "c" was dropped at 1 click and comes back with its whole day total once it outranks "b".
+    record_click_rollups(sync_mongo_database, OWNER, "c", now, clicks=2)
+    assert top() == [("a", 3), ("c", 3)]
+    record_click_rollups(sync_mongo_database, OWNER, "a", now)
+    assert top() == [("a", 4), ("c", 3)]
+
+
+async def test_daily_clicks_are_zero_filled_over_the_window(
+    mongo_database: Any, service: AnalyticsService
+) -> None:
+    await _seed_owner_days(
+        mongo_database, (OWNER, 0, 5), (OWNER, 2, 3), (OWNER, 9, 100), (OTHER_OWNER, 0, 7)
+    )
+
+    daily = await service.get_daily_clicks(str(OWNER), days=4)
+
+    assert [item.day for item in daily] == [TODAY - timedelta(days=ago) for ago in (3, 2, 1, 0)]
+    assert [item.clicks for item in daily] == [0, 3, 0, 5]
+
+
+async def test_top_links_sum_the_window_and_break_ties_by_code(
+    mongo_database: Any, service: AnalyticsService
+) -> None:
+    await _seed_top_links(
+        mongo_database,
+        (OWNER, 0, {"beta": 8, "alpha": 4, "gamma": 2}),
+        (OWNER, 1, {"alpha": 4}),
+        (OWNER, 30, {"stale": 50}),
+        (OTHER_OWNER, 0, {"theirs": 90}),
+    )
+
+    top = await service.get_top_links(str(OWNER), days=7, limit=2)
+
+    assert [(link.short_code, link.clicks) for link in top] == [("alpha", 8), ("beta", 8)]
+
+
+async def test_summary_totals_the_window(mongo_database: Any, service: AnalyticsService) -> None:
+    await _seed_owner_days(mongo_database, (OWNER, 0, 5), (OWNER, 6, 2), (OWNER, 7, 40))
+    await _seed_top_links(mongo_database, (OWNER, 0, {"promo": 5}), (OWNER, 6, {"docs": 2}))
+
+    summary = await service.get_summary(str(OWNER), days=7)
+
+    assert (summary.window_days, summary.start, summary.total_clicks) == (
+        7,
+        TODAY - timedelta(days=6),
+        7,
+    )
+    assert len(summary.daily) == 7
+    assert [link.short_code for link in summary.top_links] == ["promo", "docs"]
+
+
+async def test_invalid_owner_ids_are_rejected(service: AnalyticsService) -> None:
+    with pytest.raises(ValueError):
+        await service.get_daily_clicks("not-an-id", days=7)
@@ -0,0 +1,36 @@
+from datetime import UTC, datetime
+
+from bson import ObjectId
+
+from app.schemas.url import URLBulkDelete, URLBulkExpire
+from app.services.url_service import build_bulk_filter
+
+OWNER = ObjectId()
+
+
+def test_single_criterion_is_inlined() -> None:
+    query = build_bulk_filter(OWNER, URLBulkDelete(short_codes=["a", "b"]))
+    assert query == {"owner_id": OWNER, "short_code": {"$in": ["a", "b"]}}
+
+
+def test_criteria_are_combined_with_and() -> None:
+    cutoff = datetime(2024, 1, 1, tzinfo=UTC)
+    query = build_bulk_filter(
+        OWNER, URLBulkExpire(code_prefix="spring.", created_before=cutoff, expires_in_seconds=60)
+    )
+    assert query == {
+        "owner_id": OWNER,
+        "$and": [
+            {"short_code": {"$regex": r"^spring\."}},
+            {"created_at": {"$lt": cutoff}},
+        ],
+    }
+
+
+def test_selection_requires_a_criterion() -> None:
+    try:
+        URLBulkDelete()
+    except ValueError as exc:
+        assert "short_codes" in str(exc)
+    else:  # pragma: no cover - guard
+        raise AssertionError("Expected ValueError for an empty selection")
@@ -0,0 +1,46 @@
+from datetime import UTC, datetime
+
+from app.utils.cache_record import CachedTarget
+
+
+def test_round_trip_preserves_fields() -> None:
+    record = CachedTarget(target_url="https://example.com/a:b", version=3, expires_at=1700000000.5)
+    assert CachedTarget.decode(record.encode()) == record
+
+
+def test_decode_accepts_legacy_plain_target() -> None:
+    record = CachedTarget.decode(b"https://example.com/")
+    assert record == CachedTarget(target_url="https://example.com/", version=0)
+
+
+def test_tombstone_round_trip() -> None:
+    decoded = CachedTarget.decode(CachedTarget.tombstone(7).encode())
+    assert decoded is not None
+    assert decoded.deleted
+    assert decoded.target_url is None
+    assert decoded.version == 7
+
+
+def test_from_document_and_expiry() -> None:
+    expires_at = datetime(2030, 1, 1, tzinfo=UTC)
+    record = CachedTarget.from_document(
+        {"target_url": "https://example.com/", "version": 2, "expires_at": expires_at}
+    )
+    assert record.version == 2
+    assert not record.is_expired(now=expires_at.timestamp() - 1)
+    assert record.is_expired(now=expires_at.timestamp())
+
+
+def test_decode_rejects_garbage() -> None:
+    assert CachedTarget.decode("{not json") is None
+    assert CachedTarget.decode(None) is None
+
+
+def test_quota_fields_round_trip() -> None:
+    record = CachedTarget.from_document(
+        {"target_url": "https://example.com/", "version": 1, "max_clicks": 10, "quota_used": 4}
+    )
+    assert (record.max_clicks, record.clicks_used) == (10, 4)
+    assert '"q":10' in record.encode()
+    assert CachedTarget.decode(record.encode()) == record
+    assert '"q"' not in CachedTarget(target_url="https://example.com/").encode()
@@ -0,0 +1,297 @@
+"""Sharded cache behaviour against several throwaway local ``redis-server`` processes."""
+
+import shutil
+import socket
+import subprocess
+import time
+from collections.abc import AsyncIterator, Iterator
+
+import pytest
+
+pytest.importorskip("redis")
+pytest.importorskip("fastapi")
+pytest.importorskip("pytest_asyncio")
+
+if shutil.which("redis-server") is None:
+    pytest.skip("redis-server binary not available", allow_module_level=True)
+
+from redis import Redis as SyncRedis  # noqa: E402
+from redis.asyncio import Redis  # noqa: E402
+from redis.asyncio.cluster import RedisCluster  # noqa: E402
+
+from app.db.redis_cache import CacheShards  # noqa: E402
+from app.db.url_cache import UrlCache  # noqa: E402
+from app.utils.cache_record import CachedTarget  # noqa: E402
+from app.utils.local_cache import LocalTTLCache  # noqa: E402
+from app.utils.popularity import CountMinSketch, PopularityTtl  # noqa: E402
+
+SHARD_COUNT = 3
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _cluster_port() -> int:
+    """A free port whose cluster bus port (port + 10000) is free as well."""
+    while True:
+        port = _free_port()
+        if port > 55535:
+            continue
+        with socket.socket() as bus:
+            try:
+                bus.bind(("127.0.0.1", port + 10000))
+            except OSError:
+                continue
+        return port
+
+
+@pytest.fixture(scope="module")
+def redis_uris(tmp_path_factory: pytest.TempPathFactory) -> Iterator[list[str]]:
+    processes: list[subprocess.Popen[bytes]] = []
+    uris: list[str] = []
+    for index in range(SHARD_COUNT):
+        port = _free_port()
+        workdir = tmp_path_factory.mktemp(f"redis{index}")
+        processes.append(
+            subprocess.Popen(
+                ["redis-server", "--port", str(port), "--save", "", "--dir", str(workdir)],
+                stdout=subprocess.DEVNULL,
+            )
+        )
+        uris.append(f"redis://127.0.0.1:{port}/0")
+    try:
+        for uri in uris:
+            client = SyncRedis.from_url(uri)
+            deadline = time.monotonic() + 5
+            while True:
+                try:
+                    client.ping()
+                    break
+                except Exception:
+                    if time.monotonic() > deadline:
+                        raise
+                    time.sleep(0.05)
+            client.close()
+        yield uris
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait(timeout=5)
+
+
+@pytest.fixture(scope="module")
+def cluster_uri(tmp_path_factory: pytest.TempPathFactory) -> Iterator[str]:
+    """A one-node Redis Cluster owning every slot."""
+    port = _cluster_port()
+    workdir = tmp_path_factory.mktemp("cluster")
+    process = subprocess.Popen(
+        [
+            "redis-server",
+            "--port",
+            str(port),
+            "--save",
+            "",
+            "--dir",
+            str(workdir),
+            "--cluster-enabled",
+            "yes",
+        ],
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        client = SyncRedis(port=port, decode_responses=True)
+        deadline = time.monotonic() + 5
+        while True:
+            try:
+                client.execute_command("CLUSTER ADDSLOTS", *range(16384))
+                break
+            except Exception:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.05)
+        while client.execute_command("CLUSTER INFO")["cluster_state"] != "ok":
+            if time.monotonic() > deadline:
+                raise TimeoutError("cluster did not come up")
+            time.sleep(0.05)
+        client.close()
+        yield f"redis://127.0.0.1:{port}"
+    finally:
+        process.terminate()
+        process.wait(timeout=5)
+
+
+@pytest.fixture
+async def shards(redis_uris: list[str]) -> AsyncIterator[CacheShards]:
+    clients = {uri: Redis.from_url(uri, decode_responses=True) for uri in redis_uris}
+    for client in clients.values():
+        await client.flushdb()
+    cache_shards = CacheShards(clients)
+    yield cache_shards
+    await cache_shards.close()
+
+
+async def test_records_land_on_the_ring_owner(shards: CacheShards, redis_uris: list[str]) -> None:
+    pubsub = Redis.from_url(redis_uris[0], decode_responses=True)
+    cache = UrlCache(shards, pubsub)
+    codes = [f"code{index:03d}" for index in range(60)]
+    for code in codes:
+        await cache.store(code, CachedTarget(target_url=f"https://example.com/{code}"), 60)
+
+    owners = {shards.name_for(code) for code in codes}
+    assert owners == set(redis_uris)
+    for code in codes:
+        owner = Redis.from_url(shards.name_for(code), decode_responses=True)
+        assert await owner.exists(UrlCache.key(code)) == 1
+        await owner.close()
+        record = await cache.get(code)
+        assert record is not None
+        assert record.target_url == f"https://example.com/{code}"
+    await pubsub.close()
+
+
+async def test_compare_and_set_runs_per_shard(shards: CacheShards, redis_uris: list[str]) -> None:
+    pubsub = Redis.from_url(redis_uris[0], decode_responses=True)
+    cache = UrlCache(shards, pubsub)
+    for code in ("alpha", "bravo", "charlie", "delta"):
+        assert await cache.store(code, CachedTarget(target_url="https://new/", version=2), 60)
+        assert not await cache.store(code, CachedTarget(target_url="https://old/", version=1), 60)
+        record = await cache.get(code)
+        assert record is not None and record.target_url == "https://new/"
+    await pubsub.close()
+
+
+async def test_health_reports_every_shard(shards: CacheShards, redis_uris: list[str]) -> None:
+    report = await shards.health()
+    addresses = [uri.removeprefix("redis://").removesuffix("/0") for uri in redis_uris]
+    assert sorted(item["node"] for item in report) == sorted(addresses)
+    assert all(item["status"] == "ok" for item in report)
+
+
+async def test_health_pings_each_cluster_node(cluster_uri: str) -> None:
+    cluster = RedisCluster.from_url(cluster_uri, decode_responses=True)
+    shards = CacheShards({}, cluster=cluster)
+    report = await shards.health()
+    assert [item["node"] for item in report] == [cluster_uri.removeprefix("redis://")]
+    assert report[0]["status"] == "ok"
+    assert report[0]["max_connections"] is not None
+    await shards.close()
+
+
+async def test_store_many_pipelines_per_shard(shards: CacheShards, redis_uris: list[str]) -> None:
+    pubsub = Redis.from_url(redis_uris[0], decode_responses=True)
+    cache = UrlCache(shards, pubsub)
+    await cache.store("newer", CachedTarget(target_url="https://newer/", version=5), 60)
+    await cache.store("gone", CachedTarget(target_url="https://gone/"), 60)
+
+    stored = await cache.store_many(
+        {
+            "fresh": (CachedTarget(target_url="https://fresh/", version=1), 60, False),
+            "newer": (CachedTarget(target_url="https://older/", version=4), 60, False),
+            "gone": (CachedTarget(target_url="https://gone/"), 0, False),
+            "forced": (CachedTarget.tombstone(3), 60, True),
+        }
+    )
+
+    assert stored == 2
+    fresh = await cache.get("fresh")
+    assert fresh is not None and fresh.target_url == "https://fresh/"
+    newer = await cache.get("newer")
+    assert newer is not None and newer.target_url == "https://newer/"
+    assert await cache.get("gone") is None
+    forced = await cache.get("forced")
+    assert forced is not None and forced.deleted
+    await pubsub.close()
+
+
+async def test_quota_clicks_are_claimed_with_the_read(
+    shards: CacheShards, redis_uris: list[str]
+) -> None:
+    pubsub = Redis.from_url(redis_uris[0], decode_responses=True)
+    cache = UrlCache(shards, pubsub, local_cache=LocalTTLCache(100, 60))
+    await cache.store("capped", CachedTarget(target_url="https://capped/", max_clicks=3), 60)
+    await cache.store("open", CachedTarget(target_url="https://open/"), 60)
+
+    outcomes = [(await cache.get_for_redirect("capped"))[1] for _ in range(5)]
+    assert outcomes == [True, True, True, False, False]
+    for _ in range(5):
+        record, allowed, _ = await cache.get_for_redirect("open")
+        assert allowed and record is not None
+    # Counters live on the primary Redis, not on the evicting cache node.
+    assert await pubsub.get(UrlCache.counter_key("capped")) == "3"
+    assert await pubsub.exists(UrlCache.counter_key("open")) == 0
+    await pubsub.close()
+
+
+async def test_quota_counters_survive_losing_the_cached_record(
+    shards: CacheShards, redis_uris: list[str]
+) -> None:
+    pubsub = Redis.from_url(redis_uris[0], decode_responses=True)
+    await pubsub.delete(UrlCache.counter_key("evicted"))
+    cache = UrlCache(shards, pubsub)
+    record = CachedTarget(target_url="https://evicted/", max_clicks=3, clicks_used=0)
+    await cache.store("evicted", record, 60)
+    assert [(await cache.get_for_redirect("evicted"))[1] for _ in range(2)] == [True, True]
+
+    owner = Redis.from_url(shards.name_for("evicted"), decode_responses=True)
+    await owner.delete(UrlCache.key("evicted"))
+    await owner.close()
+    # The re-cached record still carries the stale flushed count; the counter does not.
+    await cache.store("evicted", record, 60)
+    assert [(await cache.get_for_redirect("evicted"))[1] for _ in range(2)] == [True, False]
+    await pubsub.close()
+
+
+async def test_lost_counters_are_seeded_from_the_flushed_count(
+    shards: CacheShards, redis_uris: list[str]
+) -> None:
+    pubsub = Redis.from_url(redis_uris[0], decode_responses=True)
+    cache = UrlCache(shards, pubsub)
+    record = CachedTarget(target_url="https://seeded/", max_clicks=5, clicks_used=4)
+    assert await cache.claim_click("seeded", record)
+    assert not await cache.claim_click("seeded", record)
+    assert await cache.claim_click("unlimited", CachedTarget(target_url="https://u/"))
+    await pubsub.close()
+
+
+async def test_hot_records_near_expiry_are_flagged_for_refresh_once(
+    shards: CacheShards, redis_uris: list[str]
+) -> None:
+    pubsub = Redis.from_url(redis_uris[0], decode_responses=True)
+    policy = PopularityTtl(
+        default_seconds=60,
+        min_seconds=5,
+        max_seconds=100,
+        hot_threshold=3,
+        refresh_ahead_ratio=0.5,
+    )
+    cache = UrlCache(shards, pubsub, popularity=CountMinSketch(1024), ttl_policy=policy)
+    record = CachedTarget(target_url="https://hot/", version=1)
+    await cache.store("hot", record, 10)
+
+    flags = [(await cache.get_for_redirect("hot"))[2] for _ in range(4)]
+    # Not hot for the first two reads, then a single refresh until the record is rewritten.
+    assert flags == [False, False, True, False]
+    assert cache.ttl_for("hot") == 100
+    assert cache.ttl_for("never-read") == 60
+
+    await cache.store("hot", record, 100)
+    assert (await cache.get_for_redirect("hot"))[2] is False
+    await pubsub.close()
+
+
+async def test_hot_records_cached_to_their_expiry_are_not_refreshed(
+    shards: CacheShards, redis_uris: list[str]
+) -> None:
+    pubsub = Redis.from_url(redis_uris[0], decode_responses=True)
+    policy = PopularityTtl(60, 5, 100, hot_threshold=1, refresh_ahead_ratio=0.5)
+    cache = UrlCache(shards, pubsub, popularity=CountMinSketch(1024), ttl_policy=policy)
+    # The link expires in 10 seconds, so its record was only ever cached for that long.
+    capped = CachedTarget(target_url="https://capped/", version=1, expires_at=time.time() + 10)
+    await cache.store("capped", capped, 10)
+
+    for _ in range(3):
+        assert (await cache.get_for_redirect("capped"))[2] is False
+    await pubsub.close()
@@ -0,0 +1,277 @@
+"""Change-stream cache sync: event planning, plus an end-to-end run against a throwaway
+single-node replica set (``mongod``) and ``redis-server`` when both binaries exist."""
+
+import asyncio
+import shutil
+import socket
+import subprocess
+import time
+from collections.abc import Iterator
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+pytest.importorskip("motor")
+pytest.importorskip("redis")
+
+from app.db.url_cache import UrlCache  # noqa: E402
+from app.services.cache_sync import (  # noqa: E402
+    CacheSyncConfig,
+    UrlCacheSync,
+    change_stream_pipeline,
+    plan_cache_changes,
+)
+from app.utils.cache_record import CachedTarget  # noqa: E402
+
+
+def test_later_events_win_per_code() -> None:
+    planned, unresolved = plan_cache_changes(
+        [
+            {
+                "operationType": "insert",
+                "fullDocument": {"short_code": "a", "target_url": "https://a/1", "version": 0},
+            },
+            {
+                "operationType": "update",
+                "fullDocument": {"short_code": "a", "target_url": "https://a/2", "version": 1},
+            },
+            {
+                "operationType": "update",
+                "fullDocument": {"short_code": "b", "target_url": "https://b/", "version": 3},
+            },
+        ]
+    )
+    assert unresolved == 0
+    record, inserted = planned["a"]
+    assert (record.target_url, record.version, inserted) == ("https://a/2", 1, False)
+    record, inserted = planned["b"]
+    assert (record.target_url, record.version, inserted) == ("https://b/", 3, False)
+
+
+def test_inserts_are_planned_as_inserts() -> None:
+    planned, _ = plan_cache_changes(
+        [
+            {
+                "operationType": "delete",
+                "fullDocumentBeforeChange": {"short_code": "a", "version": 4},
+            },
+            {
+                "operationType": "insert",
+                "fullDocument": {"short_code": "a", "target_url": "https://a/", "version": 0},
+            },
+        ]
+    )
+    record, inserted = planned["a"]
+    assert record.target_url == "https://a/" and inserted
+
+
+def test_deletes_become_tombstones() -> None:
+    planned, unresolved = plan_cache_changes(
+        [
+            {
+                "operationType": "delete",
+                "fullDocumentBeforeChange": {"short_code": "a", "version": 2},
+            },
+            {"operationType": "delete", "documentKey": {"_id": 1}},
+            {"operationType": "update", "fullDocument": None},
+        ]
+    )
+    assert unresolved == 1
+    assert list(planned) == ["a"]
+    record, inserted = planned["a"]
+    assert record.deleted and record.version == 3 and not inserted
+
+
+def test_pipeline_ignores_click_counter_updates() -> None:
+    match = change_stream_pipeline()[0]["$match"]["$or"]
+    update_filter = match[1]["$or"]
+    assert {"updateDescription.updatedFields.target_url": {"$exists": True}} in update_filter
+    assert not any("click_count" in str(condition) for condition in update_filter)
+
+
+def _sync(cache: UrlCache) -> UrlCacheSync:
+    config = CacheSyncConfig(
+        url_collection="urls", checkpoint_collection="checkpoints", cache_ttl_seconds=3600
+    )
+    return UrlCacheSync({"urls": None, "checkpoints": None}, cache, config)  # type: ignore[arg-type]
+
+
+def _insert(short_code: str, target_url: str, version: int = 1) -> dict[str, Any]:
+    document = {"short_code": short_code, "target_url": target_url, "version": version}
+    return {"operationType": "insert", "fullDocument": document}
+
+
+async def test_inserts_are_not_cached(url_cache: UrlCache) -> None:
+    await _sync(url_cache).apply([_insert("imported", "https://imported/")])
+
+    assert await url_cache.get("imported") is None
+
+
+async def test_inserts_clear_missing_markers_and_older_tombstones(url_cache: UrlCache) -> None:
+    await url_cache.store("probed", CachedTarget.tombstone(0), 60)
+    await url_cache.store("reused", CachedTarget.tombstone(1), 60)
+
+    await _sync(url_cache).apply(
+        [_insert("probed", "https://probed/"), _insert("reused", "https://reused/")]
+    )
+
+    assert await url_cache.get("probed") is None
+    assert await url_cache.get("reused") is None
+
+
+async def test_stale_insert_never_replaces_what_the_api_wrote_since(url_cache: UrlCache) -> None:
+    # The link was patched, and another one deleted, before their insert events arrived.
+    await url_cache.store("patched", CachedTarget(target_url="https://new/", version=2), 3600)
+    await url_cache.store("deleted", CachedTarget.tombstone(2), 60)
+
+    await _sync(url_cache).apply(
+        [_insert("patched", "https://old/"), _insert("deleted", "https://gone/")]
+    )
+
+    patched = await url_cache.get("patched")
+    assert patched is not None and (patched.target_url, patched.version) == ("https://new/", 2)
+    deleted = await url_cache.get("deleted")
+    assert deleted is not None and deleted.deleted
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until(check, timeout: float = 15.0) -> None:  # type: ignore[no-untyped-def]
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if check():
+                return
+        except Exception:
+            if time.monotonic() > deadline:
+                raise
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.1)
+
+
+@pytest.fixture(scope="module")
+def services(tmp_path_factory: pytest.TempPathFactory) -> Iterator[tuple[str, str]]:
+    if shutil.which("mongod") is None or shutil.which("redis-server") is None:
+        pytest.skip("mongod and redis-server binaries are required")
+    from pymongo import MongoClient
+    from redis import Redis as SyncRedis
+
+    mongo_port, redis_port = _free_port(), _free_port()
+    mongo_dir: Path = tmp_path_factory.mktemp("mongo")
+    redis_dir: Path = tmp_path_factory.mktemp("redis")
+    processes = [
+        subprocess.Popen(
+            [
+                "mongod",
+                "--replSet",
+                "rs0",
+                "--port",
+                str(mongo_port),
+                "--bind_ip",
+                "127.0.0.1",
+                "--dbpath",
+                str(mongo_dir),
+            ],
+            stdout=subprocess.DEVNULL,
+        ),
+        subprocess.Popen(
+            ["redis-server", "--port", str(redis_port), "--save", "", "--dir", str(redis_dir)],
+            stdout=subprocess.DEVNULL,
+        ),
+    ]
+    try:
+        admin = MongoClient(f"mongodb://127.0.0.1:{mongo_port}/?directConnection=true")
+        _wait_until(lambda: admin.admin.command("ping")["ok"])
+        admin.admin.command(
+            "replSetInitiate",
+            {"_id": "rs0", "members": [{"_id": 0, "host": f"127.0.0.1:{mongo_port}"}]},
+        )
+        _wait_until(lambda: admin.admin.command("hello").get("isWritablePrimary"))
+        admin.close()
+        redis = SyncRedis(port=redis_port)
+        _wait_until(redis.ping)
+        redis.close()
+        yield (
+            f"mongodb://127.0.0.1:{mongo_port}/?replicaSet=rs0",
+            f"redis://127.0.0.1:{redis_port}/0",
+        )
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait(timeout=30)
+
+
+async def test_changes_reach_the_cache_and_resume(services: tuple[str, str]) -> None:
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from redis.asyncio import Redis
+
+    from app.db.redis_cache import CacheShards
+    from app.db.url_cache import UrlCache
+    from app.services.cache_sync import CacheSyncConfig, UrlCacheSync
+
+    mongo_uri, redis_uri = services
+    client = AsyncIOMotorClient(mongo_uri, tz_aware=True)
+    database = client["cache_sync_test"]
+    await database.drop_collection("urls")
+    await database.drop_collection("checkpoints")
+    await database.create_collection("urls")
+    redis = Redis.from_url(redis_uri, decode_responses=True)
+    await redis.flushdb()
+    cache = UrlCache(CacheShards({redis_uri: redis}), redis)
+    config = CacheSyncConfig(
+        url_collection="urls",
+        checkpoint_collection="checkpoints",
+        cache_ttl_seconds=60,
+        batch_size=2,
+        max_await_ms=100,
+    )
+
+    async def eventually(short_code: str, check) -> None:  # type: ignore[no-untyped-def]
+        for _ in range(100):
+            if check(await cache.get(short_code)):
+                return
+            await asyncio.sleep(0.1)
+        raise AssertionError(f"cache for {short_code} never converged")
+
+    async def run_sync() -> tuple[asyncio.Event, asyncio.Task[None]]:
+        stop = asyncio.Event()
+        task = asyncio.create_task(UrlCacheSync(database, cache, config).run(stop))
+        await asyncio.sleep(1.0)
+        return stop, task
+
+    stop, task = await run_sync()
+    urls = database["urls"]
+    await urls.insert_one({"short_code": "keep", "target_url": "https://keep/", "version": 0})
+    await urls.insert_one({"short_code": "drop", "target_url": "https://drop/", "version": 0})
+    await urls.update_one(
+        {"short_code": "keep"}, {"$set": {"target_url": "https://kept/"}, "$inc": {"version": 1}}
+    )
+    await urls.delete_one({"short_code": "drop"})
+    await eventually("keep", lambda record: record and record.target_url == "https://kept/")
+    await eventually("drop", lambda record: record and record.deleted)
+    stop.set()
+    await task
+
+    # Changes made while the consumer is down are replayed from the checkpoint.
+    expires_at = datetime.now(UTC) + timedelta(hours=1)
+    await urls.update_one(
+        {"short_code": "keep"},
+        {
+            "$set": {"target_url": "https://later/", "expires_at": expires_at},
+            "$inc": {"version": 1},
+        },
+    )
+    stop, task = await run_sync()
+    await eventually("keep", lambda record: record and record.target_url == "https://later/")
+    stop.set()
+    await task
+
+    await redis.close()
+    client.close()
@@ -0,0 +1,55 @@
+from collections import Counter
+
+from app.utils.hash_ring import ConsistentHashRing
+
+KEYS = [f"code{index:05d}" for index in range(20000)]
+
+
+def test_node_for_is_deterministic() -> None:
+    first = ConsistentHashRing(["a", "b", "c"])
+    second = ConsistentHashRing(["c", "b", "a"])
+    assert all(first.node_for(key) == second.node_for(key) for key in KEYS[:500])
+
+
+def test_keys_are_spread_across_nodes() -> None:
+    ring = ConsistentHashRing(["a", "b", "c", "d"])
+    counts = Counter(ring.node_for(key) for key in KEYS)
+    assert set(counts) == {"a", "b", "c", "d"}
+    expected = len(KEYS) / 4
+    assert all(abs(count - expected) / expected < 0.25 for count in counts.values())
+
+
+def test_adding_a_node_moves_only_its_share() -> None:
+    ring = ConsistentHashRing(["a", "b", "c"])
+    before = {key: ring.node_for(key) for key in KEYS}
+    ring.add_node("d")
+    moved = [key for key in KEYS if ring.node_for(key) != before[key]]
+    assert all(ring.node_for(key) == "d" for key in moved)
+    assert len(moved) / len(KEYS) < 0.35
+
+
+def test_removing_a_node_only_moves_its_keys() -> None:
+    ring = ConsistentHashRing(["a", "b", "c"])
+    before = {key: ring.node_for(key) for key in KEYS}
+    ring.remove_node("b")
+    assert ring.nodes == ["a", "c"]
+    for key in KEYS:
+        if before[key] != "b":
+            assert ring.node_for(key) == before[key]
+
+
+def test_empty_ring_and_duplicate_nodes_are_rejected() -> None:
+    ring = ConsistentHashRing([])
+    try:
+        ring.node_for("abc")
+    except LookupError:
+        pass
+    else:  # pragma: no cover - guard
+        raise AssertionError("Expected LookupError for empty ring")
+    ring.add_node("a")
+    try:
+        ring.add_node("a")
+    except ValueError as exc:
+        assert "already" in str(exc)
+    else:  # pragma: no cover - guard
+        raise AssertionError("Expected ValueError for duplicate node")
@@ -0,0 +1,65 @@
+from pathlib import Path
+
+import pytest
+
+from app.utils.import_reader import detect_format, iter_import_rows
+
+
+def test_csv_rows_use_lowercased_header(tmp_path: Path) -> None:
+    path = tmp_path / "links.csv"
+    path.write_text(
+        "﻿URL,Alias,max_clicks\n"
+        "https://example.com/a,first,\n"
+        '"https://example.com/b?x=1,2",,5\n',
+        encoding="utf-8",
+    )
+    rows = list(iter_import_rows(path))
+    assert [row.fields for row in rows] == [
+        {"url": "https://example.com/a", "alias": "first"},
+        {"url": "https://example.com/b?x=1,2", "max_clicks": "5"},
+    ]
+    assert rows[0].next_offset == rows[1].offset
+    assert rows[1].next_offset == path.stat().st_size
+
+
+def test_ndjson_reports_bad_lines_without_stopping(tmp_path: Path) -> None:
+    path = tmp_path / "links.ndjson"
+    path.write_bytes(
+        b'{"target_url": "https://example.com/a"}\n'
+        b"not json\n"
+        b"\n"
+        b"[1, 2]\n"
+        b"\xff\xfe\n"
+        b'{"target_url": "https://example.com/b"}'
+    )
+    rows = list(iter_import_rows(path))
+    assert [row.fields for row in rows] == [
+        {"target_url": "https://example.com/a"},
+        None,
+        None,
+        None,
+        {"target_url": "https://example.com/b"},
+    ]
+    assert rows[1].error is not None and rows[1].error.startswith("invalid JSON")
+    assert rows[2].error == "expected a JSON object"
+    assert rows[3].error == "invalid UTF-8"
+
+
+def test_resume_from_checkpointed_offset(tmp_path: Path) -> None:
+    path = tmp_path / "links.csv"
+    path.write_text(
+        "url\n" + "".join(f"https://example.com/{index}\n" for index in range(10)),
+        encoding="utf-8",
+    )
+    rows = list(iter_import_rows(path))
+    resumed = list(iter_import_rows(path, start_offset=rows[6].next_offset))
+    assert [row.fields for row in resumed] == [row.fields for row in rows[7:]]
+    # An offset of zero (or inside the header) starts at the first data row.
+    assert len(list(iter_import_rows(path, start_offset=0))) == 10
+
+
+def test_detect_format(tmp_path: Path) -> None:
+    assert detect_format(tmp_path / "a.CSV") == "csv"
+    assert detect_format(tmp_path / "a.jsonl") == "ndjson"
+    with pytest.raises(ValueError):
+        detect_format(tmp_path / "a.txt")
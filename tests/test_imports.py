@@ -0,0 +1,163 @@
+"""Link import writes and checkpointed resume against a real Mongo database."""
+
+import io
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+pytest.importorskip("pymongo")
+pytest.importorskip("celery")
+
+from bson import ObjectId  # noqa: E402
+from pymongo.errors import BulkWriteError  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.tasks import imports  # noqa: E402
+from app.tasks.imports import ImportStats, _derived_code, _Rejects, import_links  # noqa: E402
+from app.utils.import_reader import RawImportRow  # noqa: E402
+
+OWNER = ObjectId()
+SEED = "import:test"
+
+
+@pytest.fixture
+def urls(sync_mongo_database: Any) -> Any:
+    collection = sync_mongo_database[settings.mongo_database_settings["urls"]]
+    collection.create_index("short_code", unique=True)
+    return collection
+
+
+def _row(offset: int, short_code: str | None, target_url: str) -> tuple[RawImportRow, dict]:
+    fields = {"url": target_url, **({"alias": short_code} if short_code else {})}
+    doc = {"short_code": short_code, "target_url": target_url, "owner_id": OWNER, "version": 1}
+    return RawImportRow(offset, offset + 1, fields, None), doc
+
+
+def _write(urls: Any, chunk: list[tuple[RawImportRow, dict]]) -> tuple[ImportStats, list[dict]]:
+    stats = ImportStats()
+    handle = io.StringIO()
+    imports._write_chunk(urls, OWNER, SEED, chunk, stats, _Rejects(handle))
+    return stats, [json.loads(line) for line in handle.getvalue().splitlines()]
+
+
+def test_write_chunk_sorts_rows_into_inserted_replayed_and_conflicts(urls: Any) -> None:
+    urls.insert_many(
+        [
+            {"short_code": "mine", "target_url": "https://example.com/mine", "owner_id": OWNER},
+            {"short_code": "theirs", "target_url": "https://example.com/t", "owner_id": ObjectId()},
+        ]
+    )
+    stats, rejected = _write(
+        urls,
+        [
+            _row(0, "fresh", "https://example.com/fresh"),
+            _row(1, "mine", "https://example.com/mine"),
+            _row(2, "theirs", "https://example.com/t"),
+            _row(3, "twice", "https://example.com/1"),
+            _row(4, "twice", "https://example.com/2"),
+        ],
+    )
+
+    assert (stats.inserted, stats.already_imported, stats.conflicts) == (2, 1, 2)
+    assert [(reject["offset"], reject["reason"]) for reject in rejected] == [
+        (2, "alias already in use"),
+        (4, "alias repeated in input"),
+    ]
+    assert urls.find_one({"short_code": "twice"})["target_url"] == "https://example.com/1"
+
+
+def test_taken_derived_codes_are_derived_again(urls: Any) -> None:
+    taken = _derived_code(SEED, 0)
+    urls.insert_one({"short_code": taken, "target_url": "https://other/", "owner_id": ObjectId()})
+
+    stats, rejected = _write(urls, [_row(0, None, "https://example.com/derived")])
+
+    assert (stats.inserted, stats.conflicts, rejected) == (1, 0, [])
+    doc = urls.find_one({"target_url": "https://example.com/derived"})
+    assert doc["short_code"] == _derived_code(SEED, 0, attempt=1)
+
+    # Replaying the row finds its own document under the salted code.
+    stats, _ = _write(urls, [_row(0, None, "https://example.com/derived")])
+    assert (stats.inserted, stats.already_imported) == (0, 1)
+
+
+def test_codes_taken_after_the_lookup_are_handled_from_the_bulk_error(
+    urls: Any, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    urls.insert_many(
+        [
+            {"short_code": "raced", "target_url": "https://other/", "owner_id": ObjectId()},
+            {"short_code": _derived_code(SEED, 1), "target_url": "https://o/", "owner_id": None},
+        ]
+    )
+    find = type(urls).find
+    lookups = 0
+
+    def racing_find(self: Any, *args: Any, **kwargs: Any) -> Any:
+        # The first lookup misses what another writer inserted just before the insert.
+        nonlocal lookups
+        lookups += 1
+        return [] if lookups == 1 else find(self, *args, **kwargs)
+
+    monkeypatch.setattr(type(urls), "find", racing_find)
+    stats, rejected = _write(
+        urls,
+        [
+            _row(0, "raced", "https://example.com/raced"),
+            _row(1, None, "https://example.com/derived"),
+            _row(2, "clean", "https://example.com/clean"),
+        ],
+    )
+
+    assert (stats.inserted, stats.conflicts) == (2, 1)
+    assert [reject["offset"] for reject in rejected] == [0]
+    assert urls.find_one({"short_code": _derived_code(SEED, 1, attempt=1)}) is not None
+
+
+def test_other_write_errors_are_not_swallowed(urls: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    def failing_insert(*_: Any, **__: Any) -> None:
+        details = {"writeErrors": [{"index": 0, "code": 121}], "nInserted": 0}
+        raise BulkWriteError(details)
+
+    monkeypatch.setattr(type(urls), "insert_many", failing_insert)
+    with pytest.raises(BulkWriteError):
+        _write(urls, [_row(0, "invalid", "https://example.com/invalid")])
+
+
+def _write_csv(path: Path, rows: int) -> None:
+    lines = ["url,alias"] + [f"https://example.com/{index},link{index}" for index in range(rows)]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def test_import_resumes_from_its_checkpoint(
+    sync_mongo_database: Any, urls: Any, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    path = tmp_path / "links.csv"
+    _write_csv(path, 10)
+    write_chunk = imports._write_chunk
+    calls = 0
+
+    def crash_after_second_chunk(*args: Any) -> None:
+        nonlocal calls
+        calls += 1
+        write_chunk(*args)
+        if calls == 2:
+            raise RuntimeError("worker lost")
+
+    # The second chunk is written, but the run dies before checkpointing it.
+    monkeypatch.setattr(imports, "_write_chunk", crash_after_second_chunk)
+    with pytest.raises(RuntimeError):
+        import_links(sync_mongo_database, path, str(OWNER), checkpoint_id="job", chunk_size=4)
+    monkeypatch.setattr(imports, "_write_chunk", write_chunk)
+    checkpoints = sync_mongo_database[settings.mongo_database_settings["checkpoints"]]
+    saved = checkpoints.find_one({"_id": "import:job"})
+    assert saved["stats"]["rows"] == 4 and not saved["completed"]
+
+    stats = import_links(sync_mongo_database, path, str(OWNER), checkpoint_id="job", chunk_size=4)
+
+    assert (stats.rows, stats.inserted, stats.already_imported, stats.conflicts) == (10, 6, 4, 0)
+    assert stats.offset == path.stat().st_size
+    assert urls.count_documents({}) == 10
+    assert checkpoints.find_one({"_id": "import:job"})["completed"]
@@ -0,0 +1,53 @@
+from app.utils.local_cache import LocalTTLCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_entries_expire_after_ttl() -> None:
+    clock = FakeClock()
+    cache: LocalTTLCache[str] = LocalTTLCache(10, ttl_seconds=5, clock=clock)
+    cache.set("abc", "https://example.com/")
+    clock.now = 4.9
+    assert cache.get("abc") == "https://example.com/"
+    clock.now = 5.0
+    assert cache.get("abc") is None
+    assert len(cache) == 0
+
+
+def test_per_entry_ttl_cannot_exceed_default() -> None:
+    clock = FakeClock()
+    cache: LocalTTLCache[str] = LocalTTLCache(10, ttl_seconds=5, clock=clock)
+    cache.set("short", "a", ttl_seconds=1)
+    cache.set("long", "b", ttl_seconds=60)
+    clock.now = 2
+    assert cache.get("short") is None
+    assert cache.get("long") == "b"
+    clock.now = 6
+    assert cache.get("long") is None
+
+
+def test_least_recently_used_entry_is_evicted() -> None:
+    cache: LocalTTLCache[int] = LocalTTLCache(2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_invalidate_and_non_positive_ttl() -> None:
+    cache: LocalTTLCache[int] = LocalTTLCache(2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.invalidate("a")
+    assert cache.get("a") is None
+    cache.set("b", 2)
+    cache.set("b", 3, ttl_seconds=0)
+    assert cache.get("b") is None
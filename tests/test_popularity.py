@@ -0,0 +1,79 @@
+from app.utils.popularity import AGE_CHUNK, CountMinSketch, PopularityTtl
+
+
+def test_sketch_never_undercounts() -> None:
+    sketch = CountMinSketch(width=64, depth=4, sample_size=10**6)
+    truth: dict[str, int] = {}
+    for index in range(2000):
+        key = f"k{index % 300}" if index % 3 else "hot"
+        truth[key] = truth.get(key, 0) + 1
+        sketch.add(key)
+    for key, count in truth.items():
+        assert sketch.estimate(key) >= count
+    # The hot key dominates; collisions should not blur it into the tail.
+    assert sketch.estimate("hot") < truth["hot"] * 2
+    assert sketch.estimate("unseen") <= max(truth.values())
+
+
+def test_sketch_ages_counts() -> None:
+    sketch = CountMinSketch(width=1024, depth=2, sample_size=100)
+    for _ in range(99):
+        sketch.add("viral")
+    assert sketch.estimate("viral") == 99
+    sketch.add("other")  # the 100th addition halves every counter
+    assert sketch.estimate("viral") == 49
+    assert sketch.estimate("other") == 0
+
+
+def test_wide_sketch_ages_in_place_across_additions() -> None:
+    sketch = CountMinSketch(width=3 * AGE_CHUNK, depth=2, sample_size=100)
+    rows = list(sketch._rows)
+    keys = [f"k{index}" for index in range(200)]
+    for index in range(99):
+        sketch.add(keys[index % len(keys)] if index % 2 else "viral")
+    counts = {key: sketch.estimate(key) for key in ["viral", *keys]}
+
+    sketch.add("start")  # the 100th addition starts the pass with the first chunk
+    sketch.add("step")
+    sketch.add("step")  # the third chunk completes it
+
+    assert all(a is b for a, b in zip(sketch._rows, rows, strict=True))
+    for key, count in counts.items():
+        assert sketch.estimate(key) >= count // 2
+    assert sketch.estimate("viral") == counts["viral"] // 2
+    assert sketch._age_cursor is None
+
+
+def test_ttl_scales_with_popularity() -> None:
+    policy = PopularityTtl(
+        default_seconds=3600, min_seconds=300, max_seconds=86400, hot_threshold=32
+    )
+    assert policy.ttl_for(0) == 3600
+    assert policy.ttl_for(1) == 300
+    ttls = [policy.ttl_for(count) for count in (2, 4, 8, 16)]
+    assert ttls == sorted(ttls) and 300 < ttls[0] and ttls[-1] < 86400
+    assert policy.ttl_for(32) == policy.ttl_for(10**6) == 86400
+
+
+def test_refresh_ahead_only_for_hot_links_near_expiry() -> None:
+    policy = PopularityTtl(
+        default_seconds=3600,
+        min_seconds=300,
+        max_seconds=1000,
+        hot_threshold=10,
+        refresh_ahead_ratio=0.1,
+    )
+    assert policy.should_refresh(10, remaining_ms=50_000)
+    assert not policy.should_refresh(10, remaining_ms=200_000)
+    assert not policy.should_refresh(9, remaining_ms=50_000)
+    assert not policy.should_refresh(10, remaining_ms=-1)  # key has no TTL
+    assert not PopularityTtl(3600, 300, 1000, 10).should_refresh(10, remaining_ms=50_000)
+
+
+def test_refresh_ahead_is_measured_against_the_links_own_expiry() -> None:
+    policy = PopularityTtl(3600, 300, 1000, 10, refresh_ahead_ratio=0.1)
+    # Cached right up to the link's expiry: a refresh could not extend it.
+    assert not policy.should_refresh(10, remaining_ms=50_000, expires_in_ms=50_000)
+    # Cached for far less than the link still has left.
+    assert policy.should_refresh(10, remaining_ms=50_000, expires_in_ms=3_600_000)
+    assert policy.should_refresh(10, remaining_ms=5_000, expires_in_ms=100_000)
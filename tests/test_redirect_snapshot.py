@@ -0,0 +1,94 @@
+"""The offline redirect snapshot as the API reads it and the beat job exports it."""
+
+import os
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("pymongo")
+pytest.importorskip("celery")
+
+from app.core.config import settings  # noqa: E402
+from app.db import redirect_snapshot  # noqa: E402
+from app.db.redirect_snapshot import RedirectSnapshot  # noqa: E402
+from app.tasks.snapshot import export_redirect_snapshot  # noqa: E402
+from app.utils.snapshot import SnapshotReader, SnapshotWriter  # noqa: E402
+
+
+def _write(path: Path, records: dict[str, str]) -> None:
+    with SnapshotWriter(path, page_records=4) as writer:
+        for short_code in sorted(records):
+            writer.add(short_code, records[short_code], None)
+
+
+def test_snapshots_older_than_the_staleness_limit_are_not_served(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    path = tmp_path / "redirects.snap"
+    _write(path, {"code": "https://example.com/"})
+    snapshot = RedirectSnapshot(path, max_staleness_seconds=3600)
+    assert snapshot.lookup("code") == ("https://example.com/", None)
+
+    later = redirect_snapshot.time.time() + 3601
+    monkeypatch.setattr(redirect_snapshot, "time", SimpleNamespace(time=lambda: later))
+
+    assert snapshot.lookup("code") is None
+    snapshot.close()
+
+
+def test_replaced_snapshot_is_remapped(tmp_path: Path) -> None:
+    path = tmp_path / "redirects.snap"
+    _write(path, {"code": "https://example.com/old"})
+    snapshot = RedirectSnapshot(path, max_staleness_seconds=3600)
+    assert snapshot.lookup("code") == ("https://example.com/old", None)
+
+    _write(path, {"code": "https://example.com/new"})
+    # Filesystems with coarse timestamps could report the same mtime for both writes.
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert snapshot.lookup("code") == ("https://example.com/new", None)
+    snapshot.close()
+
+
+def test_missing_file_or_disabled_snapshot_serves_nothing(tmp_path: Path) -> None:
+    assert RedirectSnapshot(tmp_path / "absent.snap", 3600).lookup("code") is None
+    path = tmp_path / "redirects.snap"
+    _write(path, {"code": "https://example.com/"})
+    assert RedirectSnapshot(path, max_staleness_seconds=0).lookup("code") is None
+
+
+def test_export_leaves_out_quota_and_expired_links(
+    sync_mongo_database: Any, tmp_path: Path
+) -> None:
+    now = datetime.now(UTC)
+    sync_mongo_database[settings.mongo_database_settings["urls"]].insert_many(
+        [
+            {"short_code": "plain", "target_url": "https://example.com/plain"},
+            {
+                "short_code": "dated",
+                "target_url": "https://example.com/dated",
+                "expires_at": now + timedelta(days=1),
+            },
+            {
+                "short_code": "expired",
+                "target_url": "https://example.com/expired",
+                "expires_at": now - timedelta(minutes=1),
+            },
+            {"short_code": "capped", "target_url": "https://example.com/c", "max_clicks": 10},
+        ]
+    )
+    path = tmp_path / "redirects.snap"
+
+    assert export_redirect_snapshot(sync_mongo_database, path, page_records=2) == 2
+
+    reader = SnapshotReader(path)
+    assert reader.lookup("plain") == ("https://example.com/plain", None)
+    dated = reader.lookup("dated")
+    assert dated is not None and dated[1] == pytest.approx((now + timedelta(days=1)).timestamp())
+    assert reader.lookup("expired") is None and reader.lookup("capped") is None
+    reader.close()
@@ -0,0 +1,111 @@
+"""Click event compaction against a real Mongo database (see ``tests/conftest.py``)."""
+
+import gzip
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+pytest.importorskip("pymongo")
+pytest.importorskip("celery")
+
+from bson import ObjectId, json_util  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.tasks.retention import compact_events  # noqa: E402
+
+CUTOFF = datetime(2024, 3, 10, tzinfo=UTC)
+OWNER = ObjectId()
+
+
+def _collections(database: Any) -> tuple[Any, Any, Any]:
+    names = settings.mongo_database_settings
+    return (
+        database[names["clicks"]],
+        database[names["owner_rollups"]],
+        database[names["link_rollups"]],
+    )
+
+
+def _seed(database: Any) -> None:
+    clicks, _, _ = _collections(database)
+    day = CUTOFF - timedelta(days=2)
+    clicks.insert_many(
+        [
+            # Recorded before ingest-time rollups existed: folded in by compaction.
+            {"short_code": "old", "owner_id": OWNER, "created_at": day + timedelta(hours=1)},
+            {"short_code": "old", "owner_id": OWNER, "created_at": day + timedelta(hours=2)},
+            # Legacy event without an owner; resolved through the urls collection.
+            {"short_code": "legacy", "created_at": day + timedelta(hours=3)},
+            # Already counted at ingest.
+            {
+                "short_code": "old",
+                "owner_id": OWNER,
+                "created_at": day + timedelta(hours=4),
+                "rolled_up": True,
+            },
+            # Inside the retention window.
+            {"short_code": "new", "owner_id": OWNER, "created_at": CUTOFF + timedelta(hours=1)},
+        ]
+    )
+    database[settings.mongo_database_settings["urls"]].insert_one(
+        {"short_code": "legacy", "owner_id": OWNER}
+    )
+
+
+def _link_clicks(database: Any) -> dict[str, int]:
+    _, _, link_rollups = _collections(database)
+    return {doc["short_code"]: doc["clicks"] for doc in link_rollups.find()}
+
+
+def test_compaction_archives_rolls_up_and_deletes(sync_mongo_database: Any, tmp_path: Path) -> None:
+    _seed(sync_mongo_database)
+    clicks, owner_rollups, _ = _collections(sync_mongo_database)
+
+    result = compact_events(sync_mongo_database, tmp_path, CUTOFF, batch_size=2)
+
+    assert result == {"archived": 4, "rolled_up": 3}
+    assert [doc["short_code"] for doc in clicks.find()] == ["new"]
+    assert _link_clicks(sync_mongo_database) == {"old": 2, "legacy": 1}
+    owner_day = owner_rollups.find_one({"owner_id": OWNER})
+    assert owner_day is not None and owner_day["clicks"] == 3
+
+
+def test_archive_files_hold_every_compacted_event(sync_mongo_database: Any, tmp_path: Path) -> None:
+    _seed(sync_mongo_database)
+
+    compact_events(sync_mongo_database, tmp_path, CUTOFF, batch_size=3)
+
+    files = sorted(tmp_path.glob("click_events-*.ndjson.gz"))
+    assert len(files) == 2
+    assert not list(tmp_path.glob("*.tmp"))
+    archived = [
+        json_util.loads(line)
+        for path in files
+        for line in gzip.decompress(path.read_bytes()).splitlines()
+    ]
+    assert sorted(event["short_code"] for event in archived) == ["legacy", "old", "old", "old"]
+
+
+def test_retried_batch_is_not_rolled_up_twice(
+    sync_mongo_database: Any, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _seed(sync_mongo_database)
+    clicks, _, _ = _collections(sync_mongo_database)
+    delete_many = type(clicks).delete_many
+
+    def crash(*_: Any, **__: Any) -> None:
+        raise RuntimeError("worker lost")
+
+    # The first run dies after archiving and rolling up, before the delete.
+    monkeypatch.setattr(type(clicks), "delete_many", crash)
+    with pytest.raises(RuntimeError):
+        compact_events(sync_mongo_database, tmp_path, CUTOFF, batch_size=10)
+    monkeypatch.setattr(type(clicks), "delete_many", delete_many)
+
+    result = compact_events(sync_mongo_database, tmp_path, CUTOFF, batch_size=10)
+
+    assert result == {"archived": 4, "rolled_up": 0}
+    assert _link_clicks(sync_mongo_database) == {"old": 2, "legacy": 1}
+    assert len(list(tmp_path.glob("click_events-*.ndjson.gz"))) == 1
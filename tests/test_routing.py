@@ -0,0 +1,99 @@
+from collections import Counter
+
+from app.utils.cache_record import CachedTarget
+from app.utils.routing import (
+    CompiledRouting,
+    RedirectContext,
+    classify_device,
+    parse_accept_language,
+)
+
+ROUTING = {
+    "rules": [
+        {"name": "fr", "target_url": "https://example.fr/", "countries": ["fr", "BE"]},
+        {
+            "name": "app",
+            "target_url": "https://example.com/app",
+            "devices": ["mobile", "tablet"],
+            "languages": ["en"],
+        },
+    ],
+    "variants": [
+        {"name": "a", "target_url": "https://example.com/a", "weight": 3},
+        {"name": "b", "target_url": "https://example.com/b", "weight": 1},
+    ],
+}
+
+IPHONE = "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) Mobile/15E148"
+IPAD = "Mozilla/5.0 (iPad; CPU OS 17_0 like Mac OS X)"
+ANDROID_TABLET = "Mozilla/5.0 (Linux; Android 14; SM-X700) AppleWebKit/537.36"
+DESKTOP = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/120.0"
+
+
+def test_classify_device() -> None:
+    assert classify_device(IPHONE) == "mobile"
+    assert classify_device(IPAD) == "tablet"
+    assert classify_device(ANDROID_TABLET) == "tablet"
+    assert classify_device(DESKTOP) == "desktop"
+    assert classify_device("Googlebot/2.1") == "bot"
+    assert classify_device(None) == "bot"
+
+
+def test_accept_language_is_ordered_by_quality() -> None:
+    assert parse_accept_language("en;q=0.5, pt-BR, fr;q=0") == ("pt-br", "pt", "en")
+    assert parse_accept_language("*") == ()
+    assert parse_accept_language(None) == ()
+
+
+def test_first_matching_rule_wins() -> None:
+    routing = CompiledRouting.compile(ROUTING)
+    french = RedirectContext(country="BE", device="mobile", languages=("en",))
+    assert routing.choose("abc", french, "https://example.com/") == ("fr", "https://example.fr/")
+    mobile_en = RedirectContext(country="US", device="mobile", languages=("en-us", "en"))
+    assert routing.choose("abc", mobile_en, "https://example.com/")[0] == "app"
+    desktop_en = RedirectContext(country="US", device="desktop", languages=("en",))
+    assert routing.choose("abc", desktop_en, "https://example.com/")[0] in {"a", "b"}
+
+
+def test_weighted_split_is_sticky_and_proportional() -> None:
+    routing = CompiledRouting.compile({"variants": ROUTING["variants"]})
+    context = RedirectContext(visitor_key="203.0.113.9|agent")
+    first = routing.choose("abc", context, "https://example.com/")
+    assert all(routing.choose("abc", context, "") == first for _ in range(10))
+
+    chosen = Counter(
+        routing.choose("abc", RedirectContext(visitor_key=f"visitor-{index}"), "")[0]
+        for index in range(4000)
+    )
+    assert 0.7 < chosen["a"] / 4000 < 0.8
+
+
+def test_no_variants_falls_back_to_the_link_target() -> None:
+    routing = CompiledRouting.compile({"rules": ROUTING["rules"][:1]})
+    assert routing.choose("abc", RedirectContext(country="US"), "https://example.com/") == (
+        "default",
+        "https://example.com/",
+    )
+
+
+def test_compiled_routing_round_trips_through_the_cache_record() -> None:
+    record = CachedTarget.from_document(
+        {"target_url": "https://example.com/", "version": 2, "routing": ROUTING}
+    )
+    decoded = CachedTarget.decode(record.encode())
+    assert decoded == record
+    assert decoded is not None and decoded.routing is not None
+    assert decoded.routing.rules[0].countries == frozenset({"FR", "BE"})
+    assert decoded.routing.cumulative_weights == (3, 4)
+
+
+def test_context_from_headers() -> None:
+    context = RedirectContext.from_headers(
+        {"user-agent": IPHONE, "accept-language": "de-DE,de;q=0.9", "cf-ipcountry": "de"},
+        "198.51.100.7",
+        "cf-ipcountry",
+    )
+    assert context.country == "DE"
+    assert context.device == "mobile"
+    assert context.languages == ("de-de", "de")
+    assert context.visitor_key == f"198.51.100.7|{IPHONE}"
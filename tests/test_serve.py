@@ -0,0 +1,115 @@
+"""Hot link table refreshes against a real Mongo database (see ``tests/conftest.py``)."""
+
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+pytest.importorskip("pymongo")
+pytest.importorskip("uvicorn")
+
+from bson import ObjectId  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.serve import HotLinkRefresher  # noqa: E402
+from app.utils.shm_table import HotLinkEntry, HotLinkTable  # noqa: E402
+from app.utils.time import utc_day_start, utc_now  # noqa: E402
+
+OWNER = ObjectId()
+
+
+@pytest.fixture
+def table(tmp_path: Path) -> Any:
+    table = HotLinkTable.create(tmp_path / "hot", slot_count=64, heap_size=4096)
+    yield table
+    table.close()
+
+
+@pytest.fixture
+def client(sync_mongo_database: Any, monkeypatch: pytest.MonkeyPatch) -> Any:
+    monkeypatch.setattr(settings, "mongodb_database", sync_mongo_database.name)
+    return sync_mongo_database.client
+
+
+def _seed(database: Any) -> None:
+    names = settings.mongo_database_settings
+    today = utc_day_start(utc_now())
+    clicks = {"plain": 50, "capped": 40, "routed": 30, "expired": 20, "quiet": 5}
+    database[names["link_rollups"]].insert_many(
+        [
+            {"owner_id": OWNER, "short_code": code, "day": today, "clicks": count}
+            for code, count in clicks.items()
+        ]
+    )
+    database[names["urls"]].insert_many(
+        [
+            {"short_code": "plain", "target_url": "https://example.com/plain"},
+            {"short_code": "capped", "target_url": "https://example.com/c", "max_clicks": 9},
+            {
+                "short_code": "routed",
+                "target_url": "https://example.com/r",
+                "routing": {"variants": [{"name": "a", "target_url": "https://a/", "weight": 1}]},
+            },
+            {
+                "short_code": "expired",
+                "target_url": "https://example.com/e",
+                "expires_at": utc_now() - timedelta(minutes=1),
+            },
+            {"short_code": "quiet", "target_url": "https://example.com/quiet"},
+        ]
+    )
+
+
+def test_refresh_publishes_the_most_clicked_plain_links(
+    client: Any, sync_mongo_database: Any, table: HotLinkTable
+) -> None:
+    _seed(sync_mongo_database)
+
+    assert HotLinkRefresher(table).refresh_once(client) == 2
+
+    assert table.lookup("plain") == "https://example.com/plain"
+    assert table.lookup("quiet") == "https://example.com/quiet"
+    for short_code in ("capped", "routed", "expired"):
+        assert table.lookup(short_code) is None
+
+
+def test_invalidation_clears_the_entry(
+    client: Any, sync_mongo_database: Any, table: HotLinkTable
+) -> None:
+    _seed(sync_mongo_database)
+    refresher = HotLinkRefresher(table)
+    refresher.refresh_once(client)
+
+    refresher.invalidate("plain")
+
+    assert table.lookup("plain") is None
+    assert table.lookup("quiet") == "https://example.com/quiet"
+
+
+def test_invalidation_during_a_refresh_is_not_republished(
+    table: HotLinkTable, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    client = None  # the snapshot read is replaced below
+    refresher = HotLinkRefresher(table)
+
+    def stale_read(_: Any) -> list[HotLinkEntry]:
+        # The link is updated after the snapshot read but before it is published.
+        refresher.invalidate("plain")
+        return [
+            ("plain", "https://example.com/stale", None),
+            ("quiet", "https://example.com/quiet", None),
+        ]
+
+    monkeypatch.setattr(refresher, "_load_hot_links", stale_read)
+    refresher.refresh_once(client)
+
+    assert table.lookup("plain") is None
+    assert table.lookup("quiet") == "https://example.com/quiet"
+
+    # Later refreshes publish the link again from a fresh read.
+    monkeypatch.setattr(
+        refresher, "_load_hot_links", lambda _: [("plain", "https://example.com/new", None)]
+    )
+    refresher.refresh_once(client)
+    assert table.lookup("plain") == "https://example.com/new"
@@ -0,0 +1,87 @@
+import multiprocessing
+from pathlib import Path
+
+from app.utils.shm_table import HotLinkTable
+
+
+def _lookup_in_child(path: str, short_code: str, queue: multiprocessing.Queue) -> None:
+    table = HotLinkTable.open(path)
+    queue.put(table.lookup(short_code))
+    table.close()
+
+
+def test_publish_and_lookup(tmp_path: Path) -> None:
+    table = HotLinkTable.create(tmp_path / "hot", slot_count=64, heap_size=4096)
+    stored = table.publish(
+        [
+            ("abc123", "https://example.com/a", None),
+            ("zzz999", "https://example.com/z?q=1", None),
+        ]
+    )
+    assert stored == 2
+    assert table.entry_count == 2
+    assert table.generation % 2 == 0
+    assert table.lookup("abc123") == "https://example.com/a"
+    assert table.lookup("zzz999") == "https://example.com/z?q=1"
+    assert table.lookup("missing") is None
+    table.close()
+
+
+def test_republish_replaces_previous_snapshot(tmp_path: Path) -> None:
+    table = HotLinkTable.create(tmp_path / "hot", slot_count=64, heap_size=4096)
+    table.publish([("old", "https://example.com/old", None)])
+    first_generation = table.generation
+    table.publish([("new", "https://example.com/new", None)])
+    assert table.generation == first_generation + 2
+    assert table.lookup("old") is None
+    assert table.lookup("new") == "https://example.com/new"
+    table.close()
+
+
+def test_expired_and_invalidated_entries_miss(tmp_path: Path) -> None:
+    table = HotLinkTable.create(tmp_path / "hot", slot_count=64, heap_size=4096)
+    table.publish(
+        [
+            ("soon", "https://example.com/soon", 1000.0),
+            ("gone", "https://example.com/gone", None),
+        ]
+    )
+    assert table.lookup("soon", now=999.0) == "https://example.com/soon"
+    assert table.lookup("soon", now=1000.0) is None
+    assert table.invalidate("gone")
+    assert table.lookup("gone") is None
+    assert not table.invalidate("never-published")
+    table.close()
+
+
+def test_capacity_limits_are_respected(tmp_path: Path) -> None:
+    table = HotLinkTable.create(tmp_path / "hot", slot_count=8, heap_size=64)
+    entries = [(f"code{index}", f"https://e.x/{index}", None) for index in range(10)]
+    stored = table.publish(entries)
+    assert stored <= 4
+    hits = [code for code, _, _ in entries if table.lookup(code)]
+    assert len(hits) == stored
+    table.close()
+
+
+def test_other_processes_see_published_entries(tmp_path: Path) -> None:
+    path = tmp_path / "hot"
+    table = HotLinkTable.create(path, slot_count=64, heap_size=4096)
+    table.publish([("shared", "https://example.com/shared", None)])
+    queue: multiprocessing.Queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_lookup_in_child, args=(str(path), "shared", queue))
+    process.start()
+    process.join(timeout=10)
+    assert queue.get(timeout=5) == "https://example.com/shared"
+    table.close()
+
+
+def test_open_rejects_foreign_files(tmp_path: Path) -> None:
+    path = tmp_path / "not-a-table"
+    path.write_bytes(b"\0" * 128)
+    try:
+        HotLinkTable.open(path)
+    except ValueError as exc:
+        assert "Not a hot link table" in str(exc)
+    else:  # pragma: no cover - guard
+        raise AssertionError("Expected ValueError for foreign file")
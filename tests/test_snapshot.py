@@ -0,0 +1,70 @@
+from pathlib import Path
+
+from app.utils.snapshot import SnapshotReader, SnapshotWriter
+
+
+def _write(path: Path, count: int, page_records: int = 4) -> list[str]:
+    codes = [f"c{index:05d}" for index in range(count)]
+    with SnapshotWriter(path, page_records=page_records) as writer:
+        for index, code in enumerate(codes):
+            writer.add(code, f"https://example.com/{index}", 1000.0 + index if index % 2 else None)
+    return codes
+
+
+def test_every_record_can_be_found(tmp_path: Path) -> None:
+    path = tmp_path / "redirects.snap"
+    codes = _write(path, 103)
+    reader = SnapshotReader(path)
+    assert reader.record_count == 103
+    assert reader.generated_at > 0
+    for index, code in enumerate(codes):
+        assert reader.lookup(code) == (
+            f"https://example.com/{index}",
+            1000.0 + index if index % 2 else None,
+        )
+    reader.close()
+
+
+def test_missing_codes_miss(tmp_path: Path) -> None:
+    path = tmp_path / "redirects.snap"
+    _write(path, 20)
+    reader = SnapshotReader(path)
+    assert reader.lookup("a") is None  # before the first record
+    assert reader.lookup("c00003x") is None  # between records
+    assert reader.lookup("zzz") is None  # after the last record
+    reader.close()
+
+
+def test_empty_snapshot(tmp_path: Path) -> None:
+    path = tmp_path / "redirects.snap"
+    _write(path, 0)
+    reader = SnapshotReader(path)
+    assert reader.record_count == 0
+    assert reader.lookup("anything") is None
+    reader.close()
+
+
+def test_out_of_order_records_abort_the_write(tmp_path: Path) -> None:
+    path = tmp_path / "redirects.snap"
+    try:
+        with SnapshotWriter(path) as writer:
+            writer.add("b", "https://example.com/b")
+            writer.add("a", "https://example.com/a")
+    except ValueError as exc:
+        assert "ascending" in str(exc)
+    else:  # pragma: no cover - guard
+        raise AssertionError("Expected ValueError for unsorted records")
+    assert not path.exists()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_unicode_codes_use_byte_order(tmp_path: Path) -> None:
+    path = tmp_path / "redirects.snap"
+    codes = sorted(["abc", "abd", "zz", "é-code", "ü"], key=lambda code: code.encode("utf-8"))
+    with SnapshotWriter(path, page_records=2) as writer:
+        for code in codes:
+            writer.add(code, f"https://example.com/{code}")
+    reader = SnapshotReader(path)
+    for code in codes:
+        assert reader.lookup(code) == (f"https://example.com/{code}", None)
+    reader.close()
@@ -0,0 +1,33 @@
+from datetime import UTC, datetime, timedelta, timezone
+
+from app.utils.time import utc_day_range, utc_day_start
+
+
+def test_utc_day_start_truncates_to_midnight() -> None:
+    value = datetime(2024, 5, 17, 15, 42, 7, 123, tzinfo=UTC)
+    assert utc_day_start(value) == datetime(2024, 5, 17, tzinfo=UTC)
+
+
+def test_utc_day_start_converts_offsets_and_naive_values() -> None:
+    shifted = datetime(2024, 5, 17, 1, 0, tzinfo=timezone(timedelta(hours=3)))
+    assert utc_day_start(shifted) == datetime(2024, 5, 16, tzinfo=UTC)
+    assert utc_day_start(datetime(2024, 5, 17, 23, 59)) == datetime(2024, 5, 17, tzinfo=UTC)
+
+
+def test_utc_day_range_is_ascending_and_inclusive() -> None:
+    end = datetime(2024, 3, 2, 8, 30, tzinfo=UTC)
+    days = utc_day_range(3, end=end)
+    assert days == [
+        datetime(2024, 2, 29, tzinfo=UTC),
+        datetime(2024, 3, 1, tzinfo=UTC),
+        datetime(2024, 3, 2, tzinfo=UTC),
+    ]
+
+
+def test_utc_day_range_rejects_empty_window() -> None:
+    try:
+        utc_day_range(0)
+    except ValueError as exc:
+        assert "at least one day" in str(exc)
+    else:  # pragma: no cover - guard
+        raise AssertionError("Expected ValueError for empty range")
@@ -0,0 +1,414 @@
+"""``UrlService`` against a real Mongo database and Redis cache (see ``tests/conftest.py``)."""
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+pytest.importorskip("motor")
+pytest.importorskip("redis")
+
+from bson import ObjectId  # noqa: E402
+from pymongo.errors import DuplicateKeyError, ServerSelectionTimeoutError  # noqa: E402
+from redis.exceptions import ConnectionError as RedisConnectionError  # noqa: E402
+
+from app.db.redirect_snapshot import RedirectSnapshot  # noqa: E402
+from app.db.url_cache import UrlCache  # noqa: E402
+from app.schemas.url import URLBulkExpire, URLCreate, URLRouting, URLUpdate  # noqa: E402
+from app.services import url_service  # noqa: E402
+from app.services.url_service import (  # noqa: E402
+    ClickQuotaExceededError,
+    ClickQuotaUnavailableError,
+    UrlService,
+    UrlServiceConfig,
+)
+from app.utils.cache_record import CachedTarget  # noqa: E402
+from app.utils.snapshot import SnapshotWriter  # noqa: E402
+
+OWNER_ID = str(ObjectId())
+
+
+@pytest.fixture(autouse=True)
+def clicks(monkeypatch: pytest.MonkeyPatch) -> list[tuple[str, str | None]]:
+    """Record enqueued click events instead of sending them to the Celery broker."""
+    enqueued: list[tuple[str, str | None]] = []
+
+    def record(_: UrlService, short_code: str, variant: str | None = None) -> None:
+        enqueued.append((short_code, variant))
+
+    monkeypatch.setattr(UrlService, "_enqueue_click", record)
+    return enqueued
+
+
+def _service(
+    database: Any,
+    cache: UrlCache,
+    lookup_database: Any = None,
+    snapshot: RedirectSnapshot | None = None,
+    **overrides: Any,
+) -> UrlService:
+    config = UrlServiceConfig(
+        cache_ttl_seconds=60,
+        url_collection="urls",
+        **overrides,
+    )
+    return UrlService(database, cache, config, lookup_database=lookup_database, snapshot=snapshot)
+
+
+@pytest.fixture
+async def lookup_database(mongo_database: Any) -> Any:
+    """A second database standing in for the redirect profile's (possibly lagging) replica."""
+    name = f"{mongo_database.name}_lookup"
+    yield mongo_database.client[name]
+    await mongo_database.client.drop_database(name)
+
+
+async def _drain_background_writes() -> None:
+    while url_service._background_tasks:
+        await asyncio.gather(*url_service._background_tasks)
+
+
+@pytest.mark.parametrize("mode", ["sync", "concurrent", "background"])
+async def test_recreated_alias_replaces_the_tombstone(
+    mongo_database: Any, url_cache: UrlCache, mode: str
+) -> None:
+    service = _service(mongo_database, url_cache, create_cache_mode=mode)
+    first = URLCreate(target_url="https://example.com/old", custom_alias="promo")
+    await service.create_short_url(first, OWNER_ID)
+    await _drain_background_writes()
+    assert await service.delete_url(OWNER_ID, "promo")
+    tombstone = await url_cache.get("promo")
+    assert tombstone is not None and tombstone.deleted
+
+    second = URLCreate(target_url="https://example.com/new", custom_alias="promo")
+    await service.create_short_url(second, OWNER_ID)
+    await _drain_background_writes()
+
+    record = await url_cache.get("promo")
+    assert record is not None and record.target_url == "https://example.com/new"
+    assert await service.resolve_short_code("promo") == "https://example.com/new"
+
+
+async def test_concurrent_create_removes_its_entry_when_the_insert_fails(
+    mongo_database: Any, url_cache: UrlCache
+) -> None:
+    service = _service(mongo_database, url_cache, create_cache_mode="concurrent")
+    payload = URLCreate(target_url="https://example.com/a", custom_alias="taken")
+    await service.create_short_url(payload, OWNER_ID)
+    await url_cache.delete("taken")
+    urls = mongo_database["urls"]
+    await urls.create_index("short_code", unique=True)
+
+    # Simulate losing the alias race: the uniqueness pre-check passes, the insert does not.
+    async def no_conflict(alias: str | None) -> str:
+        return alias or "unused"
+
+    service._ensure_unique_short_code = no_conflict  # type: ignore[method-assign]
+    loser = URLCreate(target_url="https://example.com/b", custom_alias="taken")
+    with pytest.raises(DuplicateKeyError):
+        await service.create_short_url(loser, OWNER_ID)
+
+    assert await url_cache.get("taken") is None
+    assert await service.resolve_short_code("taken") == "https://example.com/a"
+
+
+async def test_quota_links_are_refused_while_the_counter_is_unreachable(
+    mongo_database: Any, url_cache: UrlCache, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    service = _service(mongo_database, url_cache)
+    capped = URLCreate(target_url="https://example.com/capped", max_clicks=5)
+    capped_code = (await service.create_short_url(capped, OWNER_ID)).short_code
+    open_link = URLCreate(target_url="https://example.com/open")
+    open_code = (await service.create_short_url(open_link, OWNER_ID)).short_code
+
+    async def unreachable(_: str, record: CachedTarget) -> bool:
+        if record.max_clicks is None:
+            return True
+        raise RedisConnectionError("connection refused")
+
+    monkeypatch.setattr(url_cache, "claim_click", unreachable)
+    with pytest.raises(ClickQuotaUnavailableError):
+        await service.resolve_short_code(capped_code)
+    assert await service.resolve_short_code(open_code) == "https://example.com/open"
+
+
+async def test_bulk_jobs_are_only_visible_to_their_owner(
+    mongo_database: Any, url_cache: UrlCache, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from app.tasks import bulk
+
+    queued: list[str] = []
+    monkeypatch.setattr(
+        bulk.bulk_manage_urls, "apply_async", lambda _, task_id: queued.append(task_id)
+    )
+    monkeypatch.setattr(
+        bulk, "AsyncResult", lambda job_id, app: SimpleNamespace(state="PENDING", info=None)
+    )
+    service = _service(mongo_database, url_cache, bulk_inline_limit=1)
+    for index in range(3):
+        payload = URLCreate(target_url="https://example.com/", custom_alias=f"bulk{index}")
+        await service.create_short_url(payload, OWNER_ID)
+
+    result = await service.submit_bulk(
+        OWNER_ID, URLBulkExpire(code_prefix="bulk", expires_in_seconds=3600)
+    )
+
+    assert result.status == "queued" and queued == [result.job_id]
+    job = await service.get_bulk_job(OWNER_ID, result.job_id)
+    assert job is not None
+    assert (job.status, job.operation, job.total) == ("queued", "expire", 3)
+    assert await service.get_bulk_job(str(ObjectId()), result.job_id) is None
+    assert await service.get_bulk_job(OWNER_ID, "no-such-job") is None
+
+
+async def test_bulk_expiry_caches_the_version_a_concurrent_update_left(
+    mongo_database: Any, url_cache: UrlCache
+) -> None:
+    service = _service(mongo_database, url_cache)
+    payload = URLCreate(target_url="https://example.com/before", custom_alias="racy")
+    await service.create_short_url(payload, OWNER_ID)
+    chunk = await mongo_database["urls"].find({"short_code": "racy"}).to_list(1)
+
+    # The PATCH lands between the chunk read and its update_many.
+    await service.update_url(OWNER_ID, "racy", URLUpdate(target_url="https://example.com/after"))
+    assert await service._expire_chunk(chunk, 3600) == 1
+
+    record = await url_cache.get("racy")
+    assert record is not None
+    assert (record.target_url, record.version) == ("https://example.com/after", 3)
+    assert record.expires_at is not None
+
+
+def _link(short_code: str, target_url: str) -> dict[str, Any]:
+    return {"short_code": short_code, "target_url": target_url, "version": 1}
+
+
+async def test_redirect_misses_read_the_lookup_profile(
+    mongo_database: Any, lookup_database: Any, url_cache: UrlCache
+) -> None:
+    service = _service(mongo_database, url_cache, lookup_database)
+    await mongo_database["urls"].insert_one(_link("split", "https://example.com/primary"))
+    await lookup_database["urls"].insert_one(_link("split", "https://example.com/replica"))
+
+    assert await service.resolve_short_code("split") == "https://example.com/replica"
+
+
+async def test_lagging_lookup_profile_falls_back_to_the_primary(
+    mongo_database: Any, lookup_database: Any, url_cache: UrlCache
+) -> None:
+    service = _service(mongo_database, url_cache, lookup_database)
+    await mongo_database["urls"].insert_one(_link("fresh", "https://example.com/fresh"))
+
+    assert await service.resolve_short_code("fresh") == "https://example.com/fresh"
+    record = await url_cache.get("fresh")
+    assert record is not None and record.target_url == "https://example.com/fresh"
+
+
+async def test_unknown_codes_are_cached_as_missing(
+    mongo_database: Any, lookup_database: Any, url_cache: UrlCache, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    service = _service(mongo_database, url_cache, lookup_database)
+    assert await service.resolve_short_code("nothing") is None
+    marker = await url_cache.get("nothing")
+    assert marker is not None and marker.deleted and marker.version == 0
+
+    async def no_reads(*_: Any, **__: Any) -> None:
+        raise AssertionError("miss was not served from the cache")
+
+    monkeypatch.setattr(service, "_find_redirect_document", no_reads)
+    assert await service.resolve_short_code("nothing") is None
+
+
+async def test_create_replaces_the_missing_marker(
+    mongo_database: Any, lookup_database: Any, url_cache: UrlCache
+) -> None:
+    service = _service(mongo_database, url_cache, lookup_database)
+    assert await service.resolve_short_code("later") is None
+
+    payload = URLCreate(target_url="https://example.com/later", custom_alias="later")
+    await service.create_short_url(payload, OWNER_ID)
+
+    assert await service.resolve_short_code("later") == "https://example.com/later"
+
+
+async def test_missing_marker_never_replaces_a_created_record(
+    mongo_database: Any, url_cache: UrlCache
+) -> None:
+    service = _service(mongo_database, url_cache)
+    payload = URLCreate(target_url="https://example.com/won", custom_alias="winner")
+    await service.create_short_url(payload, OWNER_ID)
+
+    # A lookup that missed before the insert finishes after the create cached its record.
+    await service._cache_missing("winner")
+
+    record = await url_cache.get("winner")
+    assert record is not None and record.target_url == "https://example.com/won"
+
+
+async def test_update_with_explicit_null_clears_the_expiry(
+    mongo_database: Any, url_cache: UrlCache
+) -> None:
+    service = _service(mongo_database, url_cache)
+    payload = URLCreate(
+        target_url="https://example.com/", custom_alias="dated", expires_in_seconds=600
+    )
+    await service.create_short_url(payload, OWNER_ID)
+
+    # Omitted fields stay as they are.
+    kept = await service.update_url(OWNER_ID, "dated", URLUpdate(target_url="https://example.org/"))
+    assert kept is not None and kept.expires_at is not None
+
+    cleared = await service.update_url(
+        OWNER_ID, "dated", URLUpdate.model_validate({"expires_in_seconds": None})
+    )
+
+    assert cleared is not None and cleared.expires_at is None
+    assert "expires_at" not in await mongo_database["urls"].find_one({"short_code": "dated"})
+    record = await url_cache.get("dated")
+    assert record is not None and record.expires_at is None and record.version == 3
+    with pytest.raises(ValueError):
+        await service.update_url(OWNER_ID, "dated", URLUpdate())
+
+
+async def test_update_with_explicit_null_removes_the_click_quota(
+    mongo_database: Any, url_cache: UrlCache
+) -> None:
+    service = _service(mongo_database, url_cache)
+    payload = URLCreate(target_url="https://example.com/", custom_alias="capped", max_clicks=1)
+    await service.create_short_url(payload, OWNER_ID)
+    assert await service.resolve_short_code("capped") == "https://example.com/"
+    with pytest.raises(ClickQuotaExceededError):
+        await service.resolve_short_code("capped")
+
+    updated = await service.update_url(
+        OWNER_ID, "capped", URLUpdate.model_validate({"max_clicks": None})
+    )
+
+    assert updated is not None and updated.max_clicks is None
+    assert "max_clicks" not in await mongo_database["urls"].find_one({"short_code": "capped"})
+    assert await service.resolve_short_code("capped") == "https://example.com/"
+
+
+async def test_update_with_explicit_null_removes_the_routing(
+    mongo_database: Any, url_cache: UrlCache
+) -> None:
+    service = _service(mongo_database, url_cache)
+    routing = URLRouting.model_validate(
+        {"variants": [{"name": "only", "target_url": "https://example.com/variant", "weight": 1}]}
+    )
+    payload = URLCreate(target_url="https://example.com/", custom_alias="routed", routing=routing)
+    await service.create_short_url(payload, OWNER_ID)
+    assert await service.resolve_short_code("routed") == "https://example.com/variant"
+
+    updated = await service.update_url(
+        OWNER_ID, "routed", URLUpdate.model_validate({"routing": None})
+    )
+
+    assert updated is not None and updated.routing is None
+    record = await url_cache.get("routed")
+    assert record is not None and record.routing is None
+    assert await service.resolve_short_code("routed") == "https://example.com/"
+
+
+async def test_link_analytics_survive_click_event_compaction(
+    mongo_database: Any, mongo_uri: str, url_cache: UrlCache, tmp_path: Path
+) -> None:
+    pytest.importorskip("celery")
+    from pymongo import MongoClient
+
+    from app.tasks.retention import compact_events
+
+    service = _service(mongo_database, url_cache)
+    payload = URLCreate(target_url="https://example.com/", custom_alias="counted")
+    await service.create_short_url(payload, OWNER_ID)
+    # Three clicks recorded by the click task long before the retention cutoff.
+    clicked_at = datetime(2024, 1, 5, 12, tzinfo=UTC)
+    await mongo_database["urls"].update_one(
+        {"short_code": "counted"},
+        {"$inc": {"click_count": 3}, "$set": {"last_clicked_at": clicked_at}},
+    )
+    await mongo_database["click_events"].insert_many(
+        [
+            {"short_code": "counted", "owner_id": ObjectId(OWNER_ID), "created_at": clicked_at}
+            for _ in range(3)
+        ]
+    )
+
+    client = MongoClient(mongo_uri, tz_aware=True)
+    try:
+        cutoff = clicked_at + timedelta(days=30)
+        database = client[mongo_database.name]
+        await asyncio.to_thread(compact_events, database, tmp_path, cutoff, 100)
+    finally:
+        client.close()
+    assert await mongo_database["click_events"].count_documents({}) == 0
+
+    detail = await service.get_url_with_analytics(OWNER_ID, "counted")
+
+    assert detail is not None and detail.analytics is not None
+    assert (detail.analytics.total_clicks, detail.analytics.last_clicked_at) == (3, clicked_at)
+
+
+async def test_bulk_delete_tombstones_the_version_a_concurrent_update_left(
+    mongo_database: Any, url_cache: UrlCache
+) -> None:
+    service = _service(mongo_database, url_cache)
+    payload = URLCreate(target_url="https://example.com/before", custom_alias="moving")
+    await service.create_short_url(payload, OWNER_ID)
+    chunk = await mongo_database["urls"].find({"short_code": "moving"}).to_list(1)
+
+    # Two PATCHes land between the chunk read and its delete.
+    for target in ("https://example.com/one", "https://example.com/two"):
+        await service.update_url(OWNER_ID, "moving", URLUpdate(target_url=target))
+    assert await service._delete_chunk(chunk) == 1
+
+    assert await mongo_database["urls"].count_documents({}) == 0
+    tombstone = await url_cache.get("moving")
+    assert tombstone is not None and tombstone.deleted and tombstone.version == 4
+    assert await service.resolve_short_code("moving") is None
+
+
+class _UnreachableCollection:
+    async def find_one(self, *_: Any, **__: Any) -> None:
+        raise ServerSelectionTimeoutError("no servers available")
+
+
+def _snapshot(path: Path, *records: tuple[str, str, float | None]) -> RedirectSnapshot:
+    with SnapshotWriter(path) as writer:
+        for short_code, target_url, expires_at in sorted(records):
+            writer.add(short_code, target_url, expires_at)
+    return RedirectSnapshot(path, max_staleness_seconds=3600)
+
+
+async def test_redirects_fall_back_to_the_snapshot_while_mongo_is_down(
+    mongo_database: Any, url_cache: UrlCache, tmp_path: Path
+) -> None:
+    now = datetime.now(UTC).timestamp()
+    snapshot = _snapshot(
+        tmp_path / "redirects.snap",
+        ("dated", "https://example.com/dated", now + 3600),
+        ("expired", "https://example.com/expired", now - 60),
+        ("plain", "https://example.com/plain", None),
+    )
+    unreachable = {"urls": _UnreachableCollection()}
+    service = _service(mongo_database, url_cache, unreachable, snapshot)
+
+    assert await service.resolve_short_code("plain") == "https://example.com/plain"
+    assert await service.resolve_short_code("dated") == "https://example.com/dated"
+    # Expired and unknown codes still fail with the original error.
+    for short_code in ("expired", "unknown"):
+        with pytest.raises(ServerSelectionTimeoutError):
+            await service.resolve_short_code(short_code)
+    snapshot.close()
+
+
+async def test_lookup_errors_propagate_without_a_snapshot(
+    mongo_database: Any, url_cache: UrlCache
+) -> None:
+    service = _service(mongo_database, url_cache, {"urls": _UnreachableCollection()})
+
+    with pytest.raises(ServerSelectionTimeoutError):
+        await service.resolve_short_code("plain")
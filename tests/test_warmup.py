@@ -0,0 +1,81 @@
+"""Startup connection warmup never holds a worker back (see ``tests/conftest.py``)."""
+
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from typing import Any
+
+import pytest
+
+pytest.importorskip("redis")
+pytest.importorskip("fastapi")
+pytest.importorskip("motor")
+
+from fastapi import FastAPI  # noqa: E402
+from pymongo.errors import ServerSelectionTimeoutError  # noqa: E402
+from redis.asyncio import Redis  # noqa: E402
+
+from app.db.mongo import MONGO_DB_STATE_KEY, MONGO_REDIRECT_DB_STATE_KEY  # noqa: E402
+from app.db.redis import REDIS_STATE_KEY  # noqa: E402
+from app.db.redis_cache import CACHE_SHARDS_STATE_KEY, CacheShards  # noqa: E402
+from app.db.warmup import warm_connections  # noqa: E402
+from tests.conftest import free_port  # noqa: E402
+
+
+class _Database:
+    """Stands in for a Motor database; only ``command("ping")`` is used by the warmup."""
+
+    def __init__(self, delay: float = 0.0, error: Exception | None = None) -> None:
+        self._delay = delay
+        self._error = error
+
+    async def command(self, name: str) -> dict[str, Any]:
+        await asyncio.sleep(self._delay)
+        if self._error is not None:
+            raise self._error
+        return {"ok": 1}
+
+
+@pytest.fixture
+async def app(redis_uri: str) -> AsyncIterator[FastAPI]:
+    app = FastAPI()
+    redis = Redis.from_url(redis_uri)
+    setattr(app.state, REDIS_STATE_KEY, redis)
+    setattr(app.state, CACHE_SHARDS_STATE_KEY, CacheShards({redis_uri: redis}))
+    setattr(app.state, MONGO_DB_STATE_KEY, _Database())
+    setattr(app.state, MONGO_REDIRECT_DB_STATE_KEY, _Database())
+    yield app
+    await redis.aclose()
+
+
+async def test_every_connection_is_pinged(app: FastAPI) -> None:
+    results = await warm_connections(app, timeout_seconds=5)
+
+    assert set(results) == {"mongo_admin", "mongo_redirect", "redis", "cache_0"}
+    assert all(ms is not None and ms >= 0 for ms in results.values())
+
+
+async def test_failed_pings_are_reported_not_raised(app: FastAPI) -> None:
+    down = ServerSelectionTimeoutError("no servers")
+    setattr(app.state, MONGO_REDIRECT_DB_STATE_KEY, _Database(error=down))
+    unreachable = Redis(port=free_port())
+    setattr(app.state, REDIS_STATE_KEY, unreachable)
+
+    results = await warm_connections(app, timeout_seconds=5)
+
+    assert results["mongo_redirect"] is None and results["redis"] is None
+    assert results["mongo_admin"] is not None and results["cache_0"] is not None
+    await unreachable.aclose()
+
+
+async def test_slow_pings_give_up_at_the_timeout(app: FastAPI) -> None:
+    setattr(app.state, MONGO_DB_STATE_KEY, _Database(delay=30))
+
+    started = time.monotonic()
+    assert await warm_connections(app, timeout_seconds=0.2) == {}
+    assert time.monotonic() - started < 2
+
+
+async def test_zero_timeout_skips_the_warmup() -> None:
+    # Nothing is attached to the app state, so any ping attempt would raise.
+    assert await warm_connections(FastAPI(), timeout_seconds=0) == {}